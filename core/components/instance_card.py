@@ -9,6 +9,8 @@ import json
 import threading
 import weakref
 
+from utils.database import get_database
+
 
 class InstanceCard(tk.Frame):
     def __init__(self, parent, name, status="Offline", cpu_usage=0, memory_usage=0, app_ref=None, **kwargs):
@@ -75,6 +77,10 @@ class InstanceCard(tk.Frame):
                                    font=("Segoe UI", 10), anchor="w")
         self.status_text.pack(side="left", padx=(8, 0))
         
+        self.resource_label = tk.Label(bottom_row, text="", bg="#1e2329", fg="#8b949e",
+                                      font=("Segoe UI", 9), anchor="w")
+        self.resource_label.pack(side="left", padx=(16, 0))
+        
         # Right side - buttons
         self._setup_buttons()
     
@@ -281,6 +287,20 @@ class InstanceCard(tk.Frame):
         if old_status != new_status:
             print(f"[InstanceCard] {self.name} status updated: {old_status} -> {new_status}")
     
+    def update_resource_usage(self, cpu_usage, memory_usage):
+        """Update CPU (%) and memory (MB) shown for the instance"""
+        if self._destroyed:
+            return
+        
+        self.cpu_usage = cpu_usage
+        self.memory_usage = memory_usage
+        
+        if self.status == "Running" and cpu_usage is not None:
+            color = "#ff6b6b" if cpu_usage >= 80 else "#8b949e"
+            self.resource_label.configure(text=f"CPU {cpu_usage:.0f}%  RAM {memory_usage:.0f} MB", fg=color)
+        else:
+            self.resource_label.configure(text="")
+    
     def update_status_display(self, new_status):
         """Update visual status display"""
         if self._destroyed:
@@ -397,6 +417,11 @@ class InstanceCard(tk.Frame):
             filename = f"{self.name}_config.json"
             with open(filename, 'w') as f:
                 json.dump(config, f, indent=2)
+            
+            # Also queryable alongside the instance's settings when the database is enabled
+            database = get_database()
+            if database:
+                database.save_document(self.name, config, kind="export")
             messagebox.showinfo("Export Complete", f"Configuration exported to {filename}")
         except Exception as e:
             messagebox.showerror("Export Failed", f"Failed to export config: {str(e)}")
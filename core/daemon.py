@@ -0,0 +1,155 @@
+"""
+BENSON v2.0 - Headless Daemon
+Runs InstanceManager and ModuleManager without Tk and serves the local
+control API, so unattended servers don't depend on GUI rendering. The GUI
+can attach as a client with BENSON_ATTACH=http://127.0.0.1:8765.
+
+    python main.py --headless [--host 127.0.0.1] [--port 8765]
+    BENSON_API_TOKEN=<secret> python main.py --headless --host 0.0.0.0 --join http://coordinator:8770   # worker node
+
+Binding anything but loopback requires BENSON_API_TOKEN.
+"""
+
+import os
+import signal
+import threading
+import time
+from typing import Dict
+
+from core.headless_app import HeadlessApp
+from core.instance_manager import InstanceManager
+from utils.control_api import DEFAULT_PORT, ControlServer, is_loopback
+from utils.startup_timer import startup_timer
+
+
+class BensonDaemon(HeadlessApp):
+    """HeadlessApp that owns the managers and the control API"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT, token: str = None,
+                 join: str = None, node_name: str = None):
+        super().__init__(instance_manager=None)
+        self.host = host
+        self.port = port
+        self.join = join
+        self.node_name = node_name
+        self.node_agent = None
+        self.token = token if token is not None else os.environ.get("BENSON_API_TOKEN")
+        self.server = None
+        self.started_at = time.time()
+        self.stop_event = threading.Event()
+
+    def start(self):
+        """Load instances, open the API, then build modules (the API reports 503 until they are ready)"""
+        with startup_timer.phase("instance_manager"):
+            self.instance_manager = InstanceManager()
+            self.instance_manager.app = self
+            self.instance_manager.load_real_instances()
+
+        with startup_timer.phase("control_api"):
+            self.server = ControlServer(self, self.host, self.port, self.token)
+            self.server.start()
+            self.port = self.server.port
+
+        if self.join:
+            # Worker node - modules only for the instances the coordinator assigns us
+            from utils.cluster import NodeAgent
+            self.node_agent = NodeAgent(self, self.join, self.node_name, self.token)
+            if not self.node_agent.heartbeat():
+                print(f"[Daemon] ⚠️ Coordinator {self.join} not reachable yet - no instances until it answers")
+
+        with startup_timer.phase("module_manager"):
+            from utils.module_workers import create_module_manager
+            self.module_manager = create_module_manager(
+                self, instance_filter=self.node_agent.owns if self.node_agent else None)
+        if self.node_agent:
+            self.node_agent.start()
+
+        self.add_console_message(f"✅ BENSON daemon ready with {len(self.instance_manager.get_instances())} instances")
+        startup_timer.print_report("Daemon startup")
+
+    def run(self):
+        """Start and block until SIGINT/SIGTERM or POST /shutdown"""
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                signal.signal(signum, lambda *_: self.request_shutdown())
+            except (ValueError, OSError):
+                pass  # Not the main thread
+        self.start()
+        # Short waits keep the main thread responsive to signals on Windows
+        while not self.stop_event.wait(0.5):
+            pass
+        self.shutdown()
+
+    def request_shutdown(self):
+        self.stop_event.set()
+
+    def shutdown(self):
+        print("[Daemon] 🛑 Shutting down...")
+        if self.node_agent:
+            self.node_agent.stop()
+        if self.server:
+            self.server.stop()
+        if self.instance_manager:
+            self.instance_manager.stop_telemetry()
+        self.destroy()
+        print("[Daemon] ✅ Stopped")
+
+    # Instance operations - same flow as BensonApp.start_instance/stop_instance
+    def start_instance(self, name: str):
+        def start_worker():
+            try:
+                if self.instance_manager.optimize_instance_settings(name):
+                    self.add_console_message(f"✅ {name} optimized")
+                if not self.instance_manager.start_instance(name):
+                    self.add_console_message(f"❌ Failed to start: {name}")
+                    return
+                self.add_console_message(f"✅ Started: {name}")
+                if self.module_manager and self.module_manager.initialization_complete:
+                    self.module_manager.trigger_auto_startup_for_instance(name)
+            except Exception as e:
+                self.add_console_message(f"❌ Error starting {name}: {e}")
+
+        threading.Thread(target=start_worker, daemon=True, name=f"Start-{name}").start()
+
+    def stop_instance(self, name: str):
+        def stop_worker():
+            try:
+                if self.module_manager:
+                    self.module_manager.cleanup_for_stopped_instance(name)
+                if self.instance_manager.stop_instance(name):
+                    self.add_console_message(f"✅ Stopped: {name}")
+                else:
+                    self.add_console_message(f"❌ Failed to stop: {name}")
+            except Exception as e:
+                self.add_console_message(f"❌ Error stopping {name}: {e}")
+
+        threading.Thread(target=stop_worker, daemon=True, name=f"Stop-{name}").start()
+
+    def get_status(self) -> Dict:
+        manager = self.module_manager
+        status = {
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "pid": os.getpid(),
+            "instances": self.instance_manager.get_status_summary() if self.instance_manager else {},
+            "modules_ready": bool(manager and manager.initialization_complete),
+            "module_mode": type(manager).__name__ if manager else None,
+            "console_sequence": self.console_count
+        }
+        if self.node_agent:
+            status["node"] = {"name": self.node_agent.node_name, "coordinator": self.node_agent.client.url,
+                              "assigned": sorted(self.node_agent.assigned)}
+        if manager and hasattr(manager, "get_worker_status"):
+            status["workers"] = manager.get_worker_status()
+        status.update(super().get_status())
+        return status
+
+
+def run_daemon(host: str = "127.0.0.1", port: int = DEFAULT_PORT, token: str = None,
+               join: str = None, node_name: str = None):
+    daemon = BensonDaemon(host, port, token, join=join, node_name=node_name)
+    if not daemon.token and not is_loopback(host):
+        # Checked before loading instances; ControlServer.start enforces it too
+        print(f"[Daemon] ❌ Refusing to listen on {host} without BENSON_API_TOKEN - "
+              f"anyone on the network could start, stop or shut down instances")
+        raise SystemExit(2)
+    daemon.run()
@@ -0,0 +1,134 @@
+"""
+BENSON v2.0 - Headless Application Shell
+Provides the parts of the BensonApp interface that managers rely on, without Tk
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict
+
+
+class HeadlessApp:
+    """Tk-free stand-in for BensonApp: after() scheduling, console and empty card list"""
+
+    def __init__(self, instance_manager=None, console_callback: Callable = None, quiet: bool = False):
+        self.instance_manager = instance_manager
+        self.module_manager = None
+        self.instance_cards = []
+        self.console_callback = console_callback
+        self.quiet = quiet
+        self._destroyed = False
+
+        # after() event queue - mirrors Tk's single-threaded callback dispatch
+        self._queue = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._lag_samples = deque(maxlen=10000)
+        self.console_messages = deque(maxlen=1000)
+        self.console_count = 0  # Messages ever added - sequence numbers for attached clients
+
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True, name="HeadlessEvents")
+        self._dispatcher.start()
+
+    # Tk-compatible scheduling
+    def after(self, delay_ms, callback=None, *args):
+        """Schedule callback after delay_ms on the dispatcher thread"""
+        if callback is None:
+            time.sleep(delay_ms / 1000.0)
+            return None
+
+        due = time.monotonic() + max(0, delay_ms) / 1000.0
+        event_id = next(self._sequence)
+        with self._condition:
+            heapq.heappush(self._queue, (due, event_id, callback, args))
+            self._condition.notify()
+        return f"after#{event_id}"
+
+    def after_idle(self, callback, *args):
+        return self.after(0, callback, *args)
+
+    def after_cancel(self, event_id):
+        with self._condition:
+            self._queue = [item for item in self._queue if f"after#{item[1]}" != event_id]
+            heapq.heapify(self._queue)
+
+    def _dispatch_loop(self):
+        while not self._destroyed:
+            with self._condition:
+                while not self._queue and not self._destroyed:
+                    self._condition.wait()
+                if self._destroyed:
+                    return
+
+                due, _, callback, args = self._queue[0]
+                wait_time = due - time.monotonic()
+                if wait_time > 0:
+                    self._condition.wait(wait_time)
+                    continue
+                heapq.heappop(self._queue)
+
+            self._lag_samples.append(time.monotonic() - due)
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"[HeadlessApp] Callback error: {e}")
+
+    def get_event_lag_samples(self, reset: bool = False) -> list:
+        """Seconds between each callback's due time and when it actually ran"""
+        samples = list(self._lag_samples)
+        if reset:
+            self._lag_samples.clear()
+        return samples
+
+    def get_pending_event_count(self) -> int:
+        with self._condition:
+            return len(self._queue)
+
+    # BensonApp interface used by managers
+    def add_console_message(self, message):
+        timestamp = datetime.now().strftime("[%H:%M:%S]")
+        with self._condition:
+            self.console_messages.append(f"{timestamp} {message}")
+            self.console_count += 1
+
+        if self.console_callback:
+            self.console_callback(message)
+        elif not self.quiet:
+            print(f"[Console] {message}")
+
+    def get_console_messages(self, since: int = 0) -> Dict:
+        """Messages after sequence number since (oldest dropped once the buffer is full) and the next sequence"""
+        with self._condition:
+            messages = list(self.console_messages)
+            first = self.console_count - len(messages)
+            return {"messages": messages[max(0, since - first):], "next": self.console_count}
+
+    def force_refresh_instances(self):
+        """No cards to rebuild without a GUI"""
+        pass
+
+    def update_idletasks(self):
+        pass
+
+    def get_status(self) -> Dict:
+        return {
+            "pending_events": self.get_pending_event_count(),
+            "console_messages": len(self.console_messages)
+        }
+
+    def destroy(self):
+        self._destroyed = True
+        with self._condition:
+            self._condition.notify_all()
+        if self.module_manager:
+            try:
+                self.module_manager.stop_all_modules()
+            except Exception as e:
+                print(f"[HeadlessApp] Error stopping modules: {e}")
+        # Let the status loop see the app is gone
+        if self.module_manager:
+            self.module_manager.app = None
@@ -3,21 +3,21 @@ BENSON v2.0 - Silent Instance Manager
 Checks every second but only logs actual changes
 """
 
-import subprocess
 import re
 import time
-import os
 import threading
 
+from core.listvms_parser import ListvmsSnapshotDiffer
+from core.memu_backend import create_backend
+
 
 class InstanceManager:
     """Instance manager with silent frequent monitoring"""
 
-    def __init__(self):
-        self.MEMUC_PATH = r"C:\Program Files\Microvirt\MEmu\memuc.exe"
-        
-        if not os.path.exists(self.MEMUC_PATH):
-            raise FileNotFoundError(f"MEmu not found at {self.MEMUC_PATH}")
+    def __init__(self, backend=None):
+        # Raises FileNotFoundError when the real memuc backend is selected but not installed
+        self.backend = backend or create_backend()
+        self.MEMUC_PATH = self.backend.memuc_path
         
         self.instances = []
         self.app = None
@@ -25,15 +25,25 @@ class InstanceManager:
         self.shared_state = {}  # Add shared state for module communication
         self.silent_mode = True  # Enable silent monitoring
         self.last_error_log_time = 0  # Prevent error spam
+        self.provisioning_template = None  # Golden instance for clone provisioning
+        
+        # Incremental listvms tracking
+        self._snapshot = ListvmsSnapshotDiffer()
+        self._snapshot_lock = threading.Lock()
+        self._instances_by_index = {}
+        self._change_subscribers = []
+        self._refresh_lock = threading.Lock()
+        self._last_listvms_time = 0
+        self.telemetry = None  # Started on demand by start_telemetry()
         
-        print(f"[InstanceManager] Initialized with MEmu at: {self.MEMUC_PATH}")
+        print(f"[InstanceManager] Initialized with {self.backend.name} backend at: {self.MEMUC_PATH}")
 
     def load_real_instances(self, force_refresh=False, log_result=True):
         """Load instances from MEmu with configurable logging"""
         try:
             start_time = time.time()
             
-            result = subprocess.run([self.MEMUC_PATH, "listvms"], capture_output=True, text=True, timeout=30)
+            result = self.backend.run(["listvms"], timeout=30)
             
             elapsed_time = time.time() - start_time
             
@@ -45,19 +55,16 @@ class InstanceManager:
                     self.last_error_log_time = current_time
                 return
 
-            # Parse instances and detect changes
-            new_instances = []
-            for line in result.stdout.strip().split('\n'):
-                if line.strip():
-                    instance = self._parse_instance_line(line)
-                    if instance:
-                        new_instances.append(instance)
+            # Diff against the previous snapshot - unchanged lines are not re-parsed
+            with self._snapshot_lock:
+                self._last_listvms_time = time.time()
+                delta = self._snapshot.update(result.stdout)
+                self._log_parse_errors(self._snapshot.parse_errors)
+                if not delta.is_empty():
+                    self._apply_delta(delta)
             
-            # Detect and log only actual changes
-            changes_detected = self._detect_and_log_changes(new_instances, log_result)
-            
-            # Update instances list
-            self.instances = new_instances
+            # Log and publish only actual changes
+            self._detect_and_log_changes(delta, log_result)
             
             # Log performance only if slow or forced
             if force_refresh and log_result:
@@ -72,117 +79,101 @@ class InstanceManager:
                 print(f"[InstanceManager] Error loading instances: {e}")
                 self.last_error_log_time = current_time
 
-    def _detect_and_log_changes(self, new_instances, log_result=True):
-        """Detect changes and log only significant events"""
-        if not log_result:
-            # Update tracking without logging
-            self._update_state_tracking(new_instances)
-            return False
+    def _apply_delta(self, delta):
+        """Update instance dicts in place so existing references stay current"""
+        for record in delta.removed:
+            self._instances_by_index.pop(record.index, None)
+            self.last_instance_states.pop(record.name, None)
         
-        changes_detected = False
+        for old, record in delta.changed:
+            instance = self._instances_by_index.get(record.index)
+            if instance is None:
+                instance = self._instances_by_index[record.index] = {}
+            instance.update(record.to_instance_dict())
+            if old.name != record.name:
+                self.last_instance_states.pop(old.name, None)
+            self.last_instance_states[record.name] = record.status
         
-        # Create current state map
-        current_states = {inst["name"]: inst["status"] for inst in new_instances}
-        current_names = set(current_states.keys())
-        previous_names = set(self.last_instance_states.keys())
+        for record in delta.added:
+            self._instances_by_index[record.index] = record.to_instance_dict()
+            self.last_instance_states[record.name] = record.status
         
-        # Check for new instances
-        new_names = current_names - previous_names
-        if new_names:
-            for name in new_names:
-                print(f"[InstanceManager] ➕ New instance detected: {name}")
-                changes_detected = True
-        
-        # Check for removed instances
-        removed_names = previous_names - current_names
-        if removed_names:
-            for name in removed_names:
-                print(f"[InstanceManager] ➖ Instance removed: {name}")
-                changes_detected = True
+        self.instances = [self._instances_by_index[index] for index in sorted(self._instances_by_index)]
+
+    def _detect_and_log_changes(self, delta, log_result=True):
+        """Log significant events from a delta and notify subscribers"""
+        changes_detected = not delta.is_empty()
         
-        # Check for status changes
-        for name in current_names.intersection(previous_names):
-            old_status = self.last_instance_states.get(name)
-            new_status = current_states.get(name)
-            
-            if old_status != new_status:
-                print(f"[InstanceManager] 🔄 {name}: {old_status} → {new_status}")
+        if log_result:
+            for record in delta.added:
+                print(f"[InstanceManager] ➕ New instance detected: {record.name}")
+            for record in delta.removed:
+                print(f"[InstanceManager] ➖ Instance removed: {record.name}")
+            for old, new in delta.changed:
+                if old.name != new.name:
+                    print(f"[InstanceManager] ✏️ {old.name} renamed to {new.name}")
+                if old.status != new.status:
+                    print(f"[InstanceManager] 🔄 {new.name}: {old.status} → {new.status}")
+            
+            # Log summary only if this is the first load
+            if not hasattr(self, '_initial_load_complete'):
+                print(f"[InstanceManager] Loaded {len(self.instances)} instances")
+                self._initial_load_complete = True
                 changes_detected = True
         
-        # Update tracking
-        self.last_instance_states = current_states.copy()
-        
-        # Log summary only if this is the first load
-        if not hasattr(self, '_initial_load_complete'):
-            print(f"[InstanceManager] Loaded {len(new_instances)} instances")
-            self._initial_load_complete = True
-            changes_detected = True
+        if not delta.is_empty():
+            for callback in list(self._change_subscribers):
+                try:
+                    callback(delta)
+                except Exception as e:
+                    print(f"[InstanceManager] Change subscriber error: {e}")
         
         return changes_detected
 
-    def _update_state_tracking(self, new_instances):
-        """Update state tracking without logging"""
-        current_states = {inst["name"]: inst["status"] for inst in new_instances}
-        self.last_instance_states = current_states.copy()
-
-    def _parse_instance_line(self, line):
-        """Parse single instance line from MEmu output"""
-        try:
-            parts = line.split(',')
-            if len(parts) >= 3:
-                index = int(parts[0])
-                name = parts[1]
-                status = self._determine_status(parts[2:])
-                
-                instance = {"index": index, "name": name, "status": status}
-                return instance
-        except Exception as e:
-            # Only log parsing errors occasionally to avoid spam
-            current_time = time.time()
-            if not hasattr(self, '_last_parse_error_time'):
-                self._last_parse_error_time = 0
-            
-            if (current_time - self._last_parse_error_time) > 300:  # Every 5 minutes
-                print(f"[InstanceManager] Error parsing line: {e}")
-                self._last_parse_error_time = current_time
+    def subscribe_instance_changes(self, callback):
+        """Receive InstanceDelta (added/removed/changed records) after each listvms poll"""
+        if callback not in self._change_subscribers:
+            self._change_subscribers.append(callback)
+
+    def unsubscribe_instance_changes(self, callback):
+        """Stop receiving instance deltas"""
+        if callback in self._change_subscribers:
+            self._change_subscribers.remove(callback)
+
+    def get_instance_record(self, name):
+        """Get the typed listvms record (pid, handle, disk usage) for an instance"""
+        with self._snapshot_lock:
+            records = list(self._snapshot.records.values())
+        for record in records:
+            if record.name == name:
+                return record
         return None
 
-    def _determine_status(self, status_parts):
-        """Determine instance status from MEmu output"""
-        try:
-            if not status_parts:
-                return "Stopped"
-            
-            # Handle different MEmu output formats
-            first_val = status_parts[0]
-            
-            if first_val.isdigit():
-                val = int(first_val)
-                # Large number likely means memory allocation (running)
-                if val > 1000000:
-                    return "Running"
-                elif val == 1:
-                    return "Running"
-                elif val == 2:
-                    return "Starting"
-                elif val == 3:
-                    return "Stopping"
-                else:
-                    return "Running" if val > 0 else "Stopped"
-            
-            return "Stopped"
-            
-        except Exception:
-            return "Unknown"
+    def _log_parse_errors(self, errors):
+        """Only log parsing errors occasionally to avoid spam"""
+        if not errors:
+            return
+        
+        current_time = time.time()
+        if not hasattr(self, '_last_parse_error_time'):
+            self._last_parse_error_time = 0
+        
+        if (current_time - self._last_parse_error_time) > 300:  # Every 5 minutes
+            print(f"[InstanceManager] Error parsing line: {errors[0]}")
+            self._last_parse_error_time = current_time
 
     def create_instance_with_name(self, name):
         """Create instance with optimized process"""
+        if self.provisioning_template:
+            results = self.provision_instances_from_template([name])
+            return any(result.get("success") for result in results.values())
+        
         try:
             sanitized_name = re.sub(r'[^a-zA-Z0-9_-]', '', name)[:50]
             print(f"[InstanceManager] ⚡ Creating instance...")
             
             # Create instance
-            result = subprocess.run([self.MEMUC_PATH, "create"], capture_output=True, text=True, timeout=120)
+            result = self.backend.run(["create"], timeout=120)
             
             if result.returncode != 0:
                 print(f"[InstanceManager] ❌ Failed to create instance")
@@ -220,14 +211,12 @@ class InstanceManager:
                 # Basic optimization
                 settings = [("-memory", "2048"), ("-cpu", "2"), ("-resolution", "480x800")]
                 for param, value in settings:
-                    subprocess.run([self.MEMUC_PATH, "configure", "-i", str(index), param, value],
-                                 capture_output=True, timeout=10)
+                    self.backend.run(["configure", "-i", str(index), param, value], timeout=10)
                     time.sleep(0.3)
                 
                 # Background rename
                 if name and name != f"MEmu{index}":
-                    subprocess.run([self.MEMUC_PATH, "rename", "-i", str(index), name],
-                                 capture_output=True, timeout=10)
+                    self.backend.run(["rename", "-i", str(index), name], timeout=10)
                 
                 # Refresh instances with logging
                 time.sleep(1)
@@ -240,6 +229,65 @@ class InstanceManager:
         
         threading.Thread(target=optimize_worker, daemon=True).start()
 
+    # Resource telemetry
+    def start_telemetry(self, interval=5.0, history_size=120):
+        """Start sampling CPU/memory/IO of each VM process by its listvms PID"""
+        if self.telemetry is None:
+            from core.resource_telemetry import ResourceTelemetryCollector
+            self.telemetry = ResourceTelemetryCollector(self, interval=interval, history_size=history_size)
+        return self.telemetry.start()
+
+    def stop_telemetry(self):
+        """Stop resource sampling"""
+        if self.telemetry:
+            self.telemetry.stop()
+
+    def get_instance_telemetry(self, name):
+        """Latest resource sample for an instance, or None"""
+        return self.telemetry.get_latest(name) if self.telemetry else None
+
+    def get_instance_resource_history(self, name):
+        """Ring buffer history of resource samples for an instance"""
+        return self.telemetry.get_history(name) if self.telemetry else []
+
+    def get_top_resource_consumers(self, count=5, key="cpu_percent"):
+        """Instances using the most CPU (or another sample field) right now"""
+        return self.telemetry.get_top_consumers(count, key) if self.telemetry else []
+
+    # Template provisioning
+    def prepare_golden_instance(self, name):
+        """Configure an instance once and use it as the clone template"""
+        instance = self.get_instance_by_name(name)
+        if not instance:
+            print(f"[InstanceManager] Golden instance {name} not found")
+            return False
+        
+        if not self.optimize_instance_settings(name):
+            print(f"[InstanceManager] ⚠️ Golden instance {name} only partially configured")
+        
+        self.provisioning_template = name
+        print(f"[InstanceManager] 🏆 Clone provisioning enabled from: {name}")
+        return True
+
+    def disable_template_provisioning(self):
+        """Return to memuc create provisioning"""
+        self.provisioning_template = None
+        print("[InstanceManager] Clone provisioning disabled")
+
+    def provision_instances_from_template(self, names, template_name=None, max_parallel_clones=2,
+                                          progress_callback=None):
+        """Provision a batch of instances by cloning the golden instance"""
+        from core.instance_provisioner import InstanceProvisioner
+        
+        template = template_name or self.provisioning_template
+        if not template:
+            print("[InstanceManager] ❌ No golden instance configured for provisioning")
+            return {}
+        
+        provisioner = InstanceProvisioner(self, template, max_parallel_clones=max_parallel_clones,
+                                          progress_callback=progress_callback)
+        return provisioner.provision(names)
+
     # Core operations
     def start_instance(self, name):
         """Start instance by name"""
@@ -270,8 +318,8 @@ class InstanceManager:
                 print(f"[InstanceManager] Instance {name} not found")
                 return False
             
-            cmd = [self.MEMUC_PATH, operation, "-i", str(instance["index"])]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+            cmd = [operation, "-i", str(instance["index"])]
+            result = self.backend.run(cmd, timeout=timeout)
             
             success = result.returncode == 0
             status = "successfully" if success else "failed"
@@ -331,6 +379,13 @@ class InstanceManager:
                 print(f"[InstanceManager] Background update error: {e}")
                 self._silent_error_time = current_time
 
+    def refresh_statuses(self, max_age: float = 1.0):
+        """Shared, rate-limited status refresh - callers within max_age of the last listvms reuse it"""
+        with self._refresh_lock:
+            if time.time() - self._last_listvms_time < max_age:
+                return
+            self.update_instance_statuses()
+
     def optimize_instance_settings(self, name, verify=False):
         """Optimize instance settings"""
         try:
@@ -346,8 +401,7 @@ class InstanceManager:
             success_count = 0
             for param, value in settings:
                 try:
-                    result = subprocess.run([self.MEMUC_PATH, "configure", "-i", str(index), param, value],
-                                          capture_output=True, text=True, timeout=15)
+                    result = self.backend.run(["configure", "-i", str(index), param, value], timeout=15)
                     if result.returncode == 0:
                         success_count += 1
                     time.sleep(0.5)
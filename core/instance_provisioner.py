@@ -0,0 +1,280 @@
+"""
+BENSON v2.0 - Template Clone Provisioner
+Creates new instances by cloning a pre-configured golden instance
+"""
+
+import queue
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+
+class InstanceProvisioner:
+    """Pipelined clone -> rename -> refresh provisioning from a golden instance"""
+
+    def __init__(self, instance_manager, template_name: str, max_parallel_clones: int = 2,
+                 progress_callback: Callable = None):
+        self.instance_manager = instance_manager
+        self.template_name = template_name
+        self.max_parallel_clones = max(1, int(max_parallel_clones))
+        self.progress_callback = progress_callback
+
+        # Pipeline queues
+        self.clone_queue = queue.Queue()
+        self.rename_queue = queue.Queue()
+        self.refresh_queue = queue.Queue()
+
+        # Index discovery - parallel clones must not claim the same new index
+        self.index_lock = threading.Condition()
+        self.claimed_indices = set()
+        self.cloning = 0
+
+        # The last clone worker out stops the rename stage, so late clones still get renamed
+        self.clone_workers_left = 0
+
+        self.results = {}
+        self.results_lock = threading.Lock()
+
+    def provision(self, names: List[str], timeout: float = 1800) -> Dict[str, Dict]:
+        """Provision all names and block until the pipeline drains"""
+        template = self.instance_manager.get_instance_by_name(self.template_name)
+        if not template:
+            print(f"[Provisioner] ❌ Golden instance {self.template_name} not found")
+            return {name: {"success": False, "index": None, "error": "template not found"} for name in names}
+
+        if template["status"] != "Stopped":
+            print(f"[Provisioner] ⚠️ Golden instance {self.template_name} is {template['status']} - clones may fail")
+
+        taken = {inst["name"] for inst in self.instance_manager.get_instances()}
+        sanitized = []
+        for raw_name in names:
+            if not raw_name or not raw_name.strip():
+                continue
+            name = self._sanitize_name(raw_name)
+            if not name:
+                print(f"[Provisioner] ❌ Name {raw_name!r} has no valid characters - skipped")
+                self.results[raw_name] = {"success": False, "index": None, "error": "invalid name",
+                                         "started": time.time()}
+                continue
+            unique = self._unique_name(name, taken)
+            if unique != name:
+                print(f"[Provisioner] ⚠️ Name {name} already used - provisioning as {unique}")
+            taken.add(unique)
+            sanitized.append(unique)
+
+        if not sanitized:
+            return dict(self.results)
+
+        print(f"[Provisioner] ⚡ Provisioning {len(sanitized)} instances from {self.template_name} "
+              f"({self.max_parallel_clones} parallel clones)")
+
+        start_time = time.time()
+        with self.index_lock:
+            self.claimed_indices = {inst["index"] for inst in self.instance_manager.get_instances()}
+
+        for name in sanitized:
+            self.results[name] = {"success": False, "index": None, "error": None, "started": time.time()}
+            self.clone_queue.put(name)
+
+        clone_count = min(self.max_parallel_clones, len(sanitized))
+        self.clone_workers_left = clone_count
+        workers = [threading.Thread(target=self._clone_worker, args=(template["index"],),
+                                    daemon=True, name=f"Provision-Clone-{i}")
+                   for i in range(clone_count)]
+        workers.append(threading.Thread(target=self._rename_worker, daemon=True, name="Provision-Rename"))
+        workers.append(threading.Thread(target=self._refresh_worker, daemon=True, name="Provision-Refresh"))
+
+        for worker in workers:
+            worker.start()
+
+        # Each stage stops the next one once it has drained, so waiting on refresh covers all
+        for _ in range(clone_count):
+            self.clone_queue.put(None)
+        workers[-1].join(timeout=max(0, start_time + timeout - time.time()))
+        if workers[-1].is_alive():
+            print(f"[Provisioner] ⚠️ Timed out after {timeout:.0f}s - remaining clones finish in the background")
+
+        elapsed = time.time() - start_time
+        succeeded = len([r for r in self.results.values() if r["success"]])
+        print(f"[Provisioner] ✅ Provisioned {succeeded}/{len(sanitized)} instances in {elapsed:.1f}s")
+
+        for result in self.results.values():
+            result["duration"] = time.time() - result.pop("started", time.time())
+        return dict(self.results)
+
+    def _clone_worker(self, template_index: int):
+        """Clone stage - bounded by max_parallel_clones (disk throughput)"""
+        while True:
+            name = self.clone_queue.get()
+            if name is None:
+                with self.index_lock:
+                    self.clone_workers_left -= 1
+                    last_out = self.clone_workers_left == 0
+                if last_out:
+                    self.rename_queue.put(None)
+                return
+
+            try:
+                snapshot = self._begin_clone()
+                try:
+                    result = self.instance_manager.backend.run(["clone", "-i", str(template_index)], timeout=300)
+                finally:
+                    self._end_clone()
+
+                if result.returncode != 0:
+                    self._fail(name, "clone", result.stderr.strip() or "clone failed")
+                    continue
+
+                new_index = self._claim_new_index(result.stdout, snapshot)
+                if new_index is None:
+                    self._fail(name, "clone", "could not determine cloned index")
+                    continue
+
+                self._set_result(name, index=new_index)
+                self._notify(name, "cloned", True)
+                self.rename_queue.put((name, new_index))
+
+            except Exception as e:
+                self._fail(name, "clone", str(e))
+
+    def _rename_worker(self):
+        """Rename stage - only per-instance change applied to a clone"""
+        while True:
+            item = self.rename_queue.get()
+            if item is None:
+                self.refresh_queue.put(None)
+                return
+
+            name, index = item
+            try:
+                result = self.instance_manager.backend.run(["rename", "-i", str(index), name], timeout=15)
+                if result.returncode != 0:
+                    self._fail(name, "rename", result.stderr.strip() or "rename failed")
+                    continue
+
+                self._notify(name, "renamed", True)
+                self.refresh_queue.put(name)
+
+            except Exception as e:
+                self._fail(name, "rename", str(e))
+
+    def _refresh_worker(self):
+        """Refresh stage - coalesces completed instances into one listvms call"""
+        finished = False
+        while not finished:
+            item = self.refresh_queue.get()
+            batch = []
+            if item is None:
+                finished = True
+            else:
+                batch.append(item)
+
+            # Drain whatever else is ready so one refresh covers the batch
+            while True:
+                try:
+                    item = self.refresh_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    finished = True
+                else:
+                    batch.append(item)
+
+            if not batch:
+                continue
+
+            try:
+                self.instance_manager.load_real_instances(force_refresh=True, log_result=True)
+                for name in batch:
+                    found = self.instance_manager.get_instance_by_name(name) is not None
+                    self._set_result(name, success=found, error=None if found else "not listed after rename")
+                    self._notify(name, "ready", found)
+
+                app = self.instance_manager.app
+                if app:
+                    app.after(0, app.force_refresh_instances)
+
+            except Exception as e:
+                for name in batch:
+                    self._fail(name, "refresh", str(e))
+
+    def _begin_clone(self) -> set:
+        """Snapshot the indices that exist before this clone starts"""
+        with self.index_lock:
+            snapshot = set(self.claimed_indices)
+            snapshot |= self._list_indices() or set()
+            self.cloning += 1
+            return snapshot
+
+    def _end_clone(self):
+        with self.index_lock:
+            self.cloning -= 1
+            self.index_lock.notify_all()
+
+    def _claim_new_index(self, clone_output: str, snapshot: set) -> Optional[int]:
+        """Get the cloned index from output, falling back to a listvms diff against the pre-clone snapshot"""
+        with self.index_lock:
+            new_index = self.instance_manager._extract_new_index(clone_output)
+            if new_index is not None and new_index not in self.claimed_indices:
+                self.claimed_indices.add(new_index)
+                return new_index
+
+            # A clone still running may already be listed - only diff once every clone has finished
+            if not self.index_lock.wait_for(lambda: self.cloning == 0, timeout=300):
+                return None
+
+            current = self._list_indices()
+            if current is None:
+                return None
+
+            unclaimed = sorted(current - snapshot - self.claimed_indices)
+            if not unclaimed:
+                return None
+
+            self.claimed_indices.add(unclaimed[0])
+            return unclaimed[0]
+
+    def _list_indices(self) -> Optional[set]:
+        result = self.instance_manager.backend.run(["listvms"], timeout=30)
+        if result.returncode != 0:
+            return None
+
+        indices = set()
+        for line in result.stdout.strip().split('\n'):
+            parts = line.split(',')
+            if parts and parts[0].strip().isdigit():
+                indices.add(int(parts[0]))
+        return indices
+
+    def _sanitize_name(self, name: str) -> str:
+        """Apply the same name rules as create_instance_with_name"""
+        return re.sub(r'[^a-zA-Z0-9_-]', '', name.strip())[:50]
+
+    def _unique_name(self, name: str, taken: set) -> str:
+        """Suffix duplicate names so every clone gets its own, still within 50 characters"""
+        if name not in taken:
+            return name
+        suffix = 2
+        while True:
+            tail = f"_{suffix}"
+            candidate = name[:50 - len(tail)] + tail
+            if candidate not in taken:
+                return candidate
+            suffix += 1
+
+    def _set_result(self, name: str, **values):
+        with self.results_lock:
+            self.results[name].update(values)
+
+    def _fail(self, name: str, stage: str, error: str):
+        print(f"[Provisioner] ❌ {name} failed at {stage}: {error}")
+        self._set_result(name, success=False, error=f"{stage}: {error}")
+        self._notify(name, stage, False)
+
+    def _notify(self, name: str, stage: str, success: bool):
+        if self.progress_callback:
+            try:
+                self.progress_callback(name, stage, success)
+            except Exception as e:
+                print(f"[Provisioner] Progress callback error: {e}")
@@ -0,0 +1,161 @@
+"""
+BENSON v2.0 - memuc listvms Parser
+Typed records for every listvms column and one-pass snapshot diffing
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class VMRecord:
+    """One listvms line: index,title,window handle,android started,pid[,disk usage]"""
+    index: int
+    name: str
+    handle: int = 0
+    android_started: Optional[int] = None
+    pid: int = 0
+    disk_usage: Optional[int] = None
+    legacy_status: Optional[str] = None
+
+    @property
+    def status(self) -> str:
+        if self.android_started is None:
+            return self.legacy_status or "Unknown"
+        if self.android_started == 1:
+            return "Running"
+        if self.handle > 0 or self.pid > 0:
+            return "Starting"
+        return "Stopped"
+
+    def to_instance_dict(self) -> Dict:
+        """Instance dict in the shape the rest of the app expects"""
+        return {
+            "index": self.index,
+            "name": self.name,
+            "status": self.status,
+            "pid": self.pid or None,
+            "disk_usage": self.disk_usage
+        }
+
+
+@dataclass
+class InstanceDelta:
+    """Instances added, removed or changed between two listvms snapshots"""
+    added: List[VMRecord] = field(default_factory=list)
+    removed: List[VMRecord] = field(default_factory=list)
+    changed: List[Tuple[VMRecord, VMRecord]] = field(default_factory=list)
+
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+    def status_changes(self) -> List[Tuple[VMRecord, VMRecord]]:
+        """Changed pairs whose status differs"""
+        return [(old, new) for old, new in self.changed if old.status != new.status]
+
+
+def _to_int(value: str) -> Optional[int]:
+    value = value.strip()
+    return int(value) if value.lstrip('-').isdigit() else None
+
+
+def _legacy_status(columns: List[str]) -> str:
+    """Status guess for short listvms formats without the android-started column"""
+    if not columns:
+        return "Stopped"
+
+    val = _to_int(columns[0])
+    if val is None:
+        return "Stopped"
+    if val == 2:
+        return "Starting"
+    if val == 3:
+        return "Stopping"
+    return "Running" if val > 0 else "Stopped"
+
+
+def parse_listvms_line(line: str) -> Optional[VMRecord]:
+    """Parse one listvms line - returns None for blank or malformed lines"""
+    parts = line.strip().split(',')
+    if len(parts) < 3:
+        return None
+
+    index = _to_int(parts[0])
+    if index is None:
+        return None
+    name = parts[1]
+
+    if len(parts) < 5:
+        return VMRecord(index=index, name=name, legacy_status=_legacy_status(parts[2:]))
+
+    return VMRecord(
+        index=index,
+        name=name,
+        handle=_to_int(parts[2]) or 0,
+        android_started=_to_int(parts[3]) or 0,
+        pid=_to_int(parts[4]) or 0,
+        disk_usage=_to_int(parts[5]) if len(parts) > 5 else None
+    )
+
+
+def parse_listvms(output: str) -> Dict[int, VMRecord]:
+    """Parse full listvms output into records keyed by index"""
+    records = {}
+    for line in output.strip().split('\n'):
+        if line.strip():
+            record = parse_listvms_line(line)
+            if record:
+                records[record.index] = record
+    return records
+
+
+class ListvmsSnapshotDiffer:
+    """Keeps the previous listvms snapshot and emits only deltas"""
+
+    def __init__(self):
+        self.raw_output = None
+        self.raw_lines = {}
+        self.records = {}
+        self.parse_errors = []
+
+    def update(self, output: str) -> InstanceDelta:
+        """Apply new listvms output; only lines that changed are re-parsed"""
+        self.parse_errors = []
+        if output == self.raw_output:
+            return InstanceDelta()
+
+        delta = InstanceDelta()
+        new_lines = {}
+        new_records = {}
+
+        for line in output.strip().split('\n'):
+            if not line.strip():
+                continue
+
+            key = line.split(',', 1)[0].strip()
+            previous = self.raw_lines.get(key)
+            if previous == line and key.isdigit() and int(key) in self.records:
+                record = self.records[int(key)]
+            else:
+                record = parse_listvms_line(line)
+                if not record:
+                    self.parse_errors.append(f"malformed listvms line: {line!r}")
+                    continue
+
+                old = self.records.get(record.index)
+                if old is None:
+                    delta.added.append(record)
+                elif old != record:
+                    delta.changed.append((old, record))
+                else:
+                    record = old
+
+            new_lines[key] = line
+            new_records[record.index] = record
+
+        delta.removed = [record for index, record in self.records.items() if index not in new_records]
+
+        self.raw_output = output
+        self.raw_lines = new_lines
+        self.records = new_records
+        return delta
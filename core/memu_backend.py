@@ -0,0 +1,67 @@
+"""
+BENSON v2.0 - MEmu Command Backends
+Single entry point for every memuc/ADB call so the emulator can be swapped out
+"""
+
+import os
+import subprocess
+from typing import List
+
+
+MEMUC_DEFAULT_PATH = r"C:\Program Files\Microvirt\MEmu\memuc.exe"
+
+
+class MemuBackend:
+    """Interface for running memuc commands - override run() in implementations"""
+
+    name = "base"
+    memuc_path = "memuc"
+
+    def run(self, args: List[str], timeout: float = 60, text: bool = True) -> subprocess.CompletedProcess:
+        """Run memuc with args (without the executable) and return the completed process"""
+        raise NotImplementedError
+
+    def adb(self, instance_index: int, args: List[str], timeout: float = 15,
+            text: bool = True) -> subprocess.CompletedProcess:
+        """Run an ADB command against one instance through memuc"""
+        return self.run(["adb", "-i", str(instance_index)] + list(args), timeout=timeout, text=text)
+
+    def shell(self, instance_index: int, args: List[str], timeout: float = 15,
+              text: bool = True) -> subprocess.CompletedProcess:
+        """Run an ADB shell command against one instance"""
+        return self.adb(instance_index, ["shell"] + list(args), timeout=timeout, text=text)
+
+
+class MemucBackend(MemuBackend):
+    """Real backend - runs memuc.exe as a subprocess"""
+
+    name = "memuc"
+
+    def __init__(self, memuc_path: str = None):
+        self.memuc_path = memuc_path or MEMUC_DEFAULT_PATH
+
+        if not os.path.exists(self.memuc_path):
+            raise FileNotFoundError(f"MEmu not found at {self.memuc_path}")
+
+    def run(self, args: List[str], timeout: float = 60, text: bool = True) -> subprocess.CompletedProcess:
+        return subprocess.run([self.memuc_path] + list(args), capture_output=True, text=text, timeout=timeout)
+
+
+def create_backend(kind: str = None, **options) -> MemuBackend:
+    """Create a backend by name - defaults to BENSON_BACKEND env var, then real memuc
+
+    BENSON_BACKEND=sim selects the simulator; BENSON_SIM_INSTANCES and
+    BENSON_SIM_FRAMES configure its instance count and recorded frames directory.
+    """
+    kind = (kind or os.environ.get("BENSON_BACKEND") or "memuc").lower()
+
+    if kind in ("sim", "simulated", "fake"):
+        from core.simulated_backend import SimulatedMemuBackend
+        options.setdefault("instance_count", int(os.environ.get("BENSON_SIM_INSTANCES", "4")))
+        options.setdefault("frames_dir", os.environ.get("BENSON_SIM_FRAMES"))
+        return SimulatedMemuBackend(**options)
+
+    if kind == "memuc":
+        return MemucBackend(options.get("memuc_path") or os.environ.get("BENSON_MEMUC_PATH"))
+
+    raise ValueError(f"Unknown MEmu backend: {kind}")
@@ -0,0 +1,221 @@
+"""
+BENSON v2.0 - Instance Resource Telemetry
+Samples CPU, memory and I/O of each MEmu VM process on a background thread
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional
+
+# Safe imports
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+@dataclass
+class ResourceSample:
+    """One telemetry sample for an instance (process tree of its listvms PID)"""
+    timestamp: float
+    pid: int
+    cpu_percent: float
+    memory_mb: float
+    read_bytes_per_sec: float = 0.0
+    write_bytes_per_sec: float = 0.0
+    process_count: int = 1
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class ResourceTelemetryCollector:
+    """Background sampler with a ring buffer of history per instance"""
+
+    def __init__(self, instance_manager, interval: float = 5.0, history_size: int = 120):
+        self.instance_manager = instance_manager
+        self.interval = interval
+        self.history_size = history_size
+
+        self.history = {}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+        # psutil Process handles per PID - cpu_percent() needs the same object between calls
+        self._processes = {}
+        self._io_totals = {}
+        # Child PIDs found under each listvms PID on the last sample
+        self._children = {}
+
+    def is_available(self) -> bool:
+        return PSUTIL_AVAILABLE or hasattr(self.instance_manager.backend, "sample_process")
+
+    def start(self) -> bool:
+        """Start sampling in the background"""
+        if self.thread and self.thread.is_alive():
+            return True
+
+        if not self.is_available():
+            print("[Telemetry] ⚠️ psutil not installed - install with: pip install psutil")
+            return False
+
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._sample_loop, daemon=True, name="ResourceTelemetry")
+        self.thread.start()
+        print(f"[Telemetry] ✅ Sampling instance resources every {self.interval}s")
+        return True
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=5)
+
+    def _sample_loop(self):
+        while not self.stop_event.is_set():
+            try:
+                self.sample_once()
+            except Exception as e:
+                print(f"[Telemetry] Sampling error: {e}")
+            self.stop_event.wait(self.interval)
+
+    def sample_once(self):
+        """Take one sample for every instance with a PID"""
+        now = time.time()
+        seen_pids = set()
+
+        for instance in list(self.instance_manager.get_instances()):
+            pid = instance.get("pid")
+            if not pid:
+                continue
+
+            seen_pids.add(pid)
+            sample = self._sample_pid(pid, now)
+            # Keep the children's handles too, or their cpu_percent() restarts from zero every sample
+            seen_pids |= self._children.get(pid, set())
+            if sample is None:
+                continue
+
+            with self.lock:
+                history = self.history.get(instance["name"])
+                if history is None:
+                    history = self.history[instance["name"]] = deque(maxlen=self.history_size)
+                history.append(sample)
+
+        # Forget processes that went away
+        for pid in list(self._processes):
+            if pid not in seen_pids:
+                self._processes.pop(pid, None)
+                self._io_totals.pop(pid, None)
+                self._children.pop(pid, None)
+
+        # Drop history for removed instances
+        names = {inst["name"] for inst in self.instance_manager.get_instances()}
+        with self.lock:
+            for name in list(self.history):
+                if name not in names:
+                    del self.history[name]
+
+    def _sample_pid(self, pid: int, now: float) -> Optional[ResourceSample]:
+        backend = self.instance_manager.backend
+        if hasattr(backend, "sample_process"):
+            stats = backend.sample_process(pid)
+            if not stats:
+                return None
+            cpu, memory, read_bytes, write_bytes, count = (stats["cpu_percent"], stats["memory_mb"],
+                                                           stats["read_bytes"], stats["write_bytes"], 1)
+        elif PSUTIL_AVAILABLE:
+            stats = self._sample_process_tree(pid)
+            if not stats:
+                return None
+            cpu, memory, read_bytes, write_bytes, count = stats
+        else:
+            return None
+
+        read_rate = write_rate = 0.0
+        previous = self._io_totals.get(pid)
+        if previous:
+            elapsed = max(now - previous[0], 1e-6)
+            read_rate = max(0.0, (read_bytes - previous[1]) / elapsed)
+            write_rate = max(0.0, (write_bytes - previous[2]) / elapsed)
+        self._io_totals[pid] = (now, read_bytes, write_bytes)
+
+        return ResourceSample(timestamp=now, pid=pid, cpu_percent=round(cpu, 1), memory_mb=round(memory, 1),
+                              read_bytes_per_sec=round(read_rate), write_bytes_per_sec=round(write_rate),
+                              process_count=count)
+
+    def _sample_process_tree(self, pid: int):
+        """Sum CPU/memory/IO for the listvms PID and its children (MEmuHeadless)"""
+        try:
+            root = self._processes.get(pid)
+            if root is None:
+                root = self._processes[pid] = psutil.Process(pid)
+                root.cpu_percent(None)
+
+            processes = [root]
+            children = set()
+            for child in root.children(recursive=True):
+                cached = self._processes.get(child.pid)
+                if cached is None:
+                    cached = self._processes[child.pid] = child
+                    cached.cpu_percent(None)
+                processes.append(cached)
+                children.add(child.pid)
+            self._children[pid] = children
+
+            cpu = memory = read_bytes = write_bytes = 0
+            for process in processes:
+                try:
+                    with process.oneshot():
+                        cpu += process.cpu_percent(None)
+                        memory += process.memory_info().rss
+                        if hasattr(process, "io_counters"):
+                            io = process.io_counters()
+                            read_bytes += io.read_bytes
+                            write_bytes += io.write_bytes
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+
+            return cpu, memory / (1024 * 1024), read_bytes, write_bytes, len(processes)
+
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            self._processes.pop(pid, None)
+            self._children.pop(pid, None)
+            return None
+
+    # Query methods
+    def get_latest(self, instance_name: str) -> Optional[ResourceSample]:
+        with self.lock:
+            history = self.history.get(instance_name)
+            return history[-1] if history else None
+
+    def get_history(self, instance_name: str) -> List[ResourceSample]:
+        with self.lock:
+            return list(self.history.get(instance_name, []))
+
+    def get_all_latest(self) -> Dict[str, ResourceSample]:
+        with self.lock:
+            return {name: history[-1] for name, history in self.history.items() if history}
+
+    def get_average(self, instance_name: str, window_seconds: float = 60) -> Optional[Dict]:
+        """Average usage over the last window_seconds"""
+        cutoff = time.time() - window_seconds
+        samples = [s for s in self.get_history(instance_name) if s.timestamp >= cutoff]
+        if not samples:
+            return None
+        return {
+            "cpu_percent": round(sum(s.cpu_percent for s in samples) / len(samples), 1),
+            "memory_mb": round(sum(s.memory_mb for s in samples) / len(samples), 1),
+            "read_bytes_per_sec": round(sum(s.read_bytes_per_sec for s in samples) / len(samples)),
+            "write_bytes_per_sec": round(sum(s.write_bytes_per_sec for s in samples) / len(samples)),
+            "samples": len(samples)
+        }
+
+    def get_top_consumers(self, count: int = 5, key: str = "cpu_percent") -> List[tuple]:
+        """Instances using the most of a resource in their latest sample"""
+        latest = self.get_all_latest()
+        ranked = sorted(latest.items(), key=lambda item: getattr(item[1], key), reverse=True)
+        return ranked[:count]
@@ -0,0 +1,396 @@
+"""
+BENSON v2.0 - Simulated MEmu Backend
+Local stand-in for memuc/ADB used for offline testing and load simulation
+"""
+
+import os
+import random
+import shlex
+import struct
+import subprocess
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional
+
+from core.memu_backend import MemuBackend
+
+
+# Default per-operation latencies in seconds - a number or a (min, max) range
+DEFAULT_LATENCIES = {
+    "listvms": (0.02, 0.08),
+    "start": (0.5, 1.5),
+    "stop": (0.2, 0.5),
+    "create": (1.0, 2.0),
+    "clone": (1.0, 3.0),
+    "remove": (0.2, 0.5),
+    "rename": (0.02, 0.05),
+    "configure": (0.02, 0.05),
+    "screencap": (0.08, 0.2),
+    "pull": (0.03, 0.1),
+    "tap": (0.02, 0.06),
+    "shell": (0.01, 0.03),
+    "script": (0.02, 0.06),   # One shell call running a multi-command script (action batches)
+}
+
+
+class SimulatedInstance:
+    """State of one simulated VM"""
+
+    def __init__(self, index: int, name: str, disk_usage: int):
+        self.index = index
+        self.name = name
+        self.disk_usage = disk_usage
+        self.running = False
+        self.started_at = None
+        self.pid = 0
+        self.handle = 0
+        self.frame_position = 0
+        self.device_files = {}
+        self.taps = []
+
+
+class SimulatedMemuBackend(MemuBackend):
+    """Emulates listvms, lifecycle commands, screencap and input over in-memory VMs"""
+
+    name = "simulated"
+    memuc_path = "memuc-sim"
+
+    def __init__(self, instance_count: int = 4, frames_dir: str = None, latencies: Dict = None,
+                 failure_rates: Dict = None, boot_time: float = 2.0, latency_scale: float = 1.0,
+                 seed: int = None, name_prefix: str = "MEmu"):
+        self.latencies = dict(DEFAULT_LATENCIES)
+        self.latencies.update(latencies or {})
+        self.failure_rates = dict(failure_rates or {})
+        self.boot_time = boot_time
+        self.latency_scale = latency_scale
+        self.name_prefix = name_prefix
+
+        self.random = random.Random(seed)
+        self.lock = threading.RLock()
+        self.instances = {}
+        self.next_pid = 20000
+
+        # Recorded frames served by screencap
+        self.frames_dir = frames_dir
+        self.shared_frames = []
+        self.instance_frames = {}
+        self._frame_cache = {}
+        self._synthetic_frame = None
+        self._load_frames()
+
+        # Call statistics for load simulation
+        self.call_stats = {}
+        self.stats_lock = threading.Lock()
+
+        for index in range(instance_count):
+            name = self.name_prefix if index == 0 else f"{self.name_prefix}_{index}"
+            self._add_instance(index, name)
+
+        print(f"[SimulatedBackend] Ready with {instance_count} simulated instances")
+
+    # Frame handling
+    def _load_frames(self):
+        """Load recorded frames - subdirectories named by index or instance name are per-instance"""
+        if not self.frames_dir or not os.path.isdir(self.frames_dir):
+            return
+
+        for entry in sorted(os.listdir(self.frames_dir)):
+            path = os.path.join(self.frames_dir, entry)
+            if os.path.isdir(path):
+                frames = [os.path.join(path, f) for f in sorted(os.listdir(path)) if f.lower().endswith('.png')]
+                if frames:
+                    self.instance_frames[entry] = frames
+            elif entry.lower().endswith('.png'):
+                self.shared_frames.append(path)
+
+    def set_frame_sequence(self, instance_key, frame_paths: List[str]):
+        """Set the frames served for an instance (index or name)"""
+        with self.lock:
+            self.instance_frames[str(instance_key)] = list(frame_paths)
+            for instance in self.instances.values():
+                if str(instance.index) == str(instance_key) or instance.name == str(instance_key):
+                    instance.frame_position = 0
+
+    def _next_frame(self, instance: SimulatedInstance) -> bytes:
+        frames = (self.instance_frames.get(str(instance.index)) or
+                  self.instance_frames.get(instance.name) or self.shared_frames)
+        if not frames:
+            return self._get_synthetic_frame()
+
+        path = frames[instance.frame_position % len(frames)]
+        instance.frame_position += 1
+
+        data = self._frame_cache.get(path)
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+            self._frame_cache[path] = data
+        return data
+
+    def _get_synthetic_frame(self) -> bytes:
+        """Noise PNG used when no recorded frames exist (large enough to pass size checks)"""
+        if self._synthetic_frame is None:
+            width, height = 240, 400
+            rng = random.Random(0)
+            raw = b"".join(b"\x00" + rng.randbytes(width * 3) for _ in range(height))
+
+            def chunk(tag, data):
+                return (struct.pack(">I", len(data)) + tag + data +
+                        struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff))
+
+            self._synthetic_frame = (b"\x89PNG\r\n\x1a\n" +
+                                     chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)) +
+                                     chunk(b"IDAT", zlib.compress(raw, 1)) +
+                                     chunk(b"IEND", b""))
+        return self._synthetic_frame
+
+    # Backend interface
+    def run(self, args: List[str], timeout: float = 60, text: bool = True) -> subprocess.CompletedProcess:
+        args = [str(arg) for arg in args]
+        command = args[0] if args else ""
+        op = self._operation_name(args)
+
+        start = time.perf_counter()
+        self._simulate_latency(op, args, timeout)
+
+        if self.random.random() < self.failure_rates.get(op, 0.0):
+            returncode, stdout, stderr = 1, "", f"simulated {op} failure"
+        else:
+            handler = getattr(self, f"_cmd_{command}", None)
+            if handler is None:
+                returncode, stdout, stderr = 1, "", f"unknown command: {command}"
+            else:
+                returncode, stdout, stderr = handler(args[1:])
+
+        self._record_call(op, time.perf_counter() - start, returncode == 0)
+
+        if not text:
+            stdout = stdout if isinstance(stdout, bytes) else stdout.encode()
+            stderr = stderr.encode()
+        elif isinstance(stdout, bytes):
+            stdout = stdout.decode("latin-1")
+
+        return subprocess.CompletedProcess([self.memuc_path] + args, returncode, stdout, stderr)
+
+    def _operation_name(self, args: List[str]) -> str:
+        """Map a command line to the latency/failure key"""
+        if not args:
+            return "unknown"
+        if args[0] != "adb":
+            return args[0]
+
+        rest = args[3:]
+        if rest[:1] == ["pull"]:
+            return "pull"
+        if rest[:1] == ["shell"] and len(rest) == 2 and " " in rest[1]:
+            return "script"
+        if rest[:2] == ["shell", "screencap"]:
+            return "screencap"
+        if rest[:2] == ["shell", "input"]:
+            return "tap"
+        return "shell"
+
+    def _simulate_latency(self, op: str, args: List[str], timeout: float):
+        latency = self.latencies.get(op, 0.0)
+        if isinstance(latency, (tuple, list)):
+            latency = self.random.uniform(latency[0], latency[1])
+        latency *= self.latency_scale
+
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise subprocess.TimeoutExpired([self.memuc_path] + args, timeout)
+        if latency > 0:
+            time.sleep(latency)
+
+    def _record_call(self, op: str, duration: float, success: bool):
+        with self.stats_lock:
+            stats = self.call_stats.setdefault(op, {"count": 0, "failures": 0, "durations": []})
+            stats["count"] += 1
+            if not success:
+                stats["failures"] += 1
+            stats["durations"].append(duration)
+            if len(stats["durations"]) > 10000:
+                del stats["durations"][:5000]
+
+    def get_call_stats(self) -> Dict[str, Dict]:
+        """Get per-operation call counts and durations"""
+        with self.stats_lock:
+            return {op: {"count": s["count"], "failures": s["failures"], "durations": list(s["durations"])}
+                    for op, s in self.call_stats.items()}
+
+    def reset_call_stats(self):
+        with self.stats_lock:
+            self.call_stats = {}
+
+    def sample_process(self, pid: int) -> Optional[Dict]:
+        """Synthetic process stats for a running simulated VM (used by telemetry)"""
+        with self.lock:
+            instance = next((i for i in self.instances.values() if i.running and i.pid == pid), None)
+            if not instance:
+                return None
+            uptime = time.time() - instance.started_at
+            return {
+                "cpu_percent": self.random.uniform(5, 40),
+                "memory_mb": 1200 + min(uptime, 600) + self.random.uniform(0, 50),
+                "read_bytes": int(uptime * 512 * 1024),
+                "write_bytes": int(uptime * 128 * 1024)
+            }
+
+    # Instance helpers
+    def _add_instance(self, index: int, name: str) -> SimulatedInstance:
+        instance = SimulatedInstance(index, name, disk_usage=self.random.randint(2, 6) * 1024 ** 3)
+        self.instances[index] = instance
+        return instance
+
+    def _get_instance(self, args: List[str]) -> Optional[SimulatedInstance]:
+        if "-i" in args:
+            try:
+                return self.instances.get(int(args[args.index("-i") + 1]))
+            except (ValueError, IndexError):
+                return None
+        return None
+
+    def _is_booted(self, instance: SimulatedInstance) -> bool:
+        return instance.running and (time.time() - instance.started_at) >= self.boot_time
+
+    # memuc commands
+    def _cmd_listvms(self, args):
+        running_only = "--running" in args
+        lines = []
+        with self.lock:
+            for index in sorted(self.instances):
+                instance = self.instances[index]
+                if running_only and not instance.running:
+                    continue
+                started = 1 if self._is_booted(instance) else 0
+                lines.append(f"{index},{instance.name},{instance.handle},{started},{instance.pid},{instance.disk_usage}")
+        return 0, "\n".join(lines) + ("\n" if lines else ""), ""
+
+    def _cmd_start(self, args):
+        with self.lock:
+            instance = self._get_instance(args)
+            if not instance:
+                return 1, "", "ERROR: vm not found"
+            if not instance.running:
+                instance.running = True
+                instance.started_at = time.time()
+                self.next_pid += 4
+                instance.pid = self.next_pid
+                instance.handle = 100000 + instance.pid
+                instance.frame_position = 0
+        return 0, "SUCCESS: start vm finished.", ""
+
+    def _cmd_stop(self, args):
+        with self.lock:
+            instance = self._get_instance(args)
+            if not instance:
+                return 1, "", "ERROR: vm not found"
+            instance.running = False
+            instance.started_at = None
+            instance.pid = 0
+            instance.handle = 0
+        return 0, "SUCCESS: stop vm finished.", ""
+
+    def _cmd_create(self, args):
+        with self.lock:
+            index = max(self.instances, default=-1) + 1
+            self._add_instance(index, f"{self.name_prefix}_{index}")
+        return 0, f"SUCCESS: create vm finished.\nindex:{index}", ""
+
+    def _cmd_clone(self, args):
+        with self.lock:
+            source = self._get_instance(args)
+            if not source:
+                return 1, "", "ERROR: vm not found"
+            index = max(self.instances) + 1
+            clone = self._add_instance(index, f"{source.name}_clone")
+            clone.disk_usage = source.disk_usage
+        return 0, f"SUCCESS: clone vm finished.\nindex:{index}", ""
+
+    def _cmd_remove(self, args):
+        with self.lock:
+            instance = self._get_instance(args)
+            if not instance:
+                return 1, "", "ERROR: vm not found"
+            del self.instances[instance.index]
+        return 0, "SUCCESS: remove vm finished.", ""
+
+    def _cmd_rename(self, args):
+        with self.lock:
+            instance = self._get_instance(args)
+            if not instance or len(args) < 3:
+                return 1, "", "ERROR: vm not found"
+            instance.name = args[-1]
+        return 0, "SUCCESS: rename vm finished.", ""
+
+    def _cmd_configure(self, args):
+        if not self._get_instance(args):
+            return 1, "", "ERROR: vm not found"
+        return 0, "SUCCESS: configure vm finished.", ""
+
+    # adb commands
+    def _cmd_adb(self, args):
+        with self.lock:
+            instance = self._get_instance(args)
+        if not instance:
+            return 1, "", "error: device not found"
+        if not self._is_booted(instance):
+            return 1, "", "error: device offline"
+
+        rest = args[2:]
+        if rest[:1] == ["pull"] and len(rest) >= 3:
+            data = instance.device_files.get(rest[1])
+            if data is None:
+                return 1, "", f"adb: error: remote object '{rest[1]}' does not exist"
+            with open(rest[2], 'wb') as f:
+                f.write(data)
+            return 0, f"{rest[1]}: 1 file pulled.", ""
+
+        if rest[:1] == ["shell"]:
+            return self._shell(instance, rest[1:])
+
+        return 0, "", ""
+
+    def _shell(self, instance: SimulatedInstance, args: List[str]):
+        # Single-argument script from an action batch: run each command in turn
+        if len(args) == 1 and " " in args[0]:
+            return self._shell_script(instance, args[0])
+
+        if args[:1] == ["screencap"]:
+            with self.lock:
+                frame = self._next_frame(instance)
+            device_path = next((a for a in args[1:] if not a.startswith("-")), None)
+            if device_path:
+                instance.device_files[device_path] = frame
+                return 0, "", ""
+            return 0, frame, ""
+
+        if args[:1] == ["rm"]:
+            for path in args[1:]:
+                instance.device_files.pop(path, None)
+            return 0, "", ""
+
+        if args[:1] == ["input"]:
+            with self.lock:
+                instance.taps.append((time.time(), args[1:]))
+                if len(instance.taps) > 1000:
+                    del instance.taps[:500]
+            return 0, "", ""
+
+        if args[:1] == ["sleep"] and len(args) > 1:
+            time.sleep(float(args[1]) * self.latency_scale)
+            return 0, "", ""
+
+        return 0, "", ""
+
+    def _shell_script(self, instance: SimulatedInstance, script: str):
+        """Run 'cmd && cmd && ...' stopping at the first failure"""
+        outputs = []
+        for command in script.split("&&"):
+            returncode, stdout, stderr = self._shell(instance, shlex.split(command))
+            if isinstance(stdout, str) and stdout:
+                outputs.append(stdout)
+            if returncode != 0:
+                return returncode, "\n".join(outputs), stderr
+        return 0, "\n".join(outputs), ""
@@ -3,12 +3,13 @@ BENSON v2.0 - Compact Main Application
 Reduced from 600+ lines to ~200 lines with same functionality
 """
 
+import os
 import tkinter as tk
 from datetime import datetime
 import threading
-import time
 
 from core.instance_manager import InstanceManager
+from utils.startup_timer import startup_timer
 
 
 class BensonApp(tk.Tk):
@@ -40,7 +41,8 @@ class BensonApp(tk.Tk):
         self.loading = self._create_loading_screen()
         
         # Start initialization process
-        self.after(500, self.initialize_background)
+        self._startup_pending = {"main_window", "modules"}
+        self.after(0, self.initialize_background)
 
     def _center_window(self):
         """Center window on screen"""
@@ -126,42 +128,30 @@ class BensonApp(tk.Tk):
         return LoadingController(loading, status_label, dots_label)
 
     def initialize_background(self):
-        """Initialize application in background"""
+        """Initialize application in background - the window is built as soon as instances are listed"""
         def init_worker():
             try:
                 # Step 1: Create InstanceManager
                 self._safe_update_status("Connecting to MEmu...")
-                time.sleep(1.0)
-
-                self.instance_manager = InstanceManager()
-                self.instance_manager.app = self
+                with startup_timer.phase("instance_manager"):
+                    self.instance_manager = InstanceManager()
+                    self.instance_manager.app = self
                 print("[Init] InstanceManager created")
 
                 # Step 2: Load instances
                 self._safe_update_status("Loading MEmu instances...")
-                time.sleep(1.0)
-                self.instance_manager.load_real_instances()
+                with startup_timer.phase("listvms"):
+                    self.instance_manager.load_real_instances()
                 instances_count = len(self.instance_manager.get_instances())
                 print(f"[Init] {instances_count} instances loaded")
-
-                # Step 3: Initialize modules
-                self._safe_update_status("Initializing modules...")
-                time.sleep(1.0)
-                try:
-                    from utils.module_manager import ModuleManager
-                    self.module_manager = ModuleManager(self)
-                    print("[Init] ✅ Module manager created")
-                except Exception as e:
-                    print(f"[Init] ❌ Module manager failed: {e}")
-                    self.module_manager = None
-
-                # Step 4: Setup utilities
-                self._safe_update_status("Setting up utilities...")
-                time.sleep(1.0)
-                from utils.instance_operations import InstanceOperations
-                from utils.ui_manager import UIManager
-                self.instance_ops = InstanceOperations(self)
-                self.ui_manager = UIManager(self)
+                self.instance_manager.start_telemetry()
+
+                # Step 3: Setup utilities
+                with startup_timer.phase("utilities"):
+                    from utils.instance_operations import InstanceOperations
+                    from utils.ui_manager import UIManager
+                    self.instance_ops = InstanceOperations(self)
+                    self.ui_manager = UIManager(self)
                 print("[Init] Utilities ready")
 
                 # Schedule UI setup
@@ -170,14 +160,55 @@ class BensonApp(tk.Tk):
             except Exception as e:
                 print(f"[Init ERROR] {e}")
                 self.after(0, lambda: self.show_init_error(str(e)))
+                return
+
+            # Step 4: Modules (cv2, templates, OCR checks) load while the UI is built
+            self._init_module_manager()
 
         threading.Thread(target=init_worker, daemon=True, name="Init").start()
 
+    def _init_module_manager(self):
+        """Create the module manager off the UI path"""
+        try:
+            with startup_timer.phase("module_manager"):
+                attach_url = os.environ.get("BENSON_ATTACH")
+                if attach_url:
+                    # A headless daemon runs the modules - this window is only a client
+                    from utils.remote_modules import RemoteModuleManager
+                    module_manager = RemoteModuleManager(self, attach_url)
+                else:
+                    from utils.module_workers import create_module_manager
+                    module_manager = create_module_manager(self)
+            # Only published once ready - callers check hasattr/initialization_complete
+            self.module_manager = module_manager
+            print("[Init] ✅ Module manager created")
+        except Exception as e:
+            print(f"[Init] ❌ Module manager failed: {e}")
+            self.module_manager = None
+
+        self.after(0, lambda: self._startup_step_done("modules"))
+
+    def _startup_step_done(self, step):
+        """Print the startup timing report once the window is shown and modules are ready"""
+        startup_timer.mark(f"{step}_ready")
+        self._startup_pending.discard(step)
+        if step == "modules" and not self._initializing and self.module_manager:
+            self.add_console_message("🔧 Module system ready")
+        if not self._startup_pending:
+            startup_timer.print_report()
+            self._print_import_profile()
+
+    def _print_import_profile(self):
+        """Per-module import cost when started with --profile-startup"""
+        from utils.import_profiler import import_profiler
+        if import_profiler.active:
+            import_profiler.stop()
+            import_profiler.print_report()
+
     def _safe_update_status(self, status):
         """Safely update loading status"""
         try:
             self.after(0, lambda: self.loading.update_status(status))
-            time.sleep(0.3)
         except Exception as e:
             print(f"[Init] Error updating status: {e}")
 
@@ -200,12 +231,14 @@ class BensonApp(tk.Tk):
             self.add_console_message("BENSON v2.0 started")
             self.add_console_message(f"Loaded {instances_count} MEmu instances")
             
-            if self.module_manager and self.module_manager.initialization_complete:
+            if getattr(self, "module_manager", None) and self.module_manager.initialization_complete:
                 self.add_console_message("✅ Module system initialized")
+            else:
+                self.add_console_message("⏳ Module system loading in background...")
             
             # Load cards and show
             self.loading.update_status("Creating instance cards...")
-            self.after(300, lambda: self._load_cards_and_show(instances_count))
+            self.after(0, lambda: self._load_cards_and_show(instances_count))
 
         except Exception as e:
             print(f"[BensonApp] UI setup error: {e}")
@@ -220,7 +253,7 @@ class BensonApp(tk.Tk):
                 self._load_cards_with_progress(instances)
             else:
                 self.loading.update_status("No instances found")
-                self.after(1000, self._complete_and_show)
+                self.after(0, self._complete_and_show)
                 
         except Exception as e:
             print(f"[LoadCards] Error: {e}")
@@ -231,7 +264,7 @@ class BensonApp(tk.Tk):
         def load_next_card(index=0):
             if index >= len(instances):
                 self._finalize_ui()
-                self.after(500, self._complete_and_show)
+                self.after(0, self._complete_and_show)
                 return
             
             instance = instances[index]
@@ -245,11 +278,9 @@ class BensonApp(tk.Tk):
                 row, col = index // 2, index % 2
                 card.grid(row=row, column=col, padx=4, pady=2, 
                         sticky="e" if col == 0 else "w", in_=self.instances_container)
-                card.update_idletasks()
-                self.update_idletasks()
             
-            # Schedule next card
-            self.after(150, lambda: load_next_card(index + 1))
+            # Schedule next card - layout happens once in _finalize_ui
+            self.after(0, lambda: load_next_card(index + 1))
         
         load_next_card()
 
@@ -282,7 +313,7 @@ class BensonApp(tk.Tk):
             instances_count = len(self.instance_cards)
             self.add_console_message(f"✅ BENSON v2.0 ready with {instances_count} instances")
             
-            if self.module_manager and self.module_manager.initialization_complete:
+            if getattr(self, "module_manager", None) and self.module_manager.initialization_complete:
                 self.add_console_message("🔧 Module system ready")
             
             # Update console and show main window
@@ -294,11 +325,11 @@ class BensonApp(tk.Tk):
             self.update()
             
             # Show main window
-            self.after(1200, self._show_main_window)
+            self.after(0, self._show_main_window)
             
         except Exception as e:
             print(f"[CompleteAndShow] Error: {e}")
-            self.after(500, self._show_main_window)
+            self.after(0, self._show_main_window)
 
     def _show_main_window(self):
         """Show the main application window"""
@@ -310,6 +341,7 @@ class BensonApp(tk.Tk):
             self.lift()
             self.focus_force()
             print("[BensonApp] ✅ Main window ready!")
+            self._startup_step_done("main_window")
             
         except Exception as e:
             print(f"[ShowMainWindow] Error: {e}")
@@ -5,8 +5,9 @@ Fixed settings loading and saving for AutoGather and other modules
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-import json
-import os
+
+from utils.settings_profiles import get_profiles
+from utils.settings_store import merge_defaults
 
 
 class SlimModuleSettings:
@@ -597,9 +598,8 @@ class SlimModuleSettings:
                 
                 self.settings["march_assignment"] = march_settings
             
-            # Save to file
-            with open(self.settings_file, 'w') as f:
-                json.dump(self.settings, f, indent=2)
+            # Saved as overrides of the instance's profile - written in the background, running modules are notified
+            get_profiles().save_instance(self.instance_name, self.settings)
             
             # Show success
             self.status_label.configure(text="✅ Settings saved successfully!", fg="#4caf50")
@@ -608,18 +608,6 @@ class SlimModuleSettings:
             # Notify app and reload settings
             if self.app_ref:
                 self.app_ref.add_console_message(f"✅ Saved module settings for {self.instance_name}")
-                if hasattr(self.app_ref, 'module_manager') and self.app_ref.module_manager:
-                    self.app_ref.module_manager.reload_instance_settings(self.instance_name)
-                    
-                    # Update AutoGather module settings if it exists
-                    if (self.instance_name in self.app_ref.module_manager.instance_modules and 
-                        "AutoGather" in self.app_ref.module_manager.instance_modules[self.instance_name]):
-                        
-                        autogather_module = self.app_ref.module_manager.instance_modules[self.instance_name]["AutoGather"]
-                        if hasattr(autogather_module, 'update_settings'):
-                            gather_settings = self.settings.get("auto_gather", {})
-                            autogather_module.update_settings(gather_settings)
-                            print(f"[ModuleSettings] Updated AutoGather settings for {self.instance_name}")
             
             print(f"[ModuleSettings] Settings saved for {self.instance_name}: {self.settings}")
             
@@ -656,22 +644,10 @@ class SlimModuleSettings:
         }
         
         try:
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r') as f:
-                    loaded_settings = json.load(f)
-                
-                # Merge loaded settings with defaults
-                for module_key, module_defaults in default_settings.items():
-                    if module_key not in loaded_settings:
-                        loaded_settings[module_key] = module_defaults.copy()
-                    else:
-                        # Merge individual settings
-                        for setting_key, default_value in module_defaults.items():
-                            if setting_key not in loaded_settings[module_key]:
-                                loaded_settings[module_key][setting_key] = default_value
-                
-                print(f"[ModuleSettings] Loaded settings for {self.instance_name}: {loaded_settings}")
-                return loaded_settings
+            # Defaults, profile and instance overrides resolved
+            loaded_settings = merge_defaults(get_profiles().resolve(self.instance_name), default_settings)
+            print(f"[ModuleSettings] Loaded settings for {self.instance_name}: {loaded_settings}")
+            return loaded_settings
                 
         except Exception as e:
             print(f"[ModuleSettings] Error loading settings for {self.instance_name}: {e}")
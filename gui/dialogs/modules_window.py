@@ -5,10 +5,11 @@ Simple list-based module configuration
 
 import tkinter as tk
 from tkinter import ttk
-import json
-import os
 import threading
 
+from utils.settings_profiles import get_profiles
+from utils.settings_store import merge_defaults
+
 
 class ModulesWindow:
     def __init__(self, parent, instance_name, app_ref=None):
@@ -395,18 +396,7 @@ class ModulesWindow:
         }
         
         try:
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r') as f:
-                    settings = json.load(f)
-                # Merge with defaults
-                for key, value in default_settings.items():
-                    if key not in settings:
-                        settings[key] = value
-                    else:
-                        for subkey, subvalue in value.items():
-                            if subkey not in settings[key]:
-                                settings[key][subkey] = subvalue
-                return settings
+            return merge_defaults(get_profiles().resolve(self.instance_name), default_settings)
         except Exception as e:
             print(f"Error loading settings: {e}")
         
@@ -415,8 +405,7 @@ class ModulesWindow:
     def _save_and_close(self):
         """Save settings and close window"""
         try:
-            with open(self.settings_file, 'w') as f:
-                json.dump(self.settings, f, indent=2)
+            get_profiles().save_instance(self.instance_name, self.settings)
             
             if self.app_ref:
                 self.app_ref.add_console_message("✓ Module settings saved")
@@ -2,10 +2,57 @@
 """
 BENSON v2.0 - Advanced MEmu Instance Manager
 Main Entry Point
+
+    python main.py                    # normal start
+    python main.py --profile-startup  # also report per-module import cost
+    python main.py --headless         # no GUI - modules plus the local control API
+                                      # (attach a GUI with BENSON_ATTACH=http://127.0.0.1:8765)
+    BENSON_API_TOKEN=<secret> python main.py --coordinator
+                                      # multi-host coordinator on port 8770 (all interfaces, token required)
+    BENSON_API_TOKEN=<secret> python main.py --headless --host 0.0.0.0 --join http://coordinator:8770
+                                      # worker node (a token is required off loopback)
 """
 
-from gui.app import BensonApp
+import argparse
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="BENSON v2.0 MEmu instance manager")
+    parser.add_argument("--profile-startup", action="store_true", help="report per-module import cost")
+    parser.add_argument("--headless", action="store_true", help="run without Tk and serve the control API")
+    parser.add_argument("--coordinator", action="store_true", help="assign instances to worker nodes")
+    parser.add_argument("--join", metavar="URL", help="coordinator to join as a worker node (headless)")
+    parser.add_argument("--node", help="worker node name (default: host name)")
+    parser.add_argument("--host", help="API bind address (default 127.0.0.1, coordinator 0.0.0.0)")
+    parser.add_argument("--port", type=int, help="API port (default 8765, coordinator 8770)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.profile_startup:
+        from utils.import_profiler import import_profiler
+        import_profiler.start()
+
+    if args.coordinator:
+        from utils.cluster import run_coordinator
+        run_coordinator(args.host or "0.0.0.0", args.port or 8770)
+        return
+
+    if args.headless or args.join:
+        from core.daemon import run_daemon
+        run_daemon(args.host or "127.0.0.1", args.port or 8765, join=args.join, node_name=args.node)
+        return
+
+    from gui.app import BensonApp
+
+    if args.profile_startup:
+        # Keep profiling until the window is up and modules are loaded - BensonApp prints the report
+        print("[Startup] Import profiling enabled")
 
-if __name__ == "__main__":
     app = BensonApp()
-    app.mainloop()
\ No newline at end of file
+    app.mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+BENSON v2.0 - Adaptive Wait Engine
+Polls fast right after an action, backs off while the screen is static and
+learns how long each stage usually takes per instance
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from utils.lazy_import import lazy_import, module_available
+
+# Deferred import - cv2 loads with the first frame
+cv2 = lazy_import("cv2")
+CV2_AVAILABLE = module_available("cv2")
+
+
+def frame_signature(frame):
+    """Tiny grayscale thumbnail used to tell whether the screen changed"""
+    if not CV2_AVAILABLE or frame is None:
+        return None
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if len(frame.shape) == 3 else frame
+    return cv2.resize(gray, (24, 40), interpolation=cv2.INTER_AREA)
+
+
+def frames_differ(previous, current, threshold: float = 6.0) -> bool:
+    """True if two signatures differ by more than threshold mean gray levels"""
+    if previous is None or current is None or previous.shape != current.shape:
+        return True
+    return float(cv2.absdiff(previous, current).mean()) > threshold
+
+
+class LoadTimeModel:
+    """Exponentially weighted stage durations per (instance, stage)"""
+
+    def __init__(self, alpha: float = 0.3):
+        self.alpha = alpha
+        self.durations: Dict[Tuple[str, str], float] = {}
+        self.samples: Dict[Tuple[str, str], int] = {}
+        self.lock = threading.Lock()
+
+    def expected(self, instance_name: str, stage: str) -> Optional[float]:
+        with self.lock:
+            return self.durations.get((instance_name, stage))
+
+    def record(self, instance_name: str, stage: str, duration: float):
+        key = (instance_name, stage)
+        with self.lock:
+            previous = self.durations.get(key)
+            self.durations[key] = duration if previous is None else \
+                self.alpha * duration + (1 - self.alpha) * previous
+            self.samples[key] = self.samples.get(key, 0) + 1
+
+    def waiter(self, instance_name: str, stage: str, **options) -> "AdaptiveWaiter":
+        return AdaptiveWaiter(self, instance_name, stage, **options)
+
+    def get_stats(self) -> Dict[str, Dict]:
+        with self.lock:
+            return {f"{instance}/{stage}": {"expected_seconds": round(value, 2), "samples": self.samples[(instance, stage)]}
+                    for (instance, stage), value in self.durations.items()}
+
+
+class AdaptiveWaiter:
+    """Delay policy for one stage (e.g. launcher click until world)"""
+
+    def __init__(self, model: LoadTimeModel, instance_name: str, stage: str, min_interval: float = 0.25,
+                 max_interval: float = 3.0, backoff: float = 1.6, early_fraction: float = 0.7):
+        self.model = model
+        self.instance_name = instance_name
+        self.stage = stage
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.early_fraction = early_fraction
+
+        self.started = time.time()
+        self.static_polls = 0
+        self.completed = False
+
+    def elapsed(self) -> float:
+        return time.time() - self.started
+
+    def next_delay(self, screen_changed: bool = True) -> float:
+        """Seconds to wait before the next check"""
+        self.static_polls = 0 if screen_changed else self.static_polls + 1
+
+        # Nothing to see before this stage usually finishes - check rarely until then
+        expected = self.model.expected(self.instance_name, self.stage)
+        if expected:
+            until_early = expected * self.early_fraction - self.elapsed()
+            if until_early > self.min_interval:
+                return min(until_early, self.max_interval)
+
+        return min(self.max_interval, self.min_interval * (self.backoff ** self.static_polls))
+
+    def wait_until(self, condition: Callable[[], bool], timeout: float, stop_event: threading.Event = None) -> bool:
+        """Poll condition with adaptive delays; True as soon as it holds"""
+        while self.elapsed() < timeout:
+            if condition():
+                self.complete()
+                return True
+            delay = min(self.next_delay(False), max(0.0, timeout - self.elapsed()))
+            if stop_event is not None:
+                if stop_event.wait(delay):
+                    return False
+            else:
+                time.sleep(delay)
+        return False
+
+    def complete(self):
+        """Record how long this stage took"""
+        if not self.completed:
+            self.completed = True
+            self.model.record(self.instance_name, self.stage, self.elapsed())
+
+
+# Process-wide model shared by all modules
+load_time_model = LoadTimeModel()
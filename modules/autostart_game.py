@@ -6,26 +6,37 @@ Enhanced popup detection and handling for game offers/dialogs
 import os
 import time
 import threading
-import subprocess
-from typing import Optional, Callable
+from typing import Callable, Dict, Optional
 from datetime import datetime
 
-# Safe imports
-try:
-    import cv2
-    import numpy as np
-    CV2_AVAILABLE = True
-except ImportError:
-    CV2_AVAILABLE = False
+from modules.adaptive_wait import frame_signature, frames_differ, load_time_model
+from modules.autostart_states import AutoStartState, AutoStartStateMachine, TemplateCache
+from modules.base_module import BaseModule, ModulePriority, ModuleStatus
+from modules.cycle_timing import CycleTimingPolicy
+from utils.adb_actions import ActionBatch
+from utils.lazy_import import lazy_import, module_available
+from utils.metrics import metrics, timed_action
+from utils.tracing import traced, tracer
 
+# Deferred imports - cv2/numpy load on the first frame, not at startup
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+CV2_AVAILABLE = module_available("cv2") and module_available("numpy")
 
-class AutoStartGameModule:
-    """Template-only AutoStart - IMPROVED VERSION with better popup handling"""
+
+class AutoStartGameModule(BaseModule):
+    """Template-only AutoStart - IMPROVED VERSION with better popup handling
+    
+    A run is a generator of steps (one capture + action each) advanced by the
+    module loop - the worker thread, or the shared scheduler when one is set.
+    Between runs the module idles until start_auto_game() hands it a new one.
+    """
+    
+    module_name = "AutoStartGame"
     
     def __init__(self, instance_name: str, shared_resources, console_callback: Callable = None):
-        self.instance_name = instance_name
+        super().__init__(instance_name, shared_resources, console_callback)
         self.instance_manager = shared_resources
-        self.console_callback = console_callback or print
         
         # Setup shared state
         self.shared_state = getattr(shared_resources, 'shared_state', {})
@@ -42,26 +53,54 @@ class AutoStartGameModule:
         self.confidence_threshold = 0.8  # For menu detection
         self.close_button_confidence = 0.75  # Raised back up for precision
         self.world_confidence = 0.8  # For world detection
-        self.default_max_retries = 3
-        self.retry_delay = 10
-        self.game_load_timeout = 90
+        self.max_retries = 3
+        self.retry_delay = 10.0
+        self.game_load_timeout = 90.0
+        self.attempt_timeout = 180.0   # Whole attempt, launcher and popups included
+        self.max_state_clicks = 5      # Clicks on the same launcher/popup screen per attempt
+        self.min_poll_interval = 0.25  # Adaptive waits: fast right after actions...
+        self.max_poll_interval = 3.0   # ...backing off to this on static screens
+        self.world_confirm_interval = 0.5
+        self.world_confirmations = 2
+        self.unknown_frame_limit = 3
         
         # Dialog detection state
         self.last_dialog_close_time = 0
         self.dialog_close_cooldown = 3  # Reduced cooldown
         
-        # Setup and validate templates
-        self._setup_and_validate_templates()
+        # Runs start as soon as they are requested - the orchestrator spreads fleet starts
+        self.timing = CycleTimingPolicy(start_jitter=0.0)
+        
+        # Active run: step generator plus the callbacks waiting on it
+        self.run_lock = threading.Lock()
+        self.current_run = None
+        
+        # Optional fleet-wide capture limiter - set by the AutoStart orchestrator
+        self.capture_budget = None
+        
+        # Screen change tracking for adaptive waits
+        self._last_signature = None
+        self._screen_changed = True
         
-        # Log initialization once per instance
-        if not hasattr(self.__class__, f'_init_logged_{instance_name}'):
-            self.log_message(f"✅ AutoStartGame initialized for {instance_name}")
-            setattr(self.__class__, f'_init_logged_{instance_name}', True)
+        # Popup close + settle + capture run as one ADB call; the next observe only pulls the file
+        self.device_screenshot = "/sdcard/autostart_screen.png"
+        self._precaptured = False
+        
+        # Setup and validate templates (catalogue shared by all instances)
+        self.template_cache = TemplateCache.for_directory(self.templates_dir)
+        self._setup_and_validate_templates()
+        self.state_machine = AutoStartStateMachine(
+            state_templates={
+                AutoStartState.WORLD: self.GAME_WORLD_INDICATORS,
+                AutoStartState.LAUNCHER: self.MAIN_MENU_INDICATORS,
+                AutoStartState.POPUP: self.CLOSE_BUTTONS
+            },
+            state_confidence=self._state_confidence(),
+            cache=self.template_cache
+        )
     
     def _setup_and_validate_templates(self):
         """Setup templates directory and validate requirements"""
-        os.makedirs(self.templates_dir, exist_ok=True)
-        
         # Game detection templates
         self.MAIN_MENU_INDICATORS = ["game_launcher.png", "main_menu.png", "start_game.png", "play_button.png"]
         self.GAME_WORLD_INDICATORS = ["world.png", "world_icon.png", "town_icon.png", "game_icon.png",
@@ -78,7 +117,7 @@ class AutoStartGameModule:
         # Check OpenCV availability
         if not CV2_AVAILABLE:
             self.log_message("❌ OpenCV not available - AutoStart requires cv2 for image detection")
-            self.is_available = False
+            self.templates_ready = False
             return
         
         # Check for templates
@@ -87,7 +126,7 @@ class AutoStartGameModule:
         if not available_templates:
             self.log_message("❌ No template files found in templates/ directory")
             self.log_message("📋 AutoStart requires image templates to work properly")
-            self.is_available = False
+            self.templates_ready = False
             return
         
         # Check for essential templates
@@ -100,11 +139,11 @@ class AutoStartGameModule:
         if not has_world_template:
             self.log_message("⚠️ No game world templates found - may have difficulty detecting game state")
         
-        self.is_available = True
+        self.templates_ready = True
         self.log_message(f"✅ Found {len(available_templates)} template files")
         
-        # Log available templates for debugging - FIXED to show actual available close templates
-        if available_templates:
+        # Log available templates for debugging - once per process, not per instance
+        if available_templates and self.template_cache.claim_report():
             menu_templates = [t for t in available_templates if t in self.MAIN_MENU_INDICATORS]
             world_templates = [t for t in available_templates if t in self.GAME_WORLD_INDICATORS]
             close_templates = [t for t in available_templates if t in self.CLOSE_BUTTONS]
@@ -125,14 +164,47 @@ class AutoStartGameModule:
             else:
                 self.log_message("❌ close_x6.png NOT found in templates directory")
     
+    def is_available(self) -> bool:
+        return self.templates_ready
+    
+    def get_missing_dependencies(self) -> list:
+        if not CV2_AVAILABLE:
+            return ["opencv-python"]
+        return [] if self.templates_ready else ["templates"]
+    
+    def get_module_priority(self) -> ModulePriority:
+        # Launches/recoveries jump ahead of queued lower-priority cycles
+        return ModulePriority.CRITICAL
+    
+    def _state_confidence(self) -> Dict[AutoStartState, float]:
+        return {
+            AutoStartState.WORLD: self.world_confidence,
+            AutoStartState.LAUNCHER: self.confidence_threshold,
+            AutoStartState.POPUP: self.close_button_confidence
+        }
+    
+    # Hot reload - settings key -> attribute, on top of BaseModule's; applied at run start and between attempts
+    SETTING_ATTRIBUTES = {
+        **BaseModule.SETTING_ATTRIBUTES,
+        "confidence_threshold": "confidence_threshold",
+        "close_button_confidence": "close_button_confidence",
+        "world_confidence": "world_confidence",
+        "retry_delay": "retry_delay",
+        "game_load_timeout": "game_load_timeout",
+        "attempt_timeout": "attempt_timeout",
+        "max_state_clicks": "max_state_clicks",
+        "min_poll_interval": "min_poll_interval",
+        "max_poll_interval": "max_poll_interval"
+    }
+    
+    def _on_settings_applied(self, changed: Dict):
+        if any("confidence" in attribute for attribute in changed):
+            # One dict swap so a detection never sees half-updated thresholds
+            self.state_machine.state_confidence = self._state_confidence()
+    
     def _get_available_templates(self) -> list:
         """Get list of available template files"""
-        try:
-            if not os.path.exists(self.templates_dir):
-                return []
-            return [f for f in os.listdir(self.templates_dir) if f.endswith('.png')]
-        except:
-            return []
+        return self.template_cache.available()
     
     def log_message(self, message: str):
         """Log message with timestamp"""
@@ -142,59 +214,198 @@ class AutoStartGameModule:
             self.console_callback(full_message)
     
     def start_auto_game(self, instance_name: str = None, max_retries: int = None, 
-                       on_complete: Callable = None) -> bool:
-        """Start auto game with template-only detection"""
+                       on_complete: Callable = None, timeout: float = None) -> bool:
+        """Hand a run to the module loop - joins the active run if there is one
+        
+        timeout bounds the whole run; past it the run finishes as failed at its next step.
+        """
         target_instance = instance_name or self.instance_name
         
         # Check if AutoStart is available
-        if not self.is_available:
+        if not self.is_available():
             self.log_message("❌ AutoStart not available - missing templates or OpenCV")
             if on_complete: on_complete(False)
             return False
         
+        with self.run_lock:
+            if self.current_run:
+                if on_complete:
+                    self.current_run["callbacks"].append(on_complete)
+                return True
+            
+            idle = self._queue_run(target_instance, max_retries, [on_complete] if on_complete else [])
+            if timeout:
+                self.current_run["deadline"] = time.time() + timeout
+            looping = self.status in (ModuleStatus.RUNNING, ModuleStatus.STARTING)
+        
+        if idle:
+            self._signal()
+        if looping or self.start():
+            return True
+        
+        self._finish_run(self.current_run, False, "start_failed")
+        return False
+    
+    def run_auto_game(self, instance_name: str = None, max_retries: int = None,
+                      on_complete: Callable = None, timeout: float = None) -> bool:
+        """Start a run and block until it finishes - timeout is the run's deadline"""
+        done = threading.Event()
+        result = {"success": False}
+        
+        def finished(success: bool):
+            result["success"] = success
+            done.set()
+            if on_complete: on_complete(success)
+        
+        if not self.start_auto_game(instance_name, max_retries, finished, timeout):
+            return False
+        # The run ends itself at its deadline; the margin covers a step still in flight
+        if not done.wait(timeout + 30 if timeout else None):
+            self.log_message(f"⚠️ Run did not finish {timeout:.0f}s deadline - stopping")
+            self.stop()
+        return result["success"]
+    
+    def stop(self) -> bool:
+        """Stop the module - an active run finishes as failed"""
+        with self.run_lock:
+            run = self.current_run
+        if run:
+            self.log_message("🛑 AutoStart run cancelled")
+            self._finish_run(run, False, "cancelled")
+        
+        if self.worker_thread is threading.current_thread():
+            # Called from this module's own step or callback - the loop exits once it returns
+            self.status = ModuleStatus.STOPPING
+            self.stop_event.set()
+            return True
+        return super().stop()
+    
+    def _run_cycle(self) -> Optional[float]:
+        """Advance the active run by one step - returns seconds until the next step"""
+        with self.run_lock:
+            run = self.current_run
+            if run is None:
+                self.status = ModuleStatus.IDLE
+                return 0
+        
+        deadline = run.get("deadline")
+        if deadline and time.time() >= deadline:
+            self.log_message("⏰ AutoStart run deadline reached")
+            self._finish_run(run, False, "deadline")
+            return 0
+        
+        step_start = time.time()
+        try:
+            with tracer.span("autostart.step", instance=self.instance_name):
+                delay = next(run["steps"])
+        except StopIteration as finished:
+            success = bool(finished.value)
+            self._finish_run(run, success, None if success else "autostart_failed")
+            return 0 if success else self._schedule_recovery(run)
+        except Exception as e:
+            self.log_message(f"❌ AutoStartGame error: {str(e)}")
+            self._finish_run(run, False, type(e).__name__)
+            return 0
+        finally:
+            metrics.observe("autostart_step_seconds", time.time() - step_start, instance=self.instance_name)
+        
+        if deadline:
+            delay = max(0.0, min(delay, deadline - time.time()))
+        self.next_execution = time.time() + delay
+        return delay
+    
+    def _queue_run(self, instance_name: str, max_retries: Optional[int], callbacks: list, delay: float = 0) -> bool:
+        """Make a new run current (caller holds run_lock) - returns True if the module was idle"""
+        self.current_run = {
+            "steps": self._run_steps(instance_name, max_retries),
+            "instance": instance_name,
+            "max_retries": max_retries,
+            "callbacks": callbacks,
+            "started": time.time() + delay
+        }
+        self.next_execution = time.time() + delay
+        idle = self.status == ModuleStatus.IDLE
+        if idle:
+            self.status = ModuleStatus.RUNNING
+        return idle
+    
+    def _schedule_recovery(self, failed_run: Dict) -> float:
+        """Opt-in recovery (timing.recovery): start a fresh run after a cool-down instead of giving up"""
+        cooldown = self.timing.after_max_retries()
+        if cooldown is None:
+            return 0
+        with self.run_lock:
+            if self.current_run or self.stop_event.is_set():
+                return 0
+            self._queue_run(failed_run["instance"], failed_run["max_retries"], [], cooldown)
+        self.log_message(f"🧊 AutoStart failed, retrying in {cooldown:.0f}s")
+        return cooldown
+    
+    def _finish_run(self, run: Dict, success: bool, failure_reason: str = None):
+        """Complete a run once - record it, notify its callbacks and idle unless one of them queued another"""
+        with self.run_lock:
+            if run is None or self.current_run is not run:
+                return
+            self.current_run = None
+        
+        try:
+            run["steps"].close()
+        except ValueError:
+            pass  # Still executing a step on another thread - the stop event ends it
+        
+        # One run is this module's unit of work: one cycle sample and one run history row
+        duration = max(0.0, time.time() - run["started"])
+        self._record_cycle(run["started"], duration, success, failure_reason)
+        metrics.observe("autostart_seconds", duration, instance=self.instance_name,
+                        result="success" if success else "failed")
+        self.execution_count += 1
+        self.last_execution = datetime.now()
+        if success:
+            self.success_count += 1
+            self._mark_success()
+        else:
+            self.error_count += 1
+            self.last_error = failure_reason
+        self.log_message(f"🏁 AutoStartGame completed: {'SUCCESS' if success else 'FAILED'} ({duration:.1f}s)")
+        
+        for on_complete in run["callbacks"]:
+            try:
+                on_complete(success)
+            except Exception as e:
+                self.log_message(f"⚠️ Completion callback error: {e}")
+        
+        with self.run_lock:
+            if self.current_run is None and self.status == ModuleStatus.RUNNING:
+                self.status = ModuleStatus.IDLE
+    
+    def _run_steps(self, instance_name: str, max_retries: int = None):
+        """One AutoStart run with template-only detection - yields seconds to wait, returns success"""
+        self._apply_pending_settings()
+        
         # Check if recently completed
         if self.game_start_completed and self.last_successful_start:
             time_since = (datetime.now() - self.last_successful_start).total_seconds()
             if time_since < 300:  # 5 minutes
                 self.log_message(f"⏸ Game already started {int(time_since)}s ago")
-                if on_complete: on_complete(True)
                 return True
         
         # Check if already running
-        if self._is_game_already_running():
-            self.log_message(f"✅ Game already running for {target_instance}")
-            if self._verify_stable_game_state():
-                self._mark_success_and_notify(on_complete)
+        if (yield from self._is_game_already_running()):
+            self.log_message(f"✅ Game already running for {instance_name}")
+            if (yield from self._verify_stable_game_state()):
                 return True
         
-        # Start game launch process
-        def run_task():
-            try:
-                self.log_message(f"🚀 Starting AutoStartGame for {target_instance}")
-                success = self._run_complete_game_start(target_instance, max_retries or self.default_max_retries)
-                
-                if success:
-                    self._mark_success_and_notify(on_complete)
-                else:
-                    self.log_message(f"❌ AutoStartGame failed for {target_instance}")
-                    if on_complete: on_complete(False)
-                        
-                self.log_message(f"🏁 AutoStartGame completed: {'SUCCESS' if success else 'FAILED'}")
-                    
-            except Exception as e:
-                self.log_message(f"❌ AutoStartGame error: {str(e)}")
-                if on_complete: on_complete(False)
-        
-        threading.Thread(target=run_task, daemon=True, name=f"AutoStart-{target_instance}").start()
-        return True
+        self.log_message(f"🚀 Starting AutoStartGame for {instance_name}")
+        success = yield from self._run_complete_game_start(instance_name, max_retries or self.max_retries)
+        if not success:
+            self.log_message(f"❌ AutoStartGame failed for {instance_name}")
+        return success
     
-    def _mark_success_and_notify(self, on_complete: Callable = None):
+    def _mark_success(self):
         """Mark success and notify other modules"""
         self.game_start_completed = True
         self.last_successful_start = datetime.now()
         self._set_game_accessible_state(True)
-        
-        if on_complete: on_complete(True)
         self.log_message(f"✅ Game accessible - other modules can start")
     
     def _set_game_accessible_state(self, accessible: bool):
@@ -225,416 +436,264 @@ class AutoStartGameModule:
         except Exception as e:
             self.log_message(f"⚠️ Could not set shared state: {e}")
     
-    def _run_complete_game_start(self, instance_name: str, max_retries: int) -> bool:
-        """Complete game start process using only templates"""
+    def _run_complete_game_start(self, instance_name: str, max_retries: int):
+        """Drive the state machine until the game world is confirmed, starting from the last known screen"""
+        instance = self.instance_manager.get_instance(instance_name)
+        if not instance:
+            self.log_message(f"❌ Instance {instance_name} not found")
+            return False
+        
+        instance_index = instance['index']
         for attempt in range(1, max_retries + 1):
-            self.log_message(f"🔄 Auto start attempt {attempt}/{max_retries}")
-            
-            try:
-                if self._attempt_game_start_improved(instance_name):
-                    return True
-            except Exception as e:
-                self.log_message(f"❌ Attempt {attempt} failed: {e}")
-            
-            if attempt < max_retries:
-                self.log_message(f"⏳ Waiting {self.retry_delay}s before retry")
-                time.sleep(self.retry_delay)
+            self.retry_count = attempt - 1
+            if attempt > 1:
+                self.state_machine.resume()
+                self._apply_pending_settings()
+                # Jittered, growing delay so failing instances don't retry in lockstep
+                delay = self.timing.next_delay(self.retry_delay, 0, self.retry_count)
+                self.log_message(f"⏳ Waiting {delay:.1f}s before retry")
+                yield delay
+            
+            self.log_message(f"🔄 Auto start attempt {attempt}/{max_retries} "
+                             f"({'resuming from' if attempt > 1 else 'last state:'} {self.state_machine.state.value})")
+            if (yield from self._run_attempt(instance_index)):
+                return True
         
         self.log_message("❌ All attempts failed - check your templates and game state")
         return False
     
-    def _attempt_game_start_improved(self, instance_name: str) -> bool:
-        """Improved game start attempt - launch first, then handle popups"""
-        try:
-            instance = self.instance_manager.get_instance(instance_name)
-            if not instance:
-                self.log_message(f"❌ Instance {instance_name} not found")
+    def _run_attempt(self, instance_index: int):
+        """One bounded attempt - True once the world is confirmed, False when it runs out of time or clicks"""
+        machine = self.state_machine
+        attempt_start = time.time()
+        clicks = {}
+        capture_failures = 0
+        waiter = self._waiter("observe")
+        launch_waiter = None
+        popup_waiter = None
+        
+        while True:
+            if time.time() - attempt_start > self.attempt_timeout:
+                self.log_message(f"❌ Attempt timed out after {self.attempt_timeout:.0f}s in {machine.state.value}")
                 return False
             
-            screenshot_path = self._take_screenshot(instance['index'])
-            if not screenshot_path:
-                self.log_message("❌ Failed to take screenshot")
-                return False
+            yield from self._capture_slot()
+            state, frame = self._observe_screen(instance_index)
+            changed = self._screen_changed
             
-            try:
-                # Detect current state using templates
-                game_state = self._detect_game_state(screenshot_path)
-                self.log_message(f"🔍 Detected state: {game_state}")
-                
-                if game_state == "ALREADY_IN_GAME":
-                    return self._verify_game_world_stable(instance['index'])
-                elif game_state == "MAIN_MENU":
-                    return self._start_from_main_menu_improved(screenshot_path, instance['index'])
-                elif game_state == "UNKNOWN_STATE":
-                    # ONLY look for popups if we're in unknown state (might be popup blocking)
-                    return self._handle_unknown_state_improved(screenshot_path, instance['index'])
-                else:
-                    self.log_message(f"❌ Unhandled game state: {game_state}")
+            if frame is None:
+                capture_failures += 1
+                if capture_failures >= 5:
+                    self.log_message("❌ Screenshot capture keeps failing")
                     return False
-                    
-            finally:
-                self._cleanup_screenshot(screenshot_path)
-                
-        except Exception as e:
-            self.log_message(f"❌ Error in game start attempt: {e}")
-            return False
-    
-    def _check_and_clear_popup_precise(self, screenshot_path: str, instance_index: int) -> bool:
-        """Precisely check and clear popups with HIGH confidence only"""
-        try:
-            screenshot = cv2.imread(screenshot_path)
-            if screenshot is None:
-                return False
+                self.log_message("⚠️ Failed to take screenshot, retrying...")
+                yield 2
+                continue
+            capture_failures = 0
+            
+            # Popup is gone once the screen changes after closing it
+            if popup_waiter and changed:
+                popup_waiter.complete()
+                popup_waiter = None
+            
+            if state == AutoStartState.WORLD:
+                if machine.confirmations >= self.world_confirmations:
+                    if launch_waiter:
+                        launch_waiter.complete()
+                    self.log_message(f"✅ Game world confirmed ({machine.confirmations} consecutive frames)")
+                    return True
+                yield self.world_confirm_interval
+                continue
             
-            # Check each close button template with HIGH confidence only
-            best_match = None
-            best_confidence = 0
+            if state in (AutoStartState.LAUNCHER, AutoStartState.POPUP):
+                # A screen that keeps coming back after every click is not going to clear
+                clicks[state] = clicks.get(state, 0) + 1
+                if clicks[state] > self.max_state_clicks:
+                    self.log_message(f"❌ Still on {state.value} after {self.max_state_clicks} clicks")
+                    return False
             
-            for close_button in self.CLOSE_BUTTONS:
-                template_path = os.path.join(self.templates_dir, close_button)
-                if not os.path.exists(template_path):
-                    continue
-                
-                template = cv2.imread(template_path)
-                if template is None:
+            if state == AutoStartState.LAUNCHER and self._click_match(frame, instance_index):
+                self.log_message(f"✅ Clicked game launcher using template: {machine.last_match.name}")
+                machine.expect(AutoStartState.LOADING)
+                launch_waiter = waiter = self._waiter("launch")
+                yield waiter.next_delay(True)
+                continue
+            
+            if state == AutoStartState.POPUP:
+                popup_waiter = self._waiter("popup_close")
+                if self._clear_popup(frame, instance_index, popup_waiter.next_delay(True)):
+                    # Whatever follows a popup is another popup, loading or the world
+                    machine.expect(AutoStartState.LOADING)
                     continue
-                
-                result = cv2.matchTemplate(screenshot, template, cv2.TM_CCOEFF_NORMED)
-                _, max_val, _, max_loc = cv2.minMaxLoc(result)
-                
-                # Track best match for logging
-                if max_val > best_confidence:
-                    best_confidence = max_val
-                    best_match = (close_button, max_loc, max_val)
-                
-                # ONLY accept HIGH confidence matches to avoid misclicks
-                if max_val >= self.close_button_confidence:
-                    # Calculate click position
-                    template_h, template_w = template.shape[:2]
-                    click_x = max_loc[0] + template_w // 2
-                    click_y = max_loc[1] + template_h // 2
-                    
-                    # Ensure click is within screen bounds
-                    screen_h, screen_w = screenshot.shape[:2]
-                    click_x = max(10, min(click_x, screen_w - 10))
-                    click_y = max(10, min(click_y, screen_h - 10))
-                    
-                    self.log_message(f"🎯 HIGH CONFIDENCE popup close: {close_button} at ({click_x}, {click_y}) confidence: {max_val:.3f}")
-                    
-                    if self._click_position(instance_index, click_x, click_y):
-                        return True
+                popup_waiter = None
             
-            # Only log if no popup found (don't spam about low confidence matches)
-            if not best_match or best_confidence < 0.5:
-                return False
+            if state in (AutoStartState.LAUNCHER, AutoStartState.POPUP):
+                # Click failed - try again on the next frame
+                yield waiter.next_delay(False)
+                continue
             
-            return False
+            if state == AutoStartState.LOADING:
+                if waiter.elapsed() < self.game_load_timeout:
+                    yield waiter.next_delay(changed)
+                    continue
+                self.log_message("❌ Game load timeout")
+                return False
             
-        except Exception as e:
-            self.log_message(f"❌ Error in precise popup check: {e}")
+            if machine.confirmations < self.unknown_frame_limit:
+                yield waiter.next_delay(changed)
+                continue
+            self.log_message(f"❌ Could not resolve unknown state after {machine.confirmations} frames")
             return False
     
-    def _find_and_close_popup_at_confidence(self, screenshot_path: str, instance_index: int, confidence: float) -> bool:
-        """Find and close popup at specific confidence level - ONLY use high confidence"""
+    def _waiter(self, stage: str):
+        return load_time_model.waiter(self.instance_name, stage, min_interval=self.min_poll_interval,
+                                      max_interval=self.max_poll_interval)
+    
+    def _capture_slot(self):
+        """Wait for the fleet capture budget as step delays rather than a blocking sleep"""
+        if not self.capture_budget:
+            return
+        started = time.monotonic()
+        while True:
+            wait = self.capture_budget.try_acquire()
+            if not wait:
+                break
+            yield wait
+        metrics.observe("capture_budget_wait_seconds", time.monotonic() - started)
+    
+    @traced("autostart.observe")
+    def _observe_screen(self, instance_index: int):
+        """Capture one frame and classify it - returns (state, frame) with frame None on capture failure
+        
+        Runs inside a step, so with the scheduler it is already on the work queue as a CRITICAL cycle.
+        Callers take a capture slot first.
+        """
+        return self._capture_and_classify(instance_index)
+    
+    def _capture_and_classify(self, instance_index: int):
+        screenshot_path = self._take_screenshot(instance_index)
+        if not screenshot_path:
+            return self.state_machine.state, None
+        
         try:
-            screenshot = cv2.imread(screenshot_path)
-            if screenshot is None:
-                return False
-            
-            # Check each close button template with HIGH confidence only
-            for close_button in self.CLOSE_BUTTONS:
-                template_path = os.path.join(self.templates_dir, close_button)
-                if not os.path.exists(template_path):
-                    continue
-                
-                template = cv2.imread(template_path)
-                if template is None:
-                    continue
-                
-                result = cv2.matchTemplate(screenshot, template, cv2.TM_CCOEFF_NORMED)
-                _, max_val, _, max_loc = cv2.minMaxLoc(result)
-                
-                # ONLY accept very high confidence matches (exact template matches)
-                if max_val >= self.close_button_confidence:
-                    # Calculate click position
-                    template_h, template_w = template.shape[:2]
-                    click_x = max_loc[0] + template_w // 2
-                    click_y = max_loc[1] + template_h // 2
-                    
-                    # Ensure click is within screen bounds
-                    screen_h, screen_w = screenshot.shape[:2]
-                    click_x = max(10, min(click_x, screen_w - 10))
-                    click_y = max(10, min(click_y, screen_h - 10))
-                    
-                    self.log_message(f"🎯 Found EXACT popup close: {close_button} at ({click_x}, {click_y}) confidence: {max_val:.3f}")
-                    
-                    if self._click_position(instance_index, click_x, click_y):
-                        return True
-                else:
-                    # Log near misses for debugging
-                    if max_val >= 0.5:
-                        self.log_message(f"🔍 Close match but too low: {close_button} confidence: {max_val:.3f} (need {self.close_button_confidence})")
-            
-            return False
-            
-        except Exception as e:
-            self.log_message(f"❌ Error in popup detection: {e}")
-            return False
+            frame = cv2.imread(screenshot_path)
+            if frame is None:
+                return self.state_machine.state, None
+            
+            signature = frame_signature(frame)
+            self._screen_changed = frames_differ(self._last_signature, signature)
+            self._last_signature = signature
+            
+            previous = self.state_machine.state
+            state = self._classify_frame(frame)
+            if state != previous:
+                match = self.state_machine.last_match
+                detail = f" ({match.name} {match.confidence:.3f})" if match else ""
+                self.log_message(f"🔍 State: {previous.value} → {state.value}{detail}")
+            return state, frame
+        finally:
+            self._cleanup_screenshot(screenshot_path)
+    
+    @traced("detect_game_state")
+    @timed_action("detect")
+    def _classify_frame(self, frame) -> AutoStartState:
+        machine = self.state_machine
+        state = machine.observe(frame)
+        metrics.increment("autostart_frames_total", instance=self.instance_name)
+        metrics.increment("autostart_templates_tested_total", amount=machine.templates_tested,
+                          instance=self.instance_name)
+        return state
     
     def _detect_game_state(self, screenshot_path: str) -> str:
-        """Detect current game state using only templates"""
+        """Detect current game state from a screenshot file"""
         try:
-            # Use higher confidence for world detection to avoid false positives
-            if self._find_any_template_with_confidence(screenshot_path, self.GAME_WORLD_INDICATORS, self.world_confidence):
+            frame = cv2.imread(screenshot_path)
+            if frame is None:
+                return "UNKNOWN_STATE"
+            state = self._classify_frame(frame)
+            if state == AutoStartState.WORLD:
                 return "ALREADY_IN_GAME"
-            if self._find_any_template_with_confidence(screenshot_path, self.MAIN_MENU_INDICATORS, self.confidence_threshold):
+            if state == AutoStartState.LAUNCHER:
                 return "MAIN_MENU"
             return "UNKNOWN_STATE"
         except Exception as e:
             self.log_message(f"❌ Error detecting game state: {e}")
             return "UNKNOWN_STATE"
     
-    def _find_any_template_with_confidence(self, screenshot_path: str, template_names: list, confidence: float) -> bool:
-        """Find any template from list with specific confidence"""
-        try:
-            screenshot = cv2.imread(screenshot_path)
-            if screenshot is None:
-                return False
-            
-            for template_name in template_names:
-                template_path = os.path.join(self.templates_dir, template_name)
-                if not os.path.exists(template_path):
-                    continue
-                
-                template = cv2.imread(template_path)
-                if template is None:
-                    continue
-                
-                result = cv2.matchTemplate(screenshot, template, cv2.TM_CCOEFF_NORMED)
-                _, max_val, _, _ = cv2.minMaxLoc(result)
-                
-                if max_val >= confidence:
-                    self.log_message(f"✅ Template match: {template_name} (confidence: {max_val:.3f}) [threshold: {confidence}]")
-                    return True
-            
-            return False
-            
-        except Exception as e:
-            self.log_message(f"❌ Error in template matching: {e}")
-            return False
-    
-    def _start_from_main_menu_improved(self, screenshot_path: str, instance_index: int) -> bool:
-        """Start game from main menu with improved timing"""
-        try:
-            self.log_message(f"🎮 Starting game from main menu")
-            
-            # Try to find and click game launcher template
-            for template in self.MAIN_MENU_INDICATORS:
-                if self._click_template_improved(screenshot_path, template, instance_index):
-                    self.log_message(f"✅ Clicked game launcher using template: {template}")
-                    
-                    # IMPROVED: Wait 5 seconds for game loading to start
-                    self.log_message("⏳ Waiting 5 seconds for game loading to begin...")
-                    time.sleep(5)
-                    
-                    return self._wait_for_game_load_improved(instance_index)
-            
-            self.log_message("❌ No main menu templates matched current screen")
-            return False
-            
-        except Exception as e:
-            self.log_message(f"❌ Error starting from main menu: {e}")
+    def _click_match(self, frame, instance_index: int) -> bool:
+        """Click the centre of the state machine's last template match"""
+        match = self.state_machine.last_match
+        if not match:
             return False
+        click_x, click_y = match.center(frame.shape)
+        self.log_message(f"👆 Clicking template {match.name} at ({click_x}, {click_y}) confidence: {match.confidence:.3f}")
+        return self._click_position(instance_index, click_x, click_y)
     
-    def _wait_for_game_load_improved(self, instance_index: int) -> bool:
-        """Wait for game to load - check every second for popups with high precision"""
-        self.log_message(f"⏳ Monitoring game loading (timeout: {self.game_load_timeout}s, checking every 1s)")
-        
-        start_time = time.time()
-        check_count = 0
-        last_state = None
-        consecutive_unknown_states = 0
-        
-        while (time.time() - start_time) < self.game_load_timeout:
-            check_count += 1
-            
-            screenshot_path = self._take_screenshot(instance_index)
-            if not screenshot_path:
-                self.log_message("⚠️ Failed to take screenshot, retrying...")
-                time.sleep(2)
-                continue
-            
-            try:
-                state = self._detect_game_state(screenshot_path)
-                
-                # Only log important state changes
-                if state != last_state and state in ["ALREADY_IN_GAME", "MAIN_MENU"]:
-                    self.log_message(f"🔍 Game state: {state}")
-                last_state = state
-                consecutive_unknown_states = 0
-                
-                if state == "ALREADY_IN_GAME":
-                    if self._verify_game_world_stable(instance_index):
-                        self.log_message(f"✅ Game loaded successfully")
-                        return True
-                elif state == "MAIN_MENU":
-                    # Still in menu - might need another click
-                    self.log_message("🔄 Still in menu - trying to click launcher again")
-                    if self._click_template_improved(screenshot_path, "game_launcher.png", instance_index):
-                        self.log_message("✅ Clicked launcher again")
-                        # Wait another 5 seconds after re-clicking
-                        time.sleep(5)
-                elif state == "UNKNOWN_STATE":
-                    consecutive_unknown_states += 1
-                    
-                    # Check for popups immediately when unknown state detected
-                    if self._check_and_clear_popup_precise(screenshot_path, instance_index):
-                        self.log_message("✅ Cleared popup - continuing to monitor")
-                        consecutive_unknown_states = 0
-                        # Check again quickly after clearing popup
-                        time.sleep(1)
-                        continue
-                
-            finally:
-                self._cleanup_screenshot(screenshot_path)
-            
-            # IMPROVED: Check every 1 second instead of 4 seconds
-            time.sleep(1)
-        
-        self.log_message("❌ Game load timeout")
-        return False
-    
-    def _handle_unknown_state_improved(self, screenshot_path: str, instance_index: int) -> bool:
-        """Handle unknown state - check for popup with high precision"""
-        self.log_message(f"❓ Unknown state - checking for blocking popup")
+    @traced("autostart.popup_clear")
+    @timed_action("popup_clear")
+    def _clear_popup(self, frame, instance_index: int, settle: float = 0.0) -> bool:
+        """Close a popup found with HIGH confidence only, to avoid misclicks
         
-        # Use precise popup checking
-        if self._check_and_clear_popup_precise(screenshot_path, instance_index):
-            time.sleep(2)  # Wait for popup to close
-            
-            # Check state again after clearing popup
-            new_screenshot = self._take_screenshot(instance_index)
-            if new_screenshot:
-                try:
-                    new_state = self._detect_game_state(new_screenshot)
-                    self.log_message(f"🔍 State after popup clearing: {new_state}")
-                    
-                    if new_state == "ALREADY_IN_GAME":
-                        return self._verify_game_world_stable(instance_index)
-                    elif new_state == "MAIN_MENU":
-                        return self._start_from_main_menu_improved(new_screenshot, instance_index)
-                    else:
-                        self.log_message(f"⚠️ Still unknown after popup clearing: {new_state}")
-                        
-                finally:
-                    self._cleanup_screenshot(new_screenshot)
-        else:
-            self.log_message("ℹ️ No high-confidence popup found")
+        Tap, settle and the next screencap go out as one batched shell call.
+        """
+        match = self.state_machine.last_match
+        if not match:
+            return False
+        click_x, click_y = match.center(frame.shape)
+        self.log_message(f"🎯 HIGH CONFIDENCE popup close: {match.name} at ({click_x}, {click_y}) confidence: {match.confidence:.3f}")
         
-        self.log_message("❌ Could not resolve unknown state")
-        return False
-    
-    def _verify_game_world_stable(self, instance_index: int) -> bool:
-        """Verify game world is stable using templates"""
-        self.log_message(f"🔍 Verifying game world stability...")
+        batch = ActionBatch(self.instance_manager.backend, instance_index, self.instance_name)
+        batch.tap(click_x, click_y).wait(settle).screencap(self.device_screenshot)
+        result = batch.execute()
         
-        stable_checks = 0
-        for check in range(3):
-            time.sleep(1)
-            
-            screenshot_path = self._take_screenshot(instance_index)
-            if screenshot_path:
-                try:
-                    if self._find_any_template_with_confidence(screenshot_path, self.GAME_WORLD_INDICATORS, self.world_confidence):
-                        stable_checks += 1
-                        self.log_message(f"✅ Stability check {check + 1}/3: game world detected")
-                    else:
-                        self.log_message(f"❌ Stability check {check + 1}/3: no game world detected")
-                finally:
-                    self._cleanup_screenshot(screenshot_path)
-        
-        is_stable = stable_checks >= 2
-        if is_stable:
-            self.log_message(f"✅ Game world confirmed stable ({stable_checks}/3 checks)")
-        else:
-            self.log_message(f"❌ Game world unstable ({stable_checks}/3 checks)")
+        if not result.success:
+            # Re-observe and retry - a fresh frame tells whether the tap landed
+            self.log_message(f"❌ Popup close batch failed: {result.error or result.failed_step}")
+            return False
         
-        return is_stable
+        self._precaptured = True
+        return True
     
-    def _is_game_already_running(self) -> bool:
-        """Check if game is already running using templates"""
+    def _is_game_already_running(self):
+        """Check if game is already running using templates (run step)"""
         try:
             instance = self.instance_manager.get_instance(self.instance_name)
             if not instance:
                 return False
-                
-            screenshot_path = self._take_screenshot(instance['index'])
-            if not screenshot_path:
-                return False
-            
-            try:
-                return self._find_any_template_with_confidence(screenshot_path, self.GAME_WORLD_INDICATORS, self.world_confidence)
-            finally:
-                self._cleanup_screenshot(screenshot_path)
-                
+            yield from self._capture_slot()
+            state, _ = self._observe_screen(instance['index'])
+            return state == AutoStartState.WORLD
         except Exception as e:
             self.log_message(f"❌ Error checking if game running: {e}")
             return False
     
-    def _verify_stable_game_state(self) -> bool:
-        """Quick stability verification"""
+    def _verify_stable_game_state(self):
+        """Confirm the world screen on consecutive frames (run step)"""
         try:
             instance = self.instance_manager.get_instance(self.instance_name)
             if not instance:
                 return False
-            return self._verify_game_world_stable(instance['index'])
-        except:
-            return False
-    
-    def _click_template_improved(self, screenshot_path: str, template_name: str, instance_index: int) -> bool:
-        """Improved template clicking with better accuracy"""
-        try:
-            template_path = os.path.join(self.templates_dir, template_name)
-            if not os.path.exists(template_path):
-                return False
-            
-            screenshot = cv2.imread(screenshot_path)
-            template = cv2.imread(template_path)
-            
-            if screenshot is None or template is None:
-                return False
-            
-            result = cv2.matchTemplate(screenshot, template, cv2.TM_CCOEFF_NORMED)
-            _, max_val, _, max_loc = cv2.minMaxLoc(result)
-            
-            # Use appropriate confidence threshold
-            threshold = self.close_button_confidence if template_name in self.CLOSE_BUTTONS else self.confidence_threshold
             
-            if max_val >= threshold:
-                template_h, template_w = template.shape[:2]
-                click_x = max_loc[0] + template_w // 2
-                click_y = max_loc[1] + template_h // 2
-                
-                # Ensure click is within reasonable bounds
-                screen_h, screen_w = screenshot.shape[:2]
-                click_x = max(10, min(click_x, screen_w - 10))
-                click_y = max(10, min(click_y, screen_h - 10))
-                
-                self.log_message(f"👆 Clicking template {template_name} at ({click_x}, {click_y}) confidence: {max_val:.3f}")
-                return self._click_position(instance_index, click_x, click_y)
-            
-            return False
-            
-        except Exception as e:
-            self.log_message(f"❌ Error clicking template {template_name}: {e}")
+            for _ in range(self.world_confirmations):
+                if self.state_machine.state == AutoStartState.WORLD and \
+                        self.state_machine.confirmations >= self.world_confirmations:
+                    return True
+                yield self.world_confirm_interval
+                yield from self._capture_slot()
+                state, _ = self._observe_screen(instance['index'])
+                if state != AutoStartState.WORLD:
+                    return False
+            return self.state_machine.confirmations >= self.world_confirmations
+        except Exception:
             return False
     
+    @traced("tap")
+    @timed_action("tap")
     def _click_position(self, instance_index: int, x: int, y: int) -> bool:
         """Click at coordinates using MEmu ADB"""
         try:
-            memuc_path = self.instance_manager.MEMUC_PATH
-            tap_cmd = [memuc_path, "adb", "-i", str(instance_index), "shell", "input", "tap", str(x), str(y)]
-            result = subprocess.run(tap_cmd, capture_output=True, text=True, timeout=10)
+            backend = self.instance_manager.backend
+            result = backend.shell(instance_index, ["input", "tap", str(x), str(y)], timeout=10)
             
             if result.returncode == 0:
                 return True
@@ -646,36 +705,38 @@ class AutoStartGameModule:
             self.log_message(f"❌ Error clicking position: {e}")
             return False
     
+    @traced("capture")
+    @timed_action("capture")
     def _take_screenshot(self, instance_index: int) -> Optional[str]:
         """Take screenshot using MEmu ADB"""
         try:
             import tempfile
             temp_dir = tempfile.gettempdir()
             local_screenshot = os.path.join(temp_dir, f"autostart_{instance_index}_{int(time.time())}.png")
-            device_screenshot = "/sdcard/autostart_screen.png"
-            
-            memuc_path = self.instance_manager.MEMUC_PATH
-            
-            # Take and pull screenshot
-            capture_cmd = [memuc_path, "adb", "-i", str(instance_index), "shell", "screencap", "-p", device_screenshot]
-            capture_result = subprocess.run(capture_cmd, capture_output=True, text=True, timeout=15)
+            device_screenshot = self.device_screenshot
             
-            if capture_result.returncode != 0:
-                self.log_message(f"❌ Screenshot capture failed: {capture_result.stderr}")
-                return None
+            backend = self.instance_manager.backend
             
-            time.sleep(0.5)
+            if self._precaptured:
+                # Already captured on the device by the last action batch
+                self._precaptured = False
+            else:
+                capture_result = backend.shell(instance_index, ["screencap", "-p", device_screenshot], timeout=15)
+                
+                if capture_result.returncode != 0:
+                    self.log_message(f"❌ Screenshot capture failed: {capture_result.stderr}")
+                    return None
+                
+                time.sleep(0.5)
             
-            pull_cmd = [memuc_path, "adb", "-i", str(instance_index), "pull", device_screenshot, local_screenshot]
-            pull_result = subprocess.run(pull_cmd, capture_output=True, text=True, timeout=15)
+            pull_result = backend.adb(instance_index, ["pull", device_screenshot, local_screenshot], timeout=15)
             
             if pull_result.returncode != 0:
                 self.log_message(f"❌ Screenshot pull failed: {pull_result.stderr}")
                 return None
             
             # Cleanup device
-            subprocess.run([memuc_path, "adb", "-i", str(instance_index), "shell", "rm", device_screenshot], 
-                          capture_output=True, timeout=5)
+            backend.shell(instance_index, ["rm", device_screenshot], timeout=5)
             
             if os.path.exists(local_screenshot) and os.path.getsize(local_screenshot) > 10000:
                 return local_screenshot
@@ -700,27 +761,10 @@ class AutoStartGameModule:
         """Cleanup when instance stops"""
         self.game_start_completed = False
         self.last_successful_start = None
+        self.state_machine.reset()
         self._set_game_accessible_state(False)
         self.log_message(f"🧹 Cleaned up AutoStartGame for stopped instance")
     
     def is_game_accessible(self) -> bool:
         """Check if game is accessible"""
         return self.game_start_completed and self.last_successful_start is not None
-    
-    def execute_cycle(self) -> bool:
-        """Execute cycle for module manager"""
-        try:
-            if not self.is_available:
-                return False
-            
-            instance = self.instance_manager.get_instance(self.instance_name)
-            if not instance or instance["status"] != "Running":
-                return True
-            
-            if not self.game_start_completed:
-                return self.start_auto_game()
-            
-            return True
-            
-        except:
-            return False
\ No newline at end of file
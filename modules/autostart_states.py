@@ -0,0 +1,200 @@
+"""
+BENSON v2.0 - AutoStart State Machine
+Remembers the last confirmed game screen per instance and only tests the
+templates for the screens likely to come next
+"""
+
+import os
+import threading
+import time
+from enum import Enum
+from typing import Dict, List, Optional, Tuple
+
+from utils.lazy_import import lazy_import, module_available
+
+# Deferred import - cv2 loads with the first template
+cv2 = lazy_import("cv2")
+CV2_AVAILABLE = module_available("cv2")
+
+
+class AutoStartState(Enum):
+    """Screens AutoStart can be on"""
+    UNKNOWN = "unknown"
+    LAUNCHER = "launcher"    # Launcher / main menu with a start button
+    LOADING = "loading"      # Launcher clicked, nothing recognisable yet
+    POPUP = "popup"          # Offer/dialog with a close button
+    WORLD = "world"          # In game
+
+
+# Likely next screens, most likely first. States not listed are only tried after these miss.
+TRANSITIONS = {
+    AutoStartState.UNKNOWN: [AutoStartState.WORLD, AutoStartState.LAUNCHER, AutoStartState.POPUP],
+    AutoStartState.LAUNCHER: [AutoStartState.LAUNCHER, AutoStartState.POPUP],
+    AutoStartState.LOADING: [AutoStartState.POPUP, AutoStartState.WORLD],
+    AutoStartState.POPUP: [AutoStartState.POPUP, AutoStartState.WORLD],
+    AutoStartState.WORLD: [AutoStartState.WORLD, AutoStartState.POPUP],
+}
+
+
+class TemplateMatch:
+    """Template hit with its click point"""
+
+    def __init__(self, name: str, confidence: float, location: Tuple[int, int], size: Tuple[int, int]):
+        self.name = name
+        self.confidence = confidence
+        self.location = location
+        self.size = size
+
+    def center(self, frame_shape) -> Tuple[int, int]:
+        """Click point clamped 10px inside the frame"""
+        width, height = self.size
+        x = self.location[0] + width // 2
+        y = self.location[1] + height // 2
+        screen_h, screen_w = frame_shape[:2]
+        return max(10, min(x, screen_w - 10)), max(10, min(y, screen_h - 10))
+
+
+class TemplateCache:
+    """Templates decoded once and shared by every AutoStart instance"""
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def for_directory(cls, templates_dir: str) -> "TemplateCache":
+        key = os.path.abspath(templates_dir)
+        with cls._instances_lock:
+            cache = cls._instances.get(key)
+            if cache is None:
+                cache = cls._instances[key] = cls(templates_dir)
+            return cache
+
+    def __init__(self, templates_dir: str):
+        self.templates_dir = templates_dir
+        self.templates = {}
+        self.catalogue = None
+        self.catalogue_reported = False
+        self.lock = threading.Lock()
+    
+    def available(self) -> List[str]:
+        """Template file names in the directory - listed once and shared"""
+        if self.catalogue is None:
+            with self.lock:
+                if self.catalogue is None:
+                    try:
+                        os.makedirs(self.templates_dir, exist_ok=True)
+                        self.catalogue = sorted(f for f in os.listdir(self.templates_dir) if f.endswith('.png'))
+                    except OSError:
+                        self.catalogue = []
+        return self.catalogue
+    
+    def claim_report(self) -> bool:
+        """True for the first caller only - the detailed template listing is logged once per directory"""
+        with self.lock:
+            if self.catalogue_reported:
+                return False
+            self.catalogue_reported = True
+            return True
+
+    def get(self, name: str):
+        """Decoded template or None if missing/unreadable (misses are cached too)"""
+        if name in self.templates:
+            return self.templates[name]
+
+        with self.lock:
+            if name not in self.templates:
+                path = os.path.join(self.templates_dir, name)
+                self.templates[name] = cv2.imread(path) if CV2_AVAILABLE and os.path.exists(path) else None
+            return self.templates[name]
+
+    def invalidate(self):
+        with self.lock:
+            self.templates.clear()
+            self.catalogue = None
+
+    def match_first(self, frame, names: List[str], confidence: float) -> Optional[TemplateMatch]:
+        """First template in names matching at or above confidence"""
+        for name in names:
+            template = self.get(name)
+            if template is None:
+                continue
+            if template.shape[0] > frame.shape[0] or template.shape[1] > frame.shape[1]:
+                continue
+
+            result = cv2.matchTemplate(frame, template, cv2.TM_CCOEFF_NORMED)
+            _, max_val, _, max_loc = cv2.minMaxLoc(result)
+            if max_val >= confidence:
+                return TemplateMatch(name, max_val, max_loc, (template.shape[1], template.shape[0]))
+        return None
+
+
+class AutoStartStateMachine:
+    """Per-instance screen tracking with confirmation counts"""
+
+    def __init__(self, state_templates: Dict[AutoStartState, List[str]],
+                 state_confidence: Dict[AutoStartState, float], cache: TemplateCache):
+        self.state_templates = state_templates
+        self.state_confidence = state_confidence
+        self.cache = cache
+
+        self.state = AutoStartState.UNKNOWN
+        self.confirmations = 0
+        self.last_confirmed_state = None
+        self.last_match = None
+        self.templates_tested = 0
+        self.history = []
+
+    def reset(self):
+        """Forget everything - the instance was stopped"""
+        self.state = AutoStartState.UNKNOWN
+        self.confirmations = 0
+        self.last_confirmed_state = None
+        self.last_match = None
+
+    def resume(self):
+        """Start a retry from the last confirmed screen instead of re-detecting from UNKNOWN"""
+        self.state = self.last_confirmed_state or AutoStartState.UNKNOWN
+        self.confirmations = 0
+        self.last_match = None
+
+    def expect(self, state: AutoStartState):
+        """Move to a state we caused ourselves (e.g. LOADING after clicking the launcher)"""
+        self._transition(state)
+
+    def candidate_order(self) -> List[AutoStartState]:
+        """Expected next states first, then everything else as fallback"""
+        expected = TRANSITIONS.get(self.state, [])
+        rest = [s for s in TRANSITIONS[AutoStartState.UNKNOWN] if s not in expected]
+        return expected + rest
+
+    def observe(self, frame) -> AutoStartState:
+        """Classify one frame, testing templates for likely transitions first"""
+        self.templates_tested = 0
+        for candidate in self.candidate_order():
+            names = self.state_templates.get(candidate, [])
+            match = self.cache.match_first(frame, names, self.state_confidence.get(candidate, 0.8))
+            self.templates_tested += len(names) if match is None else names.index(match.name) + 1
+            if match:
+                self.last_match = match
+                self._transition(candidate)
+                return candidate
+
+        self.last_match = None
+        # Nothing recognisable: keep waiting while loading, otherwise we're lost
+        if self.state != AutoStartState.LOADING:
+            self._transition(AutoStartState.UNKNOWN)
+        else:
+            self.confirmations += 1
+        return self.state
+
+    def _transition(self, state: AutoStartState):
+        if state == self.state:
+            self.confirmations += 1
+            if self.confirmations >= 2:
+                self.last_confirmed_state = state
+            return
+
+        self.history.append((time.time(), self.state.value, state.value))
+        del self.history[:-50]
+        self.state = state
+        self.confirmations = 1
@@ -6,12 +6,16 @@ Reduced from 300+ lines to ~120 lines with same functionality
 import os
 import threading
 import time
-import subprocess
 import tempfile
 from typing import Dict, List, Optional, Callable, Any
 from datetime import datetime
 from enum import Enum
 
+from modules.cycle_timing import CycleTimingPolicy
+from utils.adb_actions import ActionBatch
+from utils.database import get_database
+from utils.metrics import metrics, timed_action
+
 
 class ModuleStatus(Enum):
     """Module execution status"""
@@ -21,6 +25,7 @@ class ModuleStatus(Enum):
     STOPPING = "stopping"
     ERROR = "error"
     PAUSED = "paused"
+    IDLE = "idle"  # Running but waiting for work - woken by _signal()
 
 
 class ModulePriority(Enum):
@@ -35,13 +40,14 @@ class ModulePriority(Enum):
 class BaseModule:
     """Compact base class for all automation modules"""
     
+    module_name = "BaseModule"
+    
     def __init__(self, instance_name: str, shared_resources, console_callback: Callable = None):
         self.instance_name = instance_name
         self.shared_resources = shared_resources
         self.console_callback = console_callback or print
         
         # Module identification
-        self.module_name = "BaseModule"
         self.version = "1.0.0"
         
         # Execution state
@@ -50,10 +56,16 @@ class BaseModule:
         self.check_interval = 30
         self.max_retries = 3
         self.retry_count = 0
+        self.timing = CycleTimingPolicy()
         
-        # Threading
+        # Threading - scheduler is an optional AsyncModuleScheduler replacing the worker thread
         self.stop_event = threading.Event()
         self.worker_thread = None
+        self.scheduler = None
+        
+        # Wake-up signal for stop/pause/resume/run-now - waits block on this instead of polling
+        self.wake_condition = threading.Condition()
+        self.wake_requested = False
         self.last_execution = None
         self.next_execution = None
         
@@ -67,6 +79,11 @@ class BaseModule:
         # Shared state
         self.shared_state = {}
         
+        # Settings pushed while running - swapped in at the start of the next cycle
+        self.settings_lock = threading.Lock()
+        self.pending_settings = None
+        self.settings_version = 0
+        
         self.log_message(f"✅ {self.module_name} module initialized")
     
     def get_module_priority(self) -> ModulePriority:
@@ -103,6 +120,13 @@ class BaseModule:
             self.stop_event.clear()
             self.retry_count = 0
             self.start_time = datetime.now()
+            self.next_execution = time.time() + self.timing.initial_delay(self.check_interval)
+            
+            # Shared event loop instead of a dedicated thread
+            if self.scheduler:
+                self.scheduler.register(self)
+                self.log_message(f"✅ {self.module_name} scheduled on {self.scheduler.name}")
+                return True
             
             # Start worker thread
             self.worker_thread = threading.Thread(
@@ -112,8 +136,9 @@ class BaseModule:
             )
             self.worker_thread.start()
             
-            # Quick status check
-            time.sleep(0.5)
+            # Quick status check - returns as soon as the worker reports in
+            with self.wake_condition:
+                self.wake_condition.wait_for(lambda: self.status != ModuleStatus.STARTING, timeout=0.5)
             
             if self.status == ModuleStatus.RUNNING:
                 self.log_message(f"✅ {self.module_name} started successfully")
@@ -141,6 +166,11 @@ class BaseModule:
             self.log_message(f"🛑 Stopping {self.module_name}...")
             self.status = ModuleStatus.STOPPING
             self.stop_event.set()
+            self._signal()
+            
+            if self.scheduler:
+                if not self.scheduler.unregister(self, timeout=10):
+                    self.log_message(f"⚠️ {self.module_name} scheduled task did not stop gracefully")
             
             # Wait for worker thread
             if self.worker_thread and self.worker_thread.is_alive():
@@ -163,58 +193,51 @@ class BaseModule:
         """Pause module execution"""
         if self.status == ModuleStatus.RUNNING:
             self.status = ModuleStatus.PAUSED
+            self._signal()
             self.log_message(f"⏸️ Paused {self.module_name}")
     
     def resume(self):
         """Resume module execution"""
         if self.status == ModuleStatus.PAUSED:
             self.status = ModuleStatus.RUNNING
+            self._signal()
             self.log_message(f"▶️ Resumed {self.module_name}")
     
+    def run_now(self):
+        """Skip the remaining interval and run the next cycle immediately"""
+        if self.status in [ModuleStatus.RUNNING, ModuleStatus.STARTING]:
+            self.next_execution = time.time()
+            self._signal()
+    
+    def _signal(self):
+        """Wake the worker thread or scheduled task so it re-checks its state"""
+        with self.wake_condition:
+            self.wake_requested = True
+            self.wake_condition.notify_all()
+        if self.scheduler:
+            self.scheduler.wake(self)
+    
     def _worker_loop(self):
         """Main worker loop with compact error handling"""
         try:
-            self.status = ModuleStatus.RUNNING
+            self._set_status_and_notify(ModuleStatus.RUNNING)
             self.log_message(f"🔄 {self.module_name} worker loop started")
             
+            # Staggered first cycle
+            if self.next_execution:
+                self._safe_sleep(max(0, self.next_execution - time.time()))
+            
             while not self.stop_event.is_set():
                 try:
                     if self.status == ModuleStatus.RUNNING:
-                        # Execute module cycle
-                        cycle_start = time.time()
-                        
-                        try:
-                            success = self.execute_cycle()
-                        except Exception as cycle_error:
-                            self.log_message(f"❌ Cycle error: {cycle_error}")
-                            success = False
-                        
-                        cycle_time = time.time() - cycle_start
-                        self.execution_count += 1
-                        self.last_execution = datetime.now()
-                        
-                        if success:
-                            self.success_count += 1
-                            self.retry_count = 0
-                            # Log every 10th success to reduce spam
-                            if self.execution_count % 10 == 1:
-                                self.log_message(f"✅ {self.module_name} cycle {self.execution_count} completed ({cycle_time:.1f}s)")
-                        else:
-                            self.error_count += 1
-                            self.retry_count += 1
-                            self.log_message(f"❌ {self.module_name} cycle {self.execution_count} failed (retry {self.retry_count}/{self.max_retries})")
-                            
-                            if self.retry_count >= self.max_retries:
-                                self.log_message(f"🛑 {self.module_name} max retries exceeded, stopping")
-                                break
-                        
-                        # Calculate sleep time
-                        sleep_time = max(0, self.check_interval - cycle_time)
-                        self.next_execution = datetime.now().timestamp() + sleep_time
+                        sleep_time = self._run_cycle()
+                        if sleep_time is None:
+                            break
                         self._safe_sleep(sleep_time)
                     
-                    elif self.status == ModuleStatus.PAUSED:
-                        self._safe_sleep(1)
+                    elif self.status in (ModuleStatus.PAUSED, ModuleStatus.IDLE):
+                        # No timeout - resume(), new work or stop() wakes us
+                        self._safe_sleep(None)
                     else:
                         break
                         
@@ -222,7 +245,7 @@ class BaseModule:
                     self.error_count += 1
                     self.last_error = str(e)
                     self.log_message(f"❌ {self.module_name} worker error: {e}")
-                    self._safe_sleep(min(self.check_interval, 30))
+                    self._safe_sleep(self.timing.next_delay(min(self.check_interval, 30), 0, 1))
             
             self.log_message(f"🏁 {self.module_name} worker loop ended")
             
@@ -234,16 +257,121 @@ class BaseModule:
             if self.status != ModuleStatus.STOPPING:
                 self.status = ModuleStatus.STOPPED
     
-    def _safe_sleep(self, duration: float):
-        """Sleep with interruption check"""
-        sleep_steps = max(1, int(duration * 10))
-        step_duration = duration / sleep_steps
+    def _run_cycle(self) -> Optional[float]:
+        """Execute one cycle with bookkeeping - returns seconds until next cycle, None to stop"""
+        self._apply_pending_settings()
+        cycle_start = time.time()
+        
+        failure_reason = "returned_false"
+        try:
+            success = self.execute_cycle()
+        except Exception as cycle_error:
+            self.log_message(f"❌ Cycle error: {cycle_error}")
+            failure_reason = type(cycle_error).__name__
+            success = False
+        
+        cycle_time = time.time() - cycle_start
+        self._record_cycle(cycle_start, cycle_time, success, failure_reason)
+        self.execution_count += 1
+        self.last_execution = datetime.now()
+        
+        if success:
+            self.success_count += 1
+            self.retry_count = 0
+            # Log every 10th success to reduce spam
+            if self.execution_count % 10 == 1:
+                self.log_message(f"✅ {self.module_name} cycle {self.execution_count} completed ({cycle_time:.1f}s)")
+        else:
+            self.error_count += 1
+            self.retry_count += 1
+            self.log_message(f"❌ {self.module_name} cycle {self.execution_count} failed (retry {self.retry_count}/{self.max_retries})")
+            
+            if self.retry_count >= self.max_retries:
+                cooldown = self.timing.after_max_retries()
+                if cooldown is None:
+                    self.log_message(f"🛑 {self.module_name} max retries exceeded, stopping")
+                    return None
+                self.log_message(f"🧊 {self.module_name} max retries exceeded, retrying in {cooldown:.0f}s")
+                self.retry_count = 0
+                self.next_execution = time.time() + cooldown
+                return cooldown
         
-        for _ in range(sleep_steps):
-            if self.stop_event.is_set():
-                break
-            time.sleep(step_duration)
+        # Jittered interval on success, capped exponential backoff on failure
+        sleep_time = self.timing.next_delay(self.check_interval, cycle_time, self.retry_count)
+        self.next_execution = time.time() + sleep_time
+        return sleep_time
     
+    def _record_cycle(self, started: float, duration: float, success: bool, failure_reason: str = None):
+        """Cycle histogram, failure counter and run history row for one unit of module work"""
+        metrics.observe("module_cycle_seconds", duration, module=self.module_name,
+                        instance=self.instance_name, result="success" if success else "failure")
+        if not success:
+            metrics.increment("module_cycle_failures_total", module=self.module_name,
+                              instance=self.instance_name, reason=failure_reason)
+        database = get_database()
+        if database:
+            database.record_run(self.instance_name, self.module_name, started, duration, success,
+                                None if success else failure_reason)
+    
+    def _set_status_and_notify(self, status: ModuleStatus):
+        with self.wake_condition:
+            self.status = status
+            self.wake_condition.notify_all()
+    
+    def _safe_sleep(self, duration: Optional[float]):
+        """Block until duration elapses (None = indefinitely) or stop/pause/resume/run-now signals"""
+        with self.wake_condition:
+            if not self.wake_requested and not self.stop_event.is_set():
+                self.wake_condition.wait(duration)
+            self.wake_requested = False
+    
+    # Hot reload - settings key -> attribute, extend in subclasses
+    SETTING_ATTRIBUTES = {"enabled": "enabled", "check_interval": "check_interval", "max_retries": "max_retries"}
+
+    def apply_settings(self, settings: Dict):
+        """Queue new settings for a running module - applied as one unit before its next cycle"""
+        with self.settings_lock:
+            self.pending_settings = dict(settings)
+
+    def _apply_pending_settings(self) -> Dict:
+        """Swap in queued settings between cycles; returns the changed attributes"""
+        with self.settings_lock:
+            settings, self.pending_settings = self.pending_settings, None
+        if settings is None:
+            return {}
+
+        changed = {}
+        # Recovery after max_retries is opt-in per module ("recovery": true in its settings)
+        targets = [(self, key, attribute) for key, attribute in self.SETTING_ATTRIBUTES.items()]
+        targets += [(self.timing, key, key) for key in ("recovery", "recovery_delay")]
+        for target, key, attribute in targets:
+            if key not in settings:
+                continue
+            try:
+                value = self._coerce_setting(getattr(target, attribute, None), settings[key])
+            except (TypeError, ValueError):
+                self.log_message(f"⚠️ Ignoring invalid setting {key}={settings[key]!r}")
+                continue
+            if getattr(target, attribute, None) != value:
+                setattr(target, attribute, value)
+                changed[attribute] = value
+        self.settings_version += 1
+        if changed:
+            self._on_settings_applied(changed)
+            self.log_message(f"🔧 Settings applied: {changed}")
+        return changed
+
+    @staticmethod
+    def _coerce_setting(current, value):
+        """Keep numeric attributes numeric - a JSON "5" or 5.0 must not turn an int count into a str/float"""
+        if isinstance(current, bool) or not isinstance(current, (int, float)):
+            return value
+        return int(value) if isinstance(current, int) else float(value)
+
+    def _on_settings_applied(self, changed: Dict):
+        """Hook for settings that need more than an attribute swap - override in subclasses"""
+        pass
+
     def execute_cycle(self) -> bool:
         """Execute one cycle - override in subclasses"""
         self.log_message(f"📋 {self.module_name} base cycle executed")
@@ -281,10 +409,12 @@ class BaseModule:
             "last_execution": self.last_execution.isoformat() if self.last_execution else None,
             "next_execution": datetime.fromtimestamp(self.next_execution).isoformat() if self.next_execution else None,
             "uptime_seconds": uptime,
-            "last_error": self.last_error
+            "last_error": self.last_error,
+            "metrics": metrics.get_summary(module=self.module_name, instance=self.instance_name)
         }
     
     # Utility methods for subclasses
+    @timed_action("capture")
     def get_screenshot(self) -> Optional[str]:
         """Take screenshot of the instance"""
         try:
@@ -307,11 +437,10 @@ class BaseModule:
             local_screenshot = os.path.join(temp_dir, f"module_screenshot_{instance_index}_{int(time.time())}.png")
             device_screenshot = "/sdcard/module_screen.png"
             
-            memuc_path = self.shared_resources.MEMUC_PATH
+            backend = self.shared_resources.backend
             
             # Capture screenshot
-            capture_cmd = [memuc_path, "adb", "-i", str(instance_index), "shell", "screencap", "-p", device_screenshot]
-            capture_result = subprocess.run(capture_cmd, capture_output=True, text=True, timeout=15)
+            capture_result = backend.shell(instance_index, ["screencap", "-p", device_screenshot], timeout=15)
             
             if capture_result.returncode != 0:
                 self.log_message(f"❌ Screenshot capture failed: {capture_result.stderr}")
@@ -320,8 +449,7 @@ class BaseModule:
             time.sleep(0.5)
             
             # Pull screenshot
-            pull_cmd = [memuc_path, "adb", "-i", str(instance_index), "pull", device_screenshot, local_screenshot]
-            pull_result = subprocess.run(pull_cmd, capture_output=True, text=True, timeout=15)
+            pull_result = backend.adb(instance_index, ["pull", device_screenshot, local_screenshot], timeout=15)
             
             if pull_result.returncode != 0:
                 self.log_message(f"❌ Screenshot pull failed: {pull_result.stderr}")
@@ -329,8 +457,7 @@ class BaseModule:
             
             # Cleanup device screenshot
             try:
-                cleanup_cmd = [memuc_path, "adb", "-i", str(instance_index), "shell", "rm", device_screenshot]
-                subprocess.run(cleanup_cmd, capture_output=True, timeout=5)
+                backend.shell(instance_index, ["rm", device_screenshot], timeout=5)
             except:
                 pass
             
@@ -346,6 +473,7 @@ class BaseModule:
             self.log_message(f"❌ Screenshot error: {e}")
             return None
     
+    @timed_action("tap")
     def click_position(self, x: int, y: int) -> bool:
         """Click at specific coordinates"""
         try:
@@ -359,11 +487,10 @@ class BaseModule:
                 self.log_message(f"❌ No index for instance {self.instance_name}")
                 return False
             
-            memuc_path = self.shared_resources.MEMUC_PATH
+            backend = self.shared_resources.backend
             
             # Use ADB to tap
-            tap_cmd = [memuc_path, "adb", "-i", str(instance_index), "shell", "input", "tap", str(x), str(y)]
-            result = subprocess.run(tap_cmd, capture_output=True, text=True, timeout=10)
+            result = backend.shell(instance_index, ["input", "tap", str(x), str(y)], timeout=10)
             
             if result.returncode == 0:
                 self.log_message(f"👆 Clicked position ({x}, {y})")
@@ -376,6 +503,14 @@ class BaseModule:
             self.log_message(f"❌ Click error at ({x}, {y}): {e}")
             return False
     
+    def action_batch(self):
+        """ActionBatch for this instance - queued taps/swipes/keys/waits go out in one ADB call"""
+        instance = self.shared_resources.get_instance(self.instance_name)
+        if not instance or instance.get("index") is None:
+            self.log_message(f"❌ Instance {self.instance_name} not found for action batch")
+            return None
+        return ActionBatch(self.shared_resources.backend, instance["index"], self.instance_name)
+    
     def get_game_state(self, key: str) -> Any:
         """Get shared game state"""
         return self.shared_state.get(key)
@@ -0,0 +1,47 @@
+"""
+BENSON v2.0 - Cycle Timing Policy
+Start jitter, interval jitter and capped exponential backoff for module cycles
+"""
+
+import random
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class CycleTimingPolicy:
+    """Decides when a module's next cycle runs"""
+    start_jitter: float = 1.0        # First cycle delayed by up to this fraction of check_interval
+    max_start_delay: float = 60.0    # ...but never more than this many seconds
+    interval_jitter: float = 0.1     # +/- fraction applied to every interval
+    backoff_factor: float = 2.0      # Interval multiplier per consecutive failure
+    backoff_cap: float = 300.0       # Longest delay between failing cycles
+    recovery: bool = False           # Opt-in: cool down and retry after max_retries instead of stopping
+    recovery_delay: float = 600.0    # Cool-down after max_retries consecutive failures
+
+    def initial_delay(self, check_interval: float) -> float:
+        """Random offset for the first cycle so instances started together don't fire in lockstep"""
+        window = min(check_interval * self.start_jitter, self.max_start_delay)
+        return random.uniform(0, max(0.0, window))
+
+    def next_delay(self, check_interval: float, cycle_time: float, failures: int) -> float:
+        """Seconds until the next cycle after one that took cycle_time"""
+        if failures <= 0:
+            delay = max(0.0, check_interval - cycle_time)
+            return self._jitter(delay)
+
+        # Full jitter over the backoff window keeps failing instances from retrying together
+        window = min(self.backoff_cap, check_interval * (self.backoff_factor ** (failures - 1)))
+        return random.uniform(window / 2, window)
+
+    def after_max_retries(self) -> Optional[float]:
+        """Cool-down delay once max_retries is hit, or None to stop the module"""
+        if not self.recovery:
+            return None
+        return self._jitter(self.recovery_delay)
+
+    def _jitter(self, delay: float) -> float:
+        if not self.interval_jitter or delay <= 0:
+            return delay
+        spread = delay * self.interval_jitter
+        return max(0.0, delay + random.uniform(-spread, spread))
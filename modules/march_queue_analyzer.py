@@ -3,8 +3,8 @@ BENSON v2.0 - Enhanced March Queue Analyzer
 Fixed version with error handling and improved methods
 """
 
-import cv2
-import numpy as np
+from __future__ import annotations
+
 import time
 import os
 import math
@@ -14,6 +14,16 @@ from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
+from utils.database import get_database
+from utils.lazy_import import lazy_import
+from utils.lazy_ocr import easy_ocr, tesseract_available
+from utils.metrics import timed_action
+from utils.tracing import traced, tracer
+
+# Deferred imports - loaded with the first screenshot analysis
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
 
 @dataclass
 class QueueInfo:
@@ -43,10 +53,7 @@ class MarchQueueAnalyzer:
         self.config = config
         self.log_callback = log_callback or print
         
-        # OCR setup
-        self.ocr_reader = None
-        self.tesseract_available = False
-        self._initialize_ocr()
+        # OCR engines are shared and load on first use (see utils.lazy_ocr)
         
         # Method performance tracking
         self.method_scores = {}
@@ -55,6 +62,9 @@ class MarchQueueAnalyzer:
         # Thread safety for parallel processing
         self.results_lock = Lock()
         
+        # region_id -> (confidence, method) of the winning read in the current analysis
+        self.region_reads = {}
+        
         # Simple queue regions
         self.queue_regions = {
             1: {
@@ -83,30 +93,26 @@ class MarchQueueAnalyzer:
             }
         }
     
+    @property
+    def ocr_reader(self):
+        """Shared EasyOCR reader, created on first use"""
+        return easy_ocr.get()
+    
+    @property
+    def tesseract_available(self) -> bool:
+        return tesseract_available()
+    
     def _initialize_ocr(self):
-        """Initialize OCR readers"""
-        try:
-            import easyocr
-            self.ocr_reader = easyocr.Reader(['en'], gpu=False)
-            self.log("✅ EasyOCR reader initialized")
-        except ImportError:
-            self.log("❌ easyocr not installed")
-            return False
-        except Exception as e:
-            self.log(f"❌ EasyOCR initialization failed: {e}")
+        """Load OCR engines now instead of on the first analysis"""
+        if not self.ocr_reader:
+            self.log(f"❌ EasyOCR unavailable: {easy_ocr.error}")
             return False
+        self.log("✅ EasyOCR reader initialized")
         
-        # Try to initialize Tesseract
-        try:
-            import pytesseract
-            # Test if tesseract is available
-            pytesseract.get_tesseract_version()
-            self.tesseract_available = True
+        if self.tesseract_available:
             self.log("✅ Tesseract OCR available")
-        except:
+        else:
             self.log("⚠️ Tesseract not available (optional)")
-            self.tesseract_available = False
-        
         return True
     
     def log(self, message: str):
@@ -115,6 +121,7 @@ class MarchQueueAnalyzer:
         formatted_message = f"{timestamp} [MarchAnalyzer-{self.instance_name}] {message}"
         self.log_callback(formatted_message)
     
+    @traced("march.analyze")
     def analyze_march_queues(self, screenshot_path: str) -> Dict[int, QueueInfo]:
         """Enhanced OCR analysis of march queues with parallel processing"""
         try:
@@ -131,6 +138,8 @@ class MarchQueueAnalyzer:
                 return {}
             
             # Analyze queues in parallel for better performance
+            with self.results_lock:
+                self.region_reads = {}
             queues = self._analyze_queues_parallel(screenshot)
             
             # Count available queues
@@ -143,6 +152,7 @@ class MarchQueueAnalyzer:
             
             # Log method performance summary
             self._log_method_performance()
+            self._record_results(queues)
             
             return queues
             
@@ -150,6 +160,28 @@ class MarchQueueAnalyzer:
             self.log(f"❌ OCR analysis error: {e}")
             return {}
     
+    def _record_results(self, queues: Dict[int, QueueInfo]):
+        """Keep OCR history in the database when one is configured"""
+        database = get_database()
+        if not database or not queues:
+            return
+        with self.results_lock:
+            reads = dict(self.region_reads)
+        rows = []
+        for num, queue in sorted(queues.items()):
+            # Per-region reads with the OCR engine's confidence
+            for field in ("task", "timer", "name", "status"):
+                region_id = f"Q{num}_{field}"
+                if region_id in reads:
+                    text = queue.time_remaining if field == "timer" else getattr(queue, field)
+                    confidence, method = reads[region_id]
+                    rows.append((region_id, text, confidence, method))
+            # Queue summary - availability is a verdict, not an OCR confidence
+            text = " | ".join(part for part in (queue.name, queue.task, queue.status, queue.time_remaining) if part)
+            availability = "available" if queue.is_available else "busy"
+            rows.append((f"queue_{num}", f"{text} | {availability}" if text else availability, None, "march_queue"))
+        database.record_ocr_results(self.instance_name, rows)
+    
     def _analyze_queues_parallel(self, screenshot) -> Dict[int, QueueInfo]:
         """Analyze queues in parallel for better performance"""
         queues = {}
@@ -165,7 +197,9 @@ class MarchQueueAnalyzer:
         
         # Process queues in parallel (limit threads to avoid overwhelming)
         with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-            futures = [executor.submit(analyze_single_queue, i) for i in range(1, 7)]
+            # Executor threads don't see this thread's spans - keep march.ocr under march.analyze
+            analyze = tracer.wrap(analyze_single_queue)
+            futures = [executor.submit(analyze, i) for i in range(1, 7)]
             concurrent.futures.wait(futures, timeout=30)  # 30 second timeout
         
         return queues
@@ -239,16 +273,24 @@ class MarchQueueAnalyzer:
             # Quick OCR
             results = self.ocr_reader.readtext(binary, detail=1)
             if results:
-                result = max(results, key=lambda x: x[2])[1]
+                _, result, confidence = max(results, key=lambda x: x[2])
+                self._remember_read(region_id, confidence, "Fallback_Otsu")
                 return self._post_process_text_result(result, region_id)
         
         except Exception as e:
             self.log(f"⚠️ Fallback OCR failed for {region_id}: {e}")
         
         # Strategy 3: Return empty but log for debugging
+        with self.results_lock:
+            self.region_reads.pop(region_id, None)
         self.log(f"❌ All OCR strategies failed for {region_id}")
         return ""
     
+    def _remember_read(self, region_id: str, confidence: float, method: str):
+        """Keep the winning read's confidence for the OCR history"""
+        with self.results_lock:
+            self.region_reads[region_id] = (float(confidence), method)
+    
     def _validate_ocr_result(self, text: str, region_id: str) -> bool:
         """Validate if OCR result makes sense"""
         if not text or len(text.strip()) < 1:
@@ -361,6 +403,8 @@ class MarchQueueAnalyzer:
         
         return result
     
+    @traced("march.ocr")
+    @timed_action("ocr")
     def _enhanced_ocr(self, screenshot, region: tuple, region_id: str) -> str:
         """Enhanced OCR with adaptive method selection"""
         try:
@@ -443,6 +487,7 @@ class MarchQueueAnalyzer:
             
             if best_result and best_result.text:
                 self.log(f"🏆 WINNER: {best_result.method_name} = '{best_result.text}' (conf: {best_result.confidence:.3f}, score: {best_result.score:.3f})")
+                self._remember_read(region_id, best_result.confidence, best_result.method_name)
                 return best_result.text
             else:
                 self.log(f"❌ All {len(enhancement_methods)} methods failed to detect readable text")
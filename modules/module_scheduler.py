@@ -0,0 +1,206 @@
+"""
+BENSON v2.0 - Async Module Scheduler
+Runs module cycles as tasks on one shared event loop instead of one thread per module
+
+AutoStart is a BaseModule too: each run step (one capture + action) is a
+CRITICAL cycle, and between runs the module idles without a task wakeup.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from modules.base_module import ModulePriority, ModuleStatus
+from utils.work_queue import GlobalWorkQueue
+
+
+class AsyncModuleScheduler:
+    """Shared event loop for module cycles; blocking work runs on the global work queue"""
+
+    def __init__(self, max_workers: int = 8, name: str = "ModuleScheduler", work_queue: GlobalWorkQueue = None):
+        self.name = name
+        self.work_queue = work_queue or GlobalWorkQueue(workers=max_workers, name=f"{name}-Work")
+        self.max_workers = self.work_queue.worker_count
+
+        self.loop = None
+        self.thread = None
+        self._started = threading.Event()
+        self._start_lock = threading.Lock()
+
+        # Loop-owned state, keyed by id(module)
+        self.tasks = {}
+        self.modules = {}
+        self.wake_events = {}
+
+    # Lifecycle
+    def start(self):
+        """Start the event loop thread (idempotent)"""
+        with self._start_lock:
+            if self.thread and self.thread.is_alive():
+                return
+
+            self.work_queue.start()
+            self._started.clear()
+            self.thread = threading.Thread(target=self._run_loop, daemon=True, name=self.name)
+            self.thread.start()
+            self._started.wait(5)
+            print(f"[{self.name}] ✅ Event loop started with {self.max_workers} workers")
+
+    def _run_loop(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._started.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    def shutdown(self, timeout: float = 10):
+        """Stop all scheduled modules and the loop"""
+        if not self.loop:
+            return
+
+        for module in list(self.modules.values()):
+            module.stop_event.set()
+            self.wake(module)
+
+        try:
+            asyncio.run_coroutine_threadsafe(self._wait_all(timeout), self.loop).result(timeout + 1)
+        except Exception as e:
+            print(f"[{self.name}] Shutdown wait error: {e}")
+
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.work_queue.shutdown(wait=False)
+        print(f"[{self.name}] 🛑 Event loop stopped")
+
+    async def _wait_all(self, timeout: float):
+        if self.tasks:
+            await asyncio.wait(list(self.tasks.values()), timeout=timeout)
+
+    # Module registration
+    def register(self, module):
+        """Schedule a module's cycles on the shared loop"""
+        self.start()
+        asyncio.run_coroutine_threadsafe(self._add(module), self.loop).result(5)
+
+    def unregister(self, module, timeout: float = 10) -> bool:
+        """Wait for a module (whose stop_event is set) to finish its current cycle"""
+        if not self.loop:
+            return True
+
+        module.stop_event.set()
+        self.wake(module)
+        try:
+            return asyncio.run_coroutine_threadsafe(self._wait_task(id(module), timeout), self.loop).result(timeout + 1)
+        except Exception:
+            return False
+
+    def wake(self, module):
+        """Interrupt a module's wait so it re-checks stop/pause/next_execution"""
+        if self.loop:
+            self.loop.call_soon_threadsafe(self._set_wake, id(module))
+
+    def _set_wake(self, key: int):
+        event = self.wake_events.get(key)
+        if event:
+            event.set()
+
+    async def _add(self, module):
+        key = id(module)
+        task = self.tasks.get(key)
+        if task and not task.done():
+            return
+
+        self.modules[key] = module
+        self.wake_events[key] = asyncio.Event()
+        self.tasks[key] = self.loop.create_task(self._run_module(module))
+
+    async def _wait_task(self, key: int, timeout: float) -> bool:
+        task = self.tasks.get(key)
+        if not task:
+            return True
+        done, _ = await asyncio.wait([task], timeout=timeout)
+        return bool(done)
+
+    async def _wait(self, key: int, timeout: Optional[float]):
+        """Sleep up to timeout (None = until woken), returning early when woken"""
+        event = self.wake_events[key]
+        try:
+            await asyncio.wait_for(event.wait(), timeout=None if timeout is None else max(0, timeout))
+        except asyncio.TimeoutError:
+            pass
+        event.clear()
+
+    async def _run_module(self, module):
+        """Cycle loop for one module - mirrors BaseModule._worker_loop"""
+        key = id(module)
+        try:
+            module.status = ModuleStatus.RUNNING
+            module.log_message(f"🔄 {module.module_name} scheduled loop started")
+
+            while not module.stop_event.is_set():
+                if module.status in (ModuleStatus.PAUSED, ModuleStatus.IDLE):
+                    await self._wait(key, None)
+                    continue
+                if module.status != ModuleStatus.RUNNING:
+                    break
+
+                if module.next_execution:
+                    delay = module.next_execution - time.time()
+                    if delay > 0:
+                        await self._wait(key, delay)
+                        continue
+
+                # Most urgent work across all instances runs first when workers are saturated
+                future = self.work_queue.submit(self._safe_cycle, module,
+                                                priority=module.get_module_priority(),
+                                                deadline=module.next_execution or time.time(),
+                                                name=f"{module.module_name} cycle",
+                                                instance_name=module.instance_name)
+                sleep_time = await asyncio.wrap_future(future)
+
+                if sleep_time is None:
+                    break
+
+            module.log_message(f"🏁 {module.module_name} scheduled loop ended")
+
+        except Exception as e:
+            module.status = ModuleStatus.ERROR
+            module.last_error = str(e)
+            module.log_message(f"❌ {module.module_name} scheduler fatal error: {e}")
+        finally:
+            if module.status not in (ModuleStatus.STOPPING, ModuleStatus.ERROR):
+                module.status = ModuleStatus.STOPPED
+            self.tasks.pop(key, None)
+            self.modules.pop(key, None)
+            self.wake_events.pop(key, None)
+
+    def _safe_cycle(self, module):
+        """Run one cycle on a work queue thread, keeping worker-loop error semantics"""
+        if module.stop_event.is_set():
+            return None
+        try:
+            return module._run_cycle()
+        except Exception as e:
+            module.error_count += 1
+            module.last_error = str(e)
+            module.log_message(f"❌ {module.module_name} worker error: {e}")
+            delay = module.timing.next_delay(min(module.check_interval, 30), 0, 1)
+            module.next_execution = time.time() + delay
+            return delay
+
+    # Blocking work
+    def run_blocking(self, func: Callable, *args, priority: ModulePriority = ModulePriority.MEDIUM,
+                     instance_name: str = None):
+        """Run blocking work (capture/OCR/long tasks) on the global work queue"""
+        self.start()
+        return self.work_queue.submit(func, *args, priority=priority, instance_name=instance_name)
+
+    def get_stats(self) -> Dict:
+        return {
+            "name": self.name,
+            "scheduled_modules": len(self.modules),
+            "running": bool(self.thread and self.thread.is_alive()),
+            "work_queue": self.work_queue.get_stats()
+        }
@@ -0,0 +1,59 @@
+"""
+Settings profiles: legacy (pre-profile) settings files must not shadow profile edits
+"""
+
+import copy
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from utils.settings_profiles import DEFAULT_SETTINGS, ProfileManager
+from utils.settings_store import SettingsStore
+
+
+class LegacySettingsMigrationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        legacy = copy.deepcopy(DEFAULT_SETTINGS)
+        legacy["auto_gather"]["check_interval"] = 120
+        with open(os.path.join(self.directory, "settings_Inst1.json"), "w") as f:
+            json.dump(legacy, f)
+
+        self.store = SettingsStore(directory=self.directory)
+        self.profiles = ProfileManager(self.store)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_profile_edit_reaches_instance_with_legacy_file(self):
+        self.profiles.update_profile("default", "auto_gather", {"resource_loop": ["iron"]})
+
+        self.assertEqual(self.profiles.resolve("Inst1")["auto_gather"]["resource_loop"], ["iron"])
+        self.assertEqual(self.profiles.resolve("Inst2")["auto_gather"]["resource_loop"], ["iron"])
+
+    def test_migration_keeps_real_overrides(self):
+        self.profiles.resolve("Inst1")
+
+        document = self.store.get("Inst1")
+        self.assertEqual(document["profile"], {"name": "default"})
+        self.assertEqual(document["auto_gather"], {"check_interval": 120})
+        self.assertNotIn("autostart_game", document)
+
+        self.profiles.update_profile("default", "auto_gather", {"check_interval": 30})
+        self.assertEqual(self.profiles.resolve("Inst1")["auto_gather"]["check_interval"], 120)
+
+    def test_bulk_apply_migrates_before_writing(self):
+        self.profiles.bulk_apply(["Inst1"], "march_assignment", {"unlocked_queues": 3})
+        self.profiles.update_profile("default", "auto_gather", {"resource_loop": ["wood"]})
+
+        resolved = self.profiles.resolve("Inst1")
+        self.assertEqual(resolved["march_assignment"]["unlocked_queues"], 3)
+        self.assertEqual(resolved["auto_gather"]["resource_loop"], ["wood"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,283 @@
+"""
+BENSON v2.0 - Scale Benchmark
+Drives InstanceManager/ModuleManager against N simulated instances and reports
+threads, memory, CPU, capture/tap latency percentiles and event-queue lag.
+
+Usage:
+    python -m tools.scale_benchmark --sizes 10,50,100,250,500 --duration 30
+    python -m tools.scale_benchmark --frames recorded_frames/ --json bench.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.headless_app import HeadlessApp
+from core.instance_manager import InstanceManager
+from core.simulated_backend import SimulatedMemuBackend
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile (pct in 0-100)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def summarize(values, scale=1000.0):
+    """p50/p95/p99/max summary in milliseconds"""
+    if not values:
+        return {"count": 0, "p50": None, "p95": None, "p99": None, "max": None}
+    return {
+        "count": len(values),
+        "p50": round(percentile(values, 50) * scale, 1),
+        "p95": round(percentile(values, 95) * scale, 1),
+        "p99": round(percentile(values, 99) * scale, 1),
+        "max": round(max(values) * scale, 1)
+    }
+
+
+def get_memory_mb():
+    """Resident memory of this process in MB"""
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class ResourceSampler:
+    """Samples thread count, memory and CPU on a background thread"""
+
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.samples = []
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True, name="BenchSampler")
+        self.thread.start()
+
+    def _run(self):
+        last_wall, last_cpu = time.monotonic(), time.process_time()
+        while not self.stop_event.wait(self.interval):
+            wall, cpu = time.monotonic(), time.process_time()
+            self.samples.append({
+                "threads": threading.active_count(),
+                "memory_mb": get_memory_mb(),
+                "cpu_percent": 100.0 * (cpu - last_cpu) / max(wall - last_wall, 1e-6)
+            })
+            last_wall, last_cpu = wall, cpu
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=5)
+
+    def report(self):
+        if not self.samples:
+            return {}
+        memory = [s["memory_mb"] for s in self.samples if s["memory_mb"] is not None]
+        cpu = [s["cpu_percent"] for s in self.samples]
+        return {
+            "threads_peak": max(s["threads"] for s in self.samples),
+            "threads_avg": round(sum(s["threads"] for s in self.samples) / len(self.samples), 1),
+            "memory_peak_mb": round(max(memory), 1) if memory else None,
+            "cpu_avg_percent": round(sum(cpu) / len(cpu), 1),
+            "cpu_peak_percent": round(max(cpu), 1)
+        }
+
+
+def run_scale_step(count, args):
+    """Run one benchmark step with count simulated instances"""
+    backend = SimulatedMemuBackend(instance_count=count, frames_dir=args.frames,
+                                   latency_scale=args.latency_scale, boot_time=args.boot_time,
+                                   failure_rates={"screencap": args.failure_rate, "tap": args.failure_rate})
+    sampler = ResourceSampler()
+    sampler.start()
+
+    instance_manager = InstanceManager(backend=backend)
+    instance_manager.load_real_instances()
+    app = HeadlessApp(instance_manager, quiet=True)
+
+    # Boot every instance in parallel, then refresh once
+    with ThreadPoolExecutor(max_workers=min(32, count)) as pool:
+        list(pool.map(lambda inst: backend.run(["start", "-i", str(inst["index"])]),
+                      instance_manager.get_instances()))
+    time.sleep(args.boot_time)
+    instance_manager.refresh_instances()
+
+    from utils.module_manager import ModuleManager
+    init_start = time.perf_counter()
+    module_manager = ModuleManager(app)
+    app.module_manager = module_manager
+    init_time = time.perf_counter() - init_start
+
+    for instance in instance_manager.get_instances():
+        module_manager.trigger_auto_startup_for_instance(instance["name"])
+
+    capture_times, tap_times, detect_times, march_times = [], [], [], []
+    times_lock = threading.Lock()
+    stop_event = threading.Event()
+
+    march_analyzer_class = None
+    if args.march:
+        from modules.march_queue_analyzer import MarchQueueAnalyzer
+        from utils.lazy_import import module_available
+        # cv2/numpy are imported on first use, so check for them up front
+        missing = [m for m in ("cv2", "numpy") if not module_available(m)]
+        if missing:
+            print(f"[Benchmark] March analysis skipped: {', '.join(missing)} not installed", file=sys.__stdout__)
+        else:
+            march_analyzer_class = MarchQueueAnalyzer
+
+    def instance_workload(name):
+        autostart = module_manager.instance_modules.get(name, {}).get("AutoStartGame")
+        instance = instance_manager.get_instance(name)
+        if not autostart or not instance:
+            return
+
+        analyzer = march_analyzer_class(name, None, log_callback=lambda m: None) if march_analyzer_class else None
+        cycle = 0
+        while not stop_event.is_set():
+            cycle += 1
+            start = time.perf_counter()
+            screenshot = autostart._take_screenshot(instance["index"])
+            capture = time.perf_counter() - start
+
+            detect = march = None
+            if screenshot:
+                try:
+                    if autostart.is_available():
+                        start = time.perf_counter()
+                        autostart._detect_game_state(screenshot)
+                        detect = time.perf_counter() - start
+                    if analyzer and cycle % args.march_every == 0:
+                        start = time.perf_counter()
+                        analyzer.analyze_march_queues(screenshot)
+                        march = time.perf_counter() - start
+                finally:
+                    autostart._cleanup_screenshot(screenshot)
+
+            start = time.perf_counter()
+            autostart._click_position(instance["index"], 240, 400)
+            tap = time.perf_counter() - start
+
+            with times_lock:
+                capture_times.append(capture)
+                tap_times.append(tap)
+                if detect is not None:
+                    detect_times.append(detect)
+                if march is not None:
+                    march_times.append(march)
+
+            stop_event.wait(args.cycle_interval)
+
+    def lag_probe():
+        while not stop_event.wait(0.1):
+            app.after(0, lambda: None)
+
+    app.get_event_lag_samples(reset=True)
+    backend.reset_call_stats()
+
+    workers = [threading.Thread(target=instance_workload, args=(inst["name"],), daemon=True,
+                                name=f"Bench-{inst['name']}") for inst in instance_manager.get_instances()]
+    workers.append(threading.Thread(target=lag_probe, daemon=True, name="BenchLagProbe"))
+    for worker in workers:
+        worker.start()
+
+    time.sleep(args.duration)
+    stop_event.set()
+    for worker in workers:
+        worker.join(timeout=30)
+
+    sampler.stop()
+    lag_samples = app.get_event_lag_samples()
+    call_stats = backend.get_call_stats()
+    app.destroy()
+
+    cycles = len(capture_times)
+    return {
+        "instances": count,
+        "module_init_seconds": round(init_time, 2),
+        "cycles": cycles,
+        "cycles_per_second": round(cycles / args.duration, 1),
+        "resources": sampler.report(),
+        "capture_ms": summarize(capture_times),
+        "tap_ms": summarize(tap_times),
+        "detect_ms": summarize(detect_times),
+        "march_ms": summarize(march_times),
+        "event_lag_ms": summarize(lag_samples),
+        "backend_failures": {op: s["failures"] for op, s in call_stats.items() if s["failures"]}
+    }
+
+
+def print_report(results):
+    header = (f"{'N':>5} {'init s':>7} {'cyc/s':>7} {'thr pk':>7} {'mem MB':>8} {'cpu %':>6} "
+              f"{'cap p50':>8} {'cap p99':>8} {'tap p50':>8} {'tap p99':>8} {'lag p50':>8} {'lag p99':>8}")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        res = r["resources"]
+        print(f"{r['instances']:>5} {r['module_init_seconds']:>7} {r['cycles_per_second']:>7} "
+              f"{res.get('threads_peak', '-'):>7} {res.get('memory_peak_mb') or '-':>8} "
+              f"{res.get('cpu_avg_percent', '-'):>6} "
+              f"{r['capture_ms']['p50'] or '-':>8} {r['capture_ms']['p99'] or '-':>8} "
+              f"{r['tap_ms']['p50'] or '-':>8} {r['tap_ms']['p99'] or '-':>8} "
+              f"{r['event_lag_ms']['p50'] or '-':>8} {r['event_lag_ms']['p99'] or '-':>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="BENSON scale benchmark against simulated instances")
+    parser.add_argument("--sizes", default="10,50,100,250,500", help="Comma separated instance counts")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds of workload per step")
+    parser.add_argument("--cycle-interval", type=float, default=1.0, help="Seconds between cycles per instance")
+    parser.add_argument("--frames", default=None, help="Directory of recorded PNG frames")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiplier for simulated latencies")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Capture/tap failure probability")
+    parser.add_argument("--boot-time", type=float, default=1.0, help="Simulated boot time in seconds")
+    parser.add_argument("--march", action="store_true", help="Include march queue OCR workload")
+    parser.add_argument("--march-every", type=int, default=5, help="Run march analysis every N cycles")
+    parser.add_argument("--json", default=None, help="Write results to this JSON file")
+    parser.add_argument("--verbose", action="store_true", help="Show application logs")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    results = []
+    for count in sizes:
+        print(f"[Benchmark] Running {count} instances for {args.duration:.0f}s...")
+        output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+        with output:
+            results.append(run_scale_step(count, args))
+
+    print()
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n[Benchmark] Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
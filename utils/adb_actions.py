@@ -0,0 +1,153 @@
+"""
+BENSON v2.0 - ADB Action Batches
+Sends a sequence of taps, swipes, key events, waits and captures as one
+shell script over a single ADB invocation
+"""
+
+import shlex
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+from utils.metrics import metrics
+
+
+@dataclass
+class BatchResult:
+    """Outcome of ActionBatch.execute()"""
+    success: bool
+    round_trips: int = 0
+    steps_executed: int = 0
+    duration: float = 0.0
+    failed_step: Optional[str] = None
+    error: Optional[str] = None
+    outputs: List[str] = field(default_factory=list)
+
+
+class _Verify:
+    """Host-side check between script segments"""
+
+    def __init__(self, check: Callable[[], bool], timeout: float, interval: float, description: str):
+        self.check = check
+        self.timeout = timeout
+        self.interval = interval
+        self.description = description or getattr(check, "__name__", "verify")
+
+    def run(self) -> bool:
+        deadline = time.time() + self.timeout
+        while True:
+            try:
+                if self.check():
+                    return True
+            except Exception:
+                pass
+            if time.time() >= deadline:
+                return False
+            time.sleep(self.interval)
+
+
+class ActionBatch:
+    """Chainable builder - each run of steps between verify() hooks is one ADB round trip
+
+        ActionBatch(backend, index).tap(100, 200).wait(0.3).key(4).tap(50, 60).execute()
+    """
+
+    def __init__(self, backend, instance_index: int, instance_name: str = None):
+        self.backend = backend
+        self.instance_index = instance_index
+        self.instance_name = instance_name
+        self.steps = []
+
+    # Steps
+    def tap(self, x: int, y: int) -> "ActionBatch":
+        return self._add(f"input tap {int(x)} {int(y)}")
+
+    def swipe(self, x1: int, y1: int, x2: int, y2: int, duration_ms: int = 300) -> "ActionBatch":
+        return self._add(f"input swipe {int(x1)} {int(y1)} {int(x2)} {int(y2)} {int(duration_ms)}")
+
+    def long_press(self, x: int, y: int, duration_ms: int = 800) -> "ActionBatch":
+        return self.swipe(x, y, x, y, duration_ms)
+
+    def key(self, keycode) -> "ActionBatch":
+        """Android keycode number or name (e.g. 4 / KEYCODE_BACK)"""
+        return self._add(f"input keyevent {shlex.quote(str(keycode))}")
+
+    def text(self, value: str) -> "ActionBatch":
+        return self._add(f"input text {shlex.quote(value.replace(' ', '%s'))}")
+
+    def wait(self, seconds: float) -> "ActionBatch":
+        """Device-side pause - no extra round trip"""
+        if seconds > 0:
+            self._add(f"sleep {seconds:.2f}")
+        return self
+
+    def screencap(self, device_path: str) -> "ActionBatch":
+        """Capture to a device path at this point in the sequence (pull it afterwards)"""
+        return self._add(f"screencap -p {shlex.quote(device_path)}")
+
+    def verify(self, check: Callable[[], bool], timeout: float = 5.0, interval: float = 0.25,
+               description: str = "") -> "ActionBatch":
+        """Host-side hook run after the preceding steps; remaining steps are skipped if it never passes"""
+        self.steps.append(_Verify(check, timeout, interval, description))
+        return self
+
+    def _add(self, command: str) -> "ActionBatch":
+        self.steps.append(command)
+        return self
+
+    # Execution
+    def segments(self) -> List:
+        """Consecutive shell commands joined into scripts, with verify hooks between them"""
+        result, current = [], []
+        for step in self.steps:
+            if isinstance(step, _Verify):
+                if current:
+                    result.append(current)
+                    current = []
+                result.append(step)
+            else:
+                current.append(step)
+        if current:
+            result.append(current)
+        return result
+
+    @staticmethod
+    def to_script(commands: List[str]) -> str:
+        # && so a failing step stops the rest of its segment
+        return " && ".join(commands)
+
+    def execute(self, timeout: float = None) -> BatchResult:
+        start = time.perf_counter()
+        result = BatchResult(success=True)
+
+        for segment in self.segments():
+            if isinstance(segment, _Verify):
+                if not segment.run():
+                    result.success = False
+                    result.failed_step = f"verify: {segment.description}"
+                    break
+                continue
+
+            script = self.to_script(segment)
+            waits = sum(float(c.split()[1]) for c in segment if c.startswith("sleep "))
+            try:
+                completed = self.backend.shell(self.instance_index, [script], timeout=timeout or waits + 15)
+            except Exception as e:
+                result.success = False
+                result.failed_step = segment[0]
+                result.error = str(e)
+                break
+
+            result.round_trips += 1
+            result.outputs.append(completed.stdout or "")
+            if completed.returncode != 0:
+                result.success = False
+                result.failed_step = segment[0] if len(segment) == 1 else script
+                result.error = (completed.stderr or "").strip()
+                break
+            result.steps_executed += len(segment)
+
+        result.duration = time.perf_counter() - start
+        metrics.observe("action_batch_seconds", result.duration, instance=self.instance_name,
+                        result="success" if result.success else "failure")
+        return result
@@ -0,0 +1,239 @@
+"""
+BENSON v2.0 - Fleet AutoStart Orchestrator
+Runs AutoStart across many instances with a concurrency cap, a shared
+capture budget, progress reporting and per-instance outcomes
+
+Runs are stepped by each instance's AutoStart module (its worker thread, or
+the async scheduler's work queue as CRITICAL cycles); an orchestrator worker
+only holds the concurrency slot until the run reports back.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List
+
+from utils.metrics import metrics
+
+
+class CaptureBudget:
+    """Token bucket limiting screenshots per second across all AutoStart runs"""
+
+    def __init__(self, captures_per_second: float, burst: int = None):
+        self.rate = max(0.1, float(captures_per_second))
+        self.capacity = burst or max(1, int(self.rate))
+        self.tokens = float(self.capacity)
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """Take a capture if one is allowed now - returns 0, or seconds until one will be"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        """Block until a capture is allowed"""
+        started = time.monotonic()
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                break
+            time.sleep(wait)
+
+        metrics.observe("capture_budget_wait_seconds", time.monotonic() - started)
+
+
+class AutoStartOrchestrator:
+    """Queue of AutoStart runs executed by a fixed number of workers"""
+
+    def __init__(self, max_concurrent: int = 4, captures_per_second: float = 10.0,
+                 progress_callback: Callable[[Dict], None] = None, scheduler=None, run_timeout: float = 600):
+        self.max_concurrent = max(1, int(max_concurrent))
+        # A run that overstays this frees its slot as failed
+        self.run_timeout = run_timeout
+        self.capture_budget = CaptureBudget(captures_per_second)
+        self.progress_callback = progress_callback
+        self.scheduler = scheduler
+
+        self.queue = deque()
+        self.condition = threading.Condition()
+        self.workers = []
+        self.shutdown_flag = False
+
+        # instance name -> outcome dict
+        self.outcomes = {}
+        # instance name -> completion callbacks of every caller waiting on its current run
+        self.callbacks: Dict[str, List[Callable[[bool], None]]] = {}
+        # instance name -> module of each running run, so cancel() can stop it
+        self.running = {}
+        self.cancelled = set()
+
+    def enqueue(self, instance_name: str, autostart_module, max_retries: int = 3,
+                on_complete: Callable[[bool], None] = None) -> bool:
+        """Queue an AutoStart run; joins the current run if one is already queued or running for the instance"""
+        with self.condition:
+            current = self.outcomes.get(instance_name)
+            if current and current["status"] in ("queued", "running"):
+                if on_complete:
+                    self.callbacks.setdefault(instance_name, []).append(on_complete)
+                return True
+
+            if self.shutdown_flag:
+                # Restarted after shutdown() - workers that saw the flag have exited and get replaced
+                self.shutdown_flag = False
+
+            autostart_module.capture_budget = self.capture_budget
+            if self.scheduler:
+                autostart_module.scheduler = self.scheduler
+            self.callbacks[instance_name] = [on_complete] if on_complete else []
+            self.outcomes[instance_name] = {
+                "status": "queued",
+                "queued_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "duration": None
+            }
+            self.queue.append((instance_name, autostart_module, max_retries))
+            self._ensure_workers()
+            self.condition.notify()
+
+        self._report_progress()
+        return True
+
+    def _ensure_workers(self):
+        self.workers = [w for w in self.workers if w.is_alive()]
+        while len(self.workers) < self.max_concurrent:
+            worker = threading.Thread(target=self._worker, daemon=True,
+                                      name=f"AutoStartOrchestrator-{len(self.workers)}")
+            worker.start()
+            self.workers.append(worker)
+
+    def _worker(self):
+        while True:
+            with self.condition:
+                while not self.queue and not self.shutdown_flag:
+                    self.condition.wait()
+                if self.shutdown_flag:
+                    return
+                instance_name, autostart, max_retries = self.queue.popleft()
+                outcome = self.outcomes[instance_name]
+                outcome["status"] = "running"
+                outcome["started_at"] = time.time()
+                self.running[instance_name] = autostart
+
+            self._report_progress()
+            success = self._run_one(instance_name, autostart, max_retries)
+
+            with self.condition:
+                self.running.pop(instance_name, None)
+                if instance_name in self.cancelled:
+                    self.cancelled.discard(instance_name)
+                    outcome["status"] = "cancelled"
+                else:
+                    outcome["status"] = "success" if success else "failed"
+                outcome["finished_at"] = time.time()
+                outcome["duration"] = round(outcome["finished_at"] - outcome["started_at"], 1)
+                callbacks = self.callbacks.pop(instance_name, [])
+                self.condition.notify_all()
+
+            self._report_progress()
+
+            for on_complete in callbacks:
+                try:
+                    on_complete(success)
+                except Exception as e:
+                    print(f"[AutoStartOrchestrator] Completion callback error for {instance_name}: {e}")
+
+    def _run_one(self, instance_name: str, autostart, max_retries: int) -> bool:
+        """Hold this worker slot until the module's run finishes or hits run_timeout"""
+        try:
+            return autostart.run_auto_game(instance_name=instance_name, max_retries=max_retries,
+                                           timeout=self.run_timeout)
+        except Exception as e:
+            print(f"[AutoStartOrchestrator] ❌ AutoStart error for {instance_name}: {e}")
+            return False
+
+    # Progress
+    def get_progress(self) -> Dict:
+        with self.condition:
+            counts = {}
+            for outcome in self.outcomes.values():
+                counts[outcome["status"]] = counts.get(outcome["status"], 0) + 1
+            durations = [o["duration"] for o in self.outcomes.values() if o["status"] == "success"]
+
+        return {
+            "total": sum(counts.values()),
+            "queued": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "success": counts.get("success", 0),
+            "failed": counts.get("failed", 0),
+            "cancelled": counts.get("cancelled", 0),
+            "avg_success_seconds": round(sum(durations) / len(durations), 1) if durations else None
+        }
+
+    def get_outcomes(self) -> Dict[str, Dict]:
+        with self.condition:
+            return {name: dict(outcome) for name, outcome in self.outcomes.items()}
+
+    def _report_progress(self):
+        if self.progress_callback:
+            try:
+                self.progress_callback(self.get_progress())
+            except Exception as e:
+                print(f"[AutoStartOrchestrator] Progress callback error: {e}")
+
+    def wait(self, instance_names: List[str] = None, timeout: float = None) -> bool:
+        """Block until the given (or all) runs have finished"""
+        deadline = time.time() + timeout if timeout else None
+
+        def pending():
+            names = instance_names or list(self.outcomes)
+            return any(self.outcomes.get(n, {}).get("status") in ("queued", "running") for n in names)
+
+        with self.condition:
+            while pending():
+                remaining = deadline - time.time() if deadline else None
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+        return True
+
+    def cancel(self, instance_name: str) -> bool:
+        """Drop a queued run or stop a running one - its callbacks are not called"""
+        with self.condition:
+            for item in list(self.queue):
+                if item[0] == instance_name:
+                    self.queue.remove(item)
+                    self.outcomes[instance_name]["status"] = "cancelled"
+                    self.callbacks.pop(instance_name, None)
+                    self.condition.notify_all()
+                    return True
+
+            autostart = self.running.get(instance_name)
+            if autostart:
+                self.cancelled.add(instance_name)
+                self.callbacks.pop(instance_name, None)
+
+        if autostart:
+            # Sets the module's stop event - the run ends at its current step
+            autostart.stop()
+            return True
+        return False
+
+    def shutdown(self):
+        with self.condition:
+            self.shutdown_flag = True
+            self.queue.clear()
+            self.callbacks.clear()
+            running = list(self.running.values())
+            self.cancelled.update(self.running)
+            self.condition.notify_all()
+
+        for autostart in running:
+            autostart.stop()
@@ -0,0 +1,454 @@
+"""
+BENSON v2.0 - Multi-Host Sharding
+A coordinator assigns instances to worker nodes (headless daemons, each
+driving its host's memuc) and reassigns them when a node stops sending
+heartbeats. Everything is JSON over HTTP, like the control API.
+
+    python main.py --coordinator [--port 8770]
+    python main.py --headless --join http://coordinator:8770 [--node host-a]
+
+Each node reports the instances its emulator has. An instance goes to one
+live node that reports it, sticking with that node while it stays alive
+and preferring the least loaded node relative to its capacity
+(BENSON_NODE_CAPACITY, default CPU count). Nodes only run modules for
+instances under a lease renewed by every heartbeat, so a node cut off from
+the coordinator stops before its instances are handed to someone else.
+"""
+
+import os
+import re
+import socket
+import threading
+import time
+import urllib.parse
+from typing import Dict, List, Optional, Set
+
+from utils.control_api import ControlAPIError, ControlClient, ControlServer, is_loopback
+from utils.metrics import metrics
+
+DEFAULT_COORDINATOR_PORT = 8770
+
+_SAMPLE_LINE = re.compile(r"^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{(.*)\})? (.*)$")
+
+
+def merge_prometheus(texts: Dict[str, str]) -> str:
+    """Combine nodes' Prometheus text, adding a node label and keeping each metric family together"""
+    families: Dict[str, Dict] = {}
+    for node, text in sorted(texts.items()):
+        family = None
+        for line in text.splitlines():
+            if line.startswith("# HELP ") or line.startswith("# TYPE "):
+                family = line.split()[2]
+                entry = families.setdefault(family, {"meta": [], "samples": []})
+                if line not in entry["meta"]:
+                    entry["meta"].append(line)
+                continue
+            match = _SAMPLE_LINE.match(line)
+            if not match or family is None:
+                continue
+            name, _, labels, value = match.groups()
+            labels = f'node="{node}",{labels}' if labels else f'node="{node}"'
+            families[family]["samples"].append(f"{name}{{{labels}}} {value}")
+
+    lines = []
+    for family in sorted(families):
+        lines += families[family]["meta"] + families[family]["samples"]
+    return "\n".join(lines) + "\n"
+
+
+class FleetCoordinator:
+    """Node registry and instance -> node assignment"""
+
+    def __init__(self, failure_timeout: float = 15.0, heartbeat_interval: float = 3.0, token: str = None):
+        self.failure_timeout = failure_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self.token = token
+        self.nodes: Dict[str, Dict] = {}
+        self.assignments: Dict[str, str] = {}
+        self.lock = threading.RLock()
+        self.stop_event = threading.Event()
+        self.monitor = None
+
+    def start(self):
+        self.monitor = threading.Thread(target=self._monitor_loop, daemon=True, name="ClusterMonitor")
+        self.monitor.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    # Node reports
+    def heartbeat(self, node_name: str, report: Dict) -> Dict:
+        """Record a node's report; returns the instances it should run and its lease"""
+        with self.lock:
+            node = self.nodes.get(node_name)
+            is_new = node is None or not node["alive"]
+            if node is None:
+                node = self.nodes[node_name] = {"name": node_name, "joined_at": time.time(), "failures": 0,
+                                                "granted": set()}
+            node.update({
+                "url": report.get("url"),
+                "capacity": max(1, int(report.get("capacity") or 1)),
+                "instances": {i["name"]: i for i in report.get("instances", [])},
+                "summary": report.get("summary", {}),
+                "metrics": report.get("metrics", {}),
+                "owned": set(report.get("owned", [])),
+                "last_seen": time.time(),
+                "alive": True
+            })
+            if is_new:
+                print(f"[Cluster] ✅ Node {node_name} joined ({len(node['instances'])} instances, "
+                      f"capacity {node['capacity']})")
+            # A (re)joined node takes its share of the fleet; otherwise only new instances get placed
+            self._assign(rebalance=is_new)
+
+            # A moved instance is handed over only once its previous node reports it released. "owned"
+            # was taken before that node applied our last reply, so what we granted it counts as held too.
+            held_elsewhere = set()
+            for other in self.nodes.values():
+                if other is not node and other["alive"]:
+                    held_elsewhere |= other["owned"] | other["granted"]
+            assigned = sorted(name for name, owner in self.assignments.items()
+                              if owner == node_name and name not in held_elsewhere)
+            node["granted"] = set(assigned)
+
+        return {"assigned": assigned, "lease": self.failure_timeout, "interval": self.heartbeat_interval}
+
+    def leave(self, node_name: str):
+        """Graceful node shutdown - hand its instances over now"""
+        with self.lock:
+            node = self.nodes.get(node_name)
+            if node and node["alive"]:
+                node["alive"] = False
+                node["granted"] = set()
+                print(f"[Cluster] 👋 Node {node_name} left")
+                self._assign()
+
+    def _monitor_loop(self):
+        while not self.stop_event.wait(self.heartbeat_interval):
+            now = time.time()
+            with self.lock:
+                failed = [node for node in self.nodes.values()
+                          if node["alive"] and now - node["last_seen"] > self.failure_timeout]
+                for node in failed:
+                    # Its lease (0.8x the timeout) has run out - it no longer drives anything
+                    node["alive"] = False
+                    node["granted"] = set()
+                    node["failures"] += 1
+                    metrics.increment("cluster_node_failures_total", node=node["name"])
+                    print(f"[Cluster] ❌ Node {node['name']} missed heartbeats for {self.failure_timeout:.0f}s")
+                if failed:
+                    self._assign()
+
+    # Assignment
+    def _assign(self, rebalance: bool = False) -> int:
+        """Recompute assignments; returns how many instances moved"""
+        alive = {name: node for name, node in self.nodes.items() if node["alive"]}
+        candidates: Dict[str, List[str]] = {}
+        for name, node in sorted(alive.items()):
+            for instance_name in node["instances"]:
+                candidates.setdefault(instance_name, []).append(name)
+
+        load = {name: 0 for name in alive}
+        assignments = {}
+        for instance_name, owner in self.assignments.items():
+            if owner in candidates.get(instance_name, []):
+                assignments[instance_name] = owner
+                load[owner] += 1
+
+        def ratio(node_name, extra=0):
+            return (load[node_name] + extra) / alive[node_name]["capacity"]
+
+        if rebalance:
+            # Move instances off nodes above their share while that makes things more even
+            for instance_name in sorted(assignments):
+                owner = assignments[instance_name]
+                best = min(candidates[instance_name], key=lambda n: (ratio(n), n))
+                if best != owner and ratio(owner) > ratio(best, 1):
+                    assignments[instance_name] = best
+                    load[owner] -= 1
+                    load[best] += 1
+
+        for instance_name in sorted(candidates):
+            if instance_name not in assignments:
+                best = min(candidates[instance_name], key=lambda n: (ratio(n), n))
+                assignments[instance_name] = best
+                load[best] += 1
+
+        moved = [name for name, owner in assignments.items()
+                 if name in self.assignments and self.assignments[name] != owner]
+        orphaned = sorted(set(self.assignments) - set(assignments))
+        if moved:
+            metrics.increment("cluster_reassignments_total", amount=len(moved))
+            print(f"[Cluster] 🔀 Reassigned {len(moved)} instances: "
+                  + ", ".join(f"{name}->{assignments[name]}" for name in sorted(moved)))
+        if orphaned:
+            print(f"[Cluster] ⚠️ No live node hosts: {', '.join(orphaned)}")
+        self.assignments = assignments
+        return len(moved)
+
+    def rebalance(self) -> int:
+        with self.lock:
+            return self._assign(rebalance=True)
+
+    # Queries
+    def node_of(self, instance_name: str) -> Optional[Dict]:
+        with self.lock:
+            owner = self.assignments.get(instance_name)
+            return dict(self.nodes[owner]) if owner else None
+
+    def get_nodes(self) -> List[Dict]:
+        now = time.time()
+        with self.lock:
+            return [{
+                "name": node["name"],
+                "url": node["url"],
+                "alive": node["alive"],
+                "capacity": node["capacity"],
+                "instances": len(node["instances"]),
+                "assigned": sorted(i for i, owner in self.assignments.items() if owner == node["name"]),
+                "last_seen_seconds": round(now - node["last_seen"], 1),
+                "failures": node["failures"],
+                "summary": node["summary"]
+            } for node in sorted(self.nodes.values(), key=lambda n: n["name"])]
+
+    def get_instances(self) -> List[Dict]:
+        """Every known instance with its owner and the status its owner (or any node) reported"""
+        with self.lock:
+            known = {}
+            for node in self.nodes.values():
+                for instance_name, report in node["instances"].items():
+                    known.setdefault(instance_name, []).append((node, report))
+
+            instances = []
+            for instance_name in sorted(known):
+                owner = self.assignments.get(instance_name)
+                reports = dict((node["name"], report) for node, report in known[instance_name])
+                report = reports.get(owner) or next(iter(reports.values()))
+                instances.append(dict(report, name=instance_name, node=owner,
+                                      hosts=sorted(reports)))
+            return instances
+
+    def get_status(self) -> Dict:
+        nodes = self.get_nodes()
+        instances = self.get_instances()
+        return {
+            "nodes": len(nodes),
+            "nodes_alive": sum(1 for node in nodes if node["alive"]),
+            "instances": len(instances),
+            "assigned": sum(1 for instance in instances if instance["node"]),
+            "orphaned": [instance["name"] for instance in instances if not instance["node"]],
+            "running": sum(1 for instance in instances if instance.get("status") == "Running")
+        }
+
+    def client_for(self, node: Dict) -> ControlClient:
+        return ControlClient(node["url"], self.token)
+
+
+class CoordinatorServer(ControlServer):
+    """HTTP API of the coordinator - node heartbeats plus fleet-wide control"""
+
+    ROUTES = [
+        ("GET", r"/status", "status"),
+        ("GET", r"/nodes", "nodes"),
+        ("POST", r"/nodes/(?P<name>[^/]+)/heartbeat", "heartbeat"),
+        ("POST", r"/nodes/(?P<name>[^/]+)/leave", "leave"),
+        ("GET", r"/instances", "list_instances"),
+        ("POST", r"/instances/(?P<name>[^/]+)/(?P<action>start|stop|autostart|cleanup)", "instance_action"),
+        ("POST", r"/fleet/autostart", "fleet_autostart"),
+        ("POST", r"/rebalance", "rebalance"),
+        ("GET", r"/metrics", "metrics_text"),
+        ("GET", r"/metrics\.json", "metrics_json"),
+    ]
+
+    def __init__(self, coordinator: FleetCoordinator, host: str = "0.0.0.0",
+                 port: int = DEFAULT_COORDINATOR_PORT, token: str = None):
+        super().__init__(coordinator, host, port, token)
+        self.coordinator = coordinator
+
+    def _api_status(self, **_):
+        return 200, self.coordinator.get_status()
+
+    def _api_nodes(self, **_):
+        return 200, {"nodes": self.coordinator.get_nodes()}
+
+    def _api_heartbeat(self, name, payload, **_):
+        return 200, self.coordinator.heartbeat(name, payload)
+
+    def _api_leave(self, name, **_):
+        self.coordinator.leave(name)
+        return 200, {"node": name, "action": "leave"}
+
+    def _api_list_instances(self, **_):
+        return 200, {"instances": self.coordinator.get_instances()}
+
+    def _api_instance_action(self, name, action, **_):
+        node = self.coordinator.node_of(name)
+        if not node or not node["alive"]:
+            return 409, {"error": f"Instance {name} is not assigned to a live node"}
+        client = self.coordinator.client_for(node)
+        call = {"start": client.start_instance, "stop": client.stop_instance,
+                "autostart": client.trigger_autostart, "cleanup": client.cleanup_instance}[action]
+        try:
+            return 202, dict(call(name), node=node["name"])
+        except ControlAPIError as e:
+            return e.status or 502, {"error": str(e), "node": node["name"]}
+
+    def _api_fleet_autostart(self, payload, **_):
+        wanted = payload.get("instances")
+        results = {}
+        for node in self.coordinator.get_nodes():
+            names = [name for name in node["assigned"] if wanted is None or name in wanted]
+            if not node["alive"] or not names:
+                continue
+            try:
+                results[node["name"]] = self.coordinator.client_for(node).fleet_autostart(names)
+            except ControlAPIError as e:
+                results[node["name"]] = {"error": str(e)}
+        return 202, {"nodes": results}
+
+    def _api_rebalance(self, **_):
+        return 200, {"moved": self.coordinator.rebalance()}
+
+    def _api_metrics_text(self, **_):
+        texts = {}
+        for node in self.coordinator.get_nodes():
+            if node["alive"]:
+                try:
+                    texts[node["name"]] = self.coordinator.client_for(node).get_metrics()
+                except ControlAPIError as e:
+                    print(f"[Cluster] ⚠️ Metrics from {node['name']} unavailable: {e}")
+        return 200, merge_prometheus(texts)
+
+    def _api_metrics_json(self, **_):
+        with self.coordinator.lock:
+            return 200, {name: node["metrics"] for name, node in self.coordinator.nodes.items()}
+
+
+class NodeAgent:
+    """Worker side: heartbeats to the coordinator and the lease on assigned instances"""
+
+    def __init__(self, daemon, coordinator_url: str, node_name: str = None, token: str = None,
+                 capacity: int = None):
+        self.daemon = daemon
+        self.node_name = node_name or socket.gethostname()
+        self.capacity = capacity or int(os.environ.get("BENSON_NODE_CAPACITY", "0")) or os.cpu_count() or 1
+        self.client = ControlClient(coordinator_url, token if token is not None else os.environ.get("BENSON_API_TOKEN"),
+                                    timeout=5)
+        self.assigned: Set[str] = set()
+        self.interval = 3.0
+        self.lease = 15.0
+        self.last_success = 0.0
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.path = f"/nodes/{urllib.parse.quote(self.node_name, safe='')}"
+
+    @property
+    def url(self) -> str:
+        """Address the coordinator uses to reach this node's control API"""
+        if os.environ.get("BENSON_NODE_URL"):
+            return os.environ["BENSON_NODE_URL"]
+        host = self.daemon.host
+        if host in ("0.0.0.0", "", "::"):
+            host = socket.gethostname()
+        return f"http://{host}:{self.daemon.port}"
+
+    def owns(self, instance_name: str) -> bool:
+        """instance_filter for the node's module manager"""
+        return instance_name in self.assigned
+
+    def start(self):
+        self.thread = threading.Thread(target=self._loop, daemon=True, name="NodeAgent")
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        try:
+            self.client.request("POST", f"{self.path}/leave")
+        except ControlAPIError:
+            pass
+
+    def _loop(self):
+        while not self.stop_event.wait(self.interval):
+            self.heartbeat()
+
+    def _report(self) -> Dict:
+        instance_manager = self.daemon.instance_manager
+        manager = self.daemon.module_manager
+        running = getattr(manager, "running_modules", {}) if manager else {}
+        return {
+            "url": self.url,
+            "capacity": self.capacity,
+            "owned": sorted(self.assigned),
+            "instances": [{
+                "name": instance["name"],
+                "status": instance["status"],
+                "modules_running": sorted(m for m, on in running.get(instance["name"], {}).items() if on)
+            } for instance in instance_manager.get_instances()],
+            "summary": {
+                "pid": os.getpid(),
+                "modules_ready": bool(manager and manager.initialization_complete),
+                "instances": instance_manager.get_status_summary()
+            },
+            "metrics": metrics.get_summary()
+        }
+
+    def heartbeat(self) -> bool:
+        """One report to the coordinator; applies the returned assignment. False if unreachable."""
+        try:
+            reply = self.client.request("POST", f"{self.path}/heartbeat", self._report())
+        except ControlAPIError as e:
+            if self.assigned and time.time() - self.last_success > self.lease:
+                # Coordinator has given these instances to another node by now - stop driving them
+                print(f"[NodeAgent] ⚠️ Lease expired ({e}) - releasing {len(self.assigned)} instances")
+                self.daemon.add_console_message("⚠️ Lost coordinator - releasing assigned instances")
+                self._apply(set())
+            return False
+
+        self.last_success = time.time()
+        self.interval = float(reply.get("interval", self.interval))
+        # Renew before the coordinator would consider us failed
+        self.lease = float(reply.get("lease", self.lease)) * 0.8
+        self._apply(set(reply.get("assigned", [])))
+        return True
+
+    def _apply(self, assigned: Set[str]):
+        if assigned == self.assigned:
+            return
+        added, removed = assigned - self.assigned, self.assigned - assigned
+        self.assigned = assigned
+        print(f"[NodeAgent] Assignment: {len(assigned)} instances (+{len(added)} -{len(removed)})")
+
+        manager = self.daemon.module_manager
+        if not manager or not manager.initialization_complete:
+            return  # Modules are created from the current assignment once the manager is built
+        manager.refresh_modules()
+        for name in sorted(added):
+            # Taking over a live instance (failover or rebalance) - resume its automation here
+            instance = self.daemon.instance_manager.get_instance(name)
+            if instance and instance["status"] == "Running":
+                manager.trigger_auto_startup_for_instance(name)
+
+
+def run_coordinator(host: str = "0.0.0.0", port: int = DEFAULT_COORDINATOR_PORT, token: str = None):
+    """Coordinator process - no emulator access of its own"""
+    coordinator = FleetCoordinator(
+        failure_timeout=float(os.environ.get("BENSON_NODE_TIMEOUT", "15")),
+        heartbeat_interval=float(os.environ.get("BENSON_HEARTBEAT_INTERVAL", "3")),
+        token=token if token is not None else os.environ.get("BENSON_API_TOKEN"))
+    if not coordinator.token and not is_loopback(host):
+        # Checked before starting; ControlServer.start enforces it too
+        print(f"[Cluster] ❌ Refusing to listen on {host} without BENSON_API_TOKEN - "
+              f"any host on the network could control the fleet (set a token or use --host 127.0.0.1)")
+        raise SystemExit(2)
+    coordinator.start()
+    server = CoordinatorServer(coordinator, host, port, coordinator.token)
+    server.start()
+    print(f"[Cluster] Coordinator ready - nodes join with --join http://<this host>:{server.port}")
+    try:
+        while True:
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        coordinator.stop()
@@ -0,0 +1,387 @@
+"""
+BENSON v2.0 - Local Control API
+JSON over HTTP for the headless daemon. Binds to localhost by default; set
+BENSON_API_TOKEN to require a matching X-Benson-Token header. The daemon
+refuses to listen on a non-loopback address without a token.
+
+    GET  /status                            daemon, instance and module summary
+    GET  /instances                         instances with module status
+    GET  /instances/<name>                  one instance
+    POST /instances/<name>/start            start the emulator, then its modules
+    POST /instances/<name>/stop             stop modules, then the emulator
+    POST /instances/<name>/autostart        trigger AutoStart
+    POST /instances/<name>/cleanup          stop the instance's modules only
+    POST /instances/<name>/autogather/start
+    POST /instances/<name>/autogather/stop
+    POST /instances/<name>/settings         {"section": ..., "values": {...}}
+    POST /instances/<name>/reload-settings  re-read settings written by another process
+    POST /modules/refresh                   pick up added/removed instances
+    POST /fleet/autostart                   {"instances": [...]} (all when omitted)
+    GET  /autostart                         fleet AutoStart progress
+    GET  /console?since=<n>                 console messages after sequence n
+    GET  /metrics                           Prometheus text
+    GET  /metrics.json                      metric summaries
+    POST /shutdown
+"""
+
+import hmac
+import ipaddress
+import json
+import re
+import socket
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from utils.metrics import metrics
+from utils.settings_profiles import get_profiles
+from utils.settings_store import settings_store
+
+DEFAULT_PORT = 8765
+
+
+def is_loopback(host: str) -> bool:
+    """True if host only accepts local connections"""
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        pass
+    try:
+        return ipaddress.ip_address(socket.gethostbyname(host)).is_loopback
+    except (OSError, ValueError):
+        return False
+
+
+class ControlAPIError(Exception):
+    """Request rejected by the daemon or daemon unreachable"""
+
+    def __init__(self, message: str, status: int = 0):
+        super().__init__(message)
+        self.status = status
+
+
+class ControlServer:
+    """HTTP JSON API over a daemon's instance and module managers"""
+
+    ROUTES = [
+        ("GET", r"/status", "status"),
+        ("GET", r"/instances", "list_instances"),
+        ("GET", r"/instances/(?P<name>[^/]+)", "get_instance"),
+        ("POST", r"/instances/(?P<name>[^/]+)/start", "start_instance"),
+        ("POST", r"/instances/(?P<name>[^/]+)/stop", "stop_instance"),
+        ("POST", r"/instances/(?P<name>[^/]+)/autostart", "autostart"),
+        ("POST", r"/instances/(?P<name>[^/]+)/cleanup", "cleanup"),
+        ("POST", r"/instances/(?P<name>[^/]+)/autogather/(?P<action>start|stop)", "autogather"),
+        ("POST", r"/instances/(?P<name>[^/]+)/settings", "update_settings"),
+        ("POST", r"/instances/(?P<name>[^/]+)/reload-settings", "reload_settings"),
+        ("POST", r"/modules/refresh", "refresh_modules"),
+        ("POST", r"/fleet/autostart", "fleet_autostart"),
+        ("GET", r"/autostart", "autostart_progress"),
+        ("GET", r"/console", "console"),
+        ("GET", r"/metrics", "metrics_text"),
+        ("GET", r"/metrics\.json", "metrics_json"),
+        ("POST", r"/shutdown", "shutdown"),
+    ]
+
+    # Start/stop/settings/shutdown must not be open to the network
+    REQUIRE_TOKEN_OFF_LOOPBACK = True
+
+    def __init__(self, daemon, host: str = "127.0.0.1", port: int = DEFAULT_PORT, token: str = None):
+        self.daemon = daemon
+        self.host = host
+        self.port = port
+        self.token = token
+        self.routes = [(method, re.compile(f"^{pattern}$"), name) for method, pattern, name in self.ROUTES]
+        self.httpd = None
+        self.thread = None
+
+    def start(self):
+        if self.REQUIRE_TOKEN_OFF_LOOPBACK and not self.token and not is_loopback(self.host):
+            raise PermissionError(f"Refusing to serve the control API on {self.host} without BENSON_API_TOKEN "
+                                  f"- set a token or bind to 127.0.0.1")
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server._handle(self, "GET")
+
+            def do_POST(self):
+                server._handle(self, "POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True, name="ControlAPI")
+        self.thread.start()
+        print(f"[ControlAPI] ✅ Listening on http://{self.host}:{self.port}")
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    # Dispatch
+    def _handle(self, request: BaseHTTPRequestHandler, method: str):
+        started = time.perf_counter()
+        url = urllib.parse.urlsplit(request.path)
+        path = url.path.rstrip("/") or "/"
+        status, body, endpoint = 404, {"error": f"No route for {method} {path}"}, "unknown"
+
+        try:
+            if self.token and not hmac.compare_digest(request.headers.get("X-Benson-Token", "").encode(),
+                                                      self.token.encode()):
+                status, body = 401, {"error": "Missing or wrong X-Benson-Token"}
+            else:
+                for route_method, pattern, name in self.routes:
+                    match = pattern.match(path)
+                    if match and route_method == method:
+                        endpoint = name
+                        params = {k: urllib.parse.unquote(v) for k, v in match.groupdict().items()}
+                        query = dict(urllib.parse.parse_qsl(url.query))
+                        payload = self._read_json(request) if method == "POST" else {}
+                        status, body = getattr(self, f"_api_{name}")(payload=payload, query=query, **params)
+                        break
+        except ValueError as e:
+            status, body = 400, {"error": str(e)}
+        except Exception as e:
+            print(f"[ControlAPI] ❌ {method} {path} failed: {e}")
+            status, body = 500, {"error": f"{type(e).__name__}: {e}"}
+
+        if isinstance(body, str):
+            data, content_type = body.encode("utf-8"), "text/plain; version=0.0.4"
+        else:
+            data, content_type = json.dumps(body, default=str).encode("utf-8"), "application/json"
+        try:
+            request.send_response(status)
+            request.send_header("Content-Type", content_type)
+            request.send_header("Content-Length", str(len(data)))
+            request.end_headers()
+            request.wfile.write(data)
+        except OSError:
+            pass
+        metrics.observe("control_api_seconds", time.perf_counter() - started, endpoint=endpoint, status=str(status))
+
+    @staticmethod
+    def _read_json(request) -> Dict:
+        length = int(request.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            payload = json.loads(request.rfile.read(length))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON body: {e}")
+        if not isinstance(payload, dict):
+            raise ValueError("JSON body must be an object")
+        return payload
+
+    # Helpers
+    @property
+    def modules(self):
+        """Module manager once it is ready, else None"""
+        manager = self.daemon.module_manager
+        return manager if manager and manager.initialization_complete else None
+
+    def _instance(self, name: str) -> Optional[Dict]:
+        return self.daemon.instance_manager.get_instance(name)
+
+    def _describe(self, instance: Dict) -> Dict:
+        modules = self.modules
+        return dict(instance, modules=modules.get_module_status(instance["name"]) if modules else {})
+
+    def _require_instance(self, name: str):
+        if not self._instance(name):
+            return 404, {"error": f"Instance {name} not found"}
+        if not self.modules:
+            return 503, {"error": "Module system still initializing"}
+        return None
+
+    # Endpoints - each returns (status, body)
+    def _api_status(self, **_):
+        return 200, self.daemon.get_status()
+
+    def _api_list_instances(self, **_):
+        return 200, {"instances": [self._describe(i) for i in self.daemon.instance_manager.get_instances()]}
+
+    def _api_get_instance(self, name, **_):
+        instance = self._instance(name)
+        if not instance:
+            return 404, {"error": f"Instance {name} not found"}
+        body = self._describe(instance)
+        # Resolved from the store - the manager's settings_cache is empty in worker-process mode
+        body["settings"] = get_profiles().resolve(name)
+        return 200, body
+
+    def _api_start_instance(self, name, **_):
+        if not self._instance(name):
+            return 404, {"error": f"Instance {name} not found"}
+        self.daemon.start_instance(name)
+        return 202, {"instance": name, "action": "start", "queued": True}
+
+    def _api_stop_instance(self, name, **_):
+        if not self._instance(name):
+            return 404, {"error": f"Instance {name} not found"}
+        self.daemon.stop_instance(name)
+        return 202, {"instance": name, "action": "stop", "queued": True}
+
+    def _api_autostart(self, name, **_):
+        error = self._require_instance(name)
+        if error:
+            return error
+        self.modules.trigger_auto_startup_for_instance(name)
+        return 202, {"instance": name, "action": "autostart", "queued": True}
+
+    def _api_cleanup(self, name, **_):
+        error = self._require_instance(name)
+        if error:
+            return error
+        self.modules.cleanup_for_stopped_instance(name)
+        return 200, {"instance": name, "action": "cleanup"}
+
+    def _api_autogather(self, name, action, **_):
+        error = self._require_instance(name)
+        if error:
+            return error
+        if action == "start":
+            self.modules.manual_start_autogather(name)
+            return 202, {"instance": name, "action": "autogather_start"}
+        return 200, {"instance": name, "action": "autogather_stop",
+                     "stopped": bool(self.modules.manual_stop_autogather(name))}
+
+    def _api_update_settings(self, name, payload, **_):
+        section, values = payload.get("section"), payload.get("values")
+        if not section or not isinstance(values, dict):
+            raise ValueError('Body must be {"section": ..., "values": {...}}')
+        # Store subscribers push the change into the running modules
+        get_profiles().update_instance(name, section, values)
+        return 200, {"instance": name, "section": section, "values": values}
+
+    def _api_reload_settings(self, name, **_):
+        error = self._require_instance(name)
+        if error:
+            return error
+        settings_store.check_external_changes()
+        self.modules.reload_instance_settings(name)
+        return 200, {"instance": name, "action": "reload_settings"}
+
+    def _api_refresh_modules(self, **_):
+        if not self.modules:
+            return 503, {"error": "Module system still initializing"}
+        self.daemon.instance_manager.load_real_instances(force_refresh=True, log_result=False)
+        self.modules.refresh_modules()
+        return 200, {"instances": len(self.daemon.instance_manager.get_instances())}
+
+    def _api_fleet_autostart(self, payload, **_):
+        if not self.modules:
+            return 503, {"error": "Module system still initializing"}
+        names = payload.get("instances")
+        if names is not None and not isinstance(names, list):
+            raise ValueError('"instances" must be a list of instance names')
+        return 202, {"triggered": self.modules.start_fleet_autostart(names)}
+
+    def _api_autostart_progress(self, **_):
+        if not self.modules:
+            return 503, {"error": "Module system still initializing"}
+        return 200, self.modules.get_autostart_progress()
+
+    def _api_console(self, query, **_):
+        return 200, self.daemon.get_console_messages(int(query.get("since", 0)))
+
+    def _api_metrics_text(self, **_):
+        return 200, metrics.to_prometheus()
+
+    def _api_metrics_json(self, query, **_):
+        return 200, metrics.get_summary(**query)
+
+    def _api_shutdown(self, **_):
+        # Respond first, then stop
+        threading.Thread(target=self.daemon.request_shutdown, daemon=True).start()
+        return 202, {"action": "shutdown"}
+
+
+class ControlClient:
+    """Client for a daemon's control API (used by the GUI in attach mode)"""
+
+    def __init__(self, url: str = f"http://127.0.0.1:{DEFAULT_PORT}", token: str = None, timeout: float = 10):
+        self.url = url.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+
+    def request(self, method: str, path: str, body: Dict = None, timeout: float = None):
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        request = urllib.request.Request(self.url + path, data=data, method=method)
+        request.add_header("Content-Type", "application/json")
+        if self.token:
+            request.add_header("X-Benson-Token", self.token)
+        try:
+            with urllib.request.urlopen(request, timeout=timeout or self.timeout) as response:
+                payload = response.read().decode("utf-8")
+                if response.headers.get_content_type() == "application/json":
+                    return json.loads(payload)
+                return payload
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get("error", e.reason)
+            except Exception:
+                message = e.reason
+            raise ControlAPIError(f"{method} {path}: {message}", e.code)
+        except (urllib.error.URLError, OSError) as e:
+            raise ControlAPIError(f"Daemon unreachable at {self.url}: {e}")
+
+    def _instance_path(self, name: str, action: str = "") -> str:
+        return f"/instances/{urllib.parse.quote(name, safe='')}" + (f"/{action}" if action else "")
+
+    def get_status(self) -> Dict:
+        return self.request("GET", "/status")
+
+    def list_instances(self) -> List[Dict]:
+        return self.request("GET", "/instances")["instances"]
+
+    def get_instance(self, name: str) -> Dict:
+        return self.request("GET", self._instance_path(name))
+
+    def start_instance(self, name: str) -> Dict:
+        return self.request("POST", self._instance_path(name, "start"))
+
+    def stop_instance(self, name: str) -> Dict:
+        return self.request("POST", self._instance_path(name, "stop"))
+
+    def trigger_autostart(self, name: str) -> Dict:
+        return self.request("POST", self._instance_path(name, "autostart"))
+
+    def cleanup_instance(self, name: str) -> Dict:
+        return self.request("POST", self._instance_path(name, "cleanup"))
+
+    def autogather(self, name: str, action: str) -> Dict:
+        return self.request("POST", self._instance_path(name, f"autogather/{action}"))
+
+    def update_settings(self, name: str, section: str, values: Dict) -> Dict:
+        return self.request("POST", self._instance_path(name, "settings"), {"section": section, "values": values})
+
+    def reload_settings(self, name: str) -> Dict:
+        return self.request("POST", self._instance_path(name, "reload-settings"))
+
+    def refresh_modules(self) -> Dict:
+        return self.request("POST", "/modules/refresh")
+
+    def fleet_autostart(self, instance_names: List[str] = None) -> Dict:
+        return self.request("POST", "/fleet/autostart", {"instances": instance_names})
+
+    def get_autostart_progress(self) -> Dict:
+        return self.request("GET", "/autostart")
+
+    def get_console(self, since: int = 0, timeout: float = None) -> Dict:
+        return self.request("GET", f"/console?since={since}", timeout=timeout)
+
+    def get_metrics(self) -> str:
+        return self.request("GET", "/metrics")
+
+    def shutdown(self) -> Dict:
+        return self.request("POST", "/shutdown")
@@ -0,0 +1,299 @@
+"""
+BENSON v2.0 - Embedded Database
+SQLite (WAL mode) storage for instance settings, march assignments, module
+run history and OCR results, with a one-time import of the JSON files
+
+Enable with BENSON_DATABASE=benson.db
+"""
+
+import glob
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    kind TEXT NOT NULL,
+    instance TEXT NOT NULL,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (kind, instance)
+);
+
+CREATE TABLE IF NOT EXISTS module_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    instance TEXT NOT NULL,
+    module TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    duration REAL,
+    success INTEGER NOT NULL,
+    reason TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_module_time ON module_runs (module, started_at);
+CREATE INDEX IF NOT EXISTS idx_runs_instance_time ON module_runs (instance, started_at);
+
+CREATE TABLE IF NOT EXISTS ocr_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    instance TEXT NOT NULL,
+    region TEXT NOT NULL,
+    text TEXT,
+    confidence REAL,
+    method TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ocr_instance_time ON ocr_results (instance, created_at);
+
+CREATE TABLE IF NOT EXISTS migrations (
+    source TEXT PRIMARY KEY,
+    migrated_at REAL NOT NULL
+);
+"""
+
+# JSON files imported by migrate_json: glob pattern, document kind, instance name regex
+JSON_SOURCES = [
+    ("settings_*.json", "settings", r"^settings_(.+)\.json$"),
+    ("march_config_*.json", "march_config", r"^march_config_(.+)\.json$"),
+    ("profile_*.json", "profile", r"^profile_(.+)\.json$"),
+    ("*_config.json", "export", r"^(?!march_config_)(.+)_config\.json$"),
+]
+
+
+class BensonDatabase:
+    """Thread-safe SQLite store - one connection per thread, writes of run/OCR rows batched"""
+
+    def __init__(self, path: str = "benson.db", flush_interval: float = 1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+        # Buffered high-frequency rows, inserted with executemany by the writer thread
+        self._pending_runs: List[Tuple] = []
+        self._pending_ocr: List[Tuple] = []
+        self._buffer_lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+        self._connection().executescript(SCHEMA)
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True, name="DatabaseWriter")
+        self._writer.start()
+        print(f"[Database] ✅ Opened {path} (WAL)")
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False,
+                                         cached_statements=256)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            self._local.connection = connection
+        return connection
+
+    def _write(self, sql: str, rows: Iterable[Tuple] = None, many: bool = False):
+        connection = self._connection()
+        with self._write_lock, connection:
+            if many:
+                connection.executemany(sql, rows)
+            else:
+                connection.execute(sql, rows or ())
+
+    # Documents (settings, march assignments, exports)
+    def load_document(self, instance_name: str, kind: str = "settings") -> Optional[Dict]:
+        row = self._connection().execute(
+            "SELECT data FROM documents WHERE kind = ? AND instance = ?", (kind, instance_name)).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def load_documents(self, kind: str = "settings") -> Dict[str, Dict]:
+        rows = self._connection().execute("SELECT instance, data FROM documents WHERE kind = ?", (kind,))
+        return {row["instance"]: json.loads(row["data"]) for row in rows}
+
+    def save_document(self, instance_name: str, document: Dict, kind: str = "settings"):
+        self.save_documents({instance_name: document}, kind)
+
+    def save_documents(self, documents: Dict[str, Dict], kind: str = "settings"):
+        """Upsert many documents in one transaction"""
+        now = time.time()
+        rows = [(kind, name, json.dumps(document), now) for name, document in documents.items()]
+        self._write(
+            "INSERT INTO documents (kind, instance, data, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (kind, instance) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+            rows, many=True)
+
+    def documents_changed_since(self, since: float) -> List[Dict]:
+        """Documents written after a timestamp, by this or any other process"""
+        rows = self._connection().execute(
+            "SELECT kind, instance, data, updated_at FROM documents WHERE updated_at > ? ORDER BY updated_at",
+            (since,))
+        return [dict(row, data=json.loads(row["data"])) for row in rows]
+
+    def delete_documents(self, instance_name: str, kind: str = None):
+        """Remove one kind of document for an instance, or all of them"""
+        if kind:
+            self._write("DELETE FROM documents WHERE kind = ? AND instance = ?", (kind, instance_name))
+        else:
+            self._write("DELETE FROM documents WHERE instance = ?", (instance_name,))
+
+    # History
+    def record_run(self, instance_name: str, module: str, started_at: float, duration: float,
+                   success: bool, reason: str = None):
+        """Queue a module run row - written within flush_interval"""
+        with self._buffer_lock:
+            self._pending_runs.append((instance_name, module, started_at, duration, int(bool(success)), reason))
+
+    def record_ocr_results(self, instance_name: str, results: Iterable[Tuple[str, str, Optional[float], str]]):
+        """Queue (region, text, confidence, method) rows - confidence None when there is no OCR score"""
+        now = time.time()
+        with self._buffer_lock:
+            self._pending_ocr.extend((instance_name, region, text, confidence, method, now)
+                                     for region, text, confidence, method in results)
+
+    def _writer_loop(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        with self._buffer_lock:
+            runs, self._pending_runs = self._pending_runs, []
+            ocr, self._pending_ocr = self._pending_ocr, []
+        try:
+            if runs:
+                self._write("INSERT INTO module_runs (instance, module, started_at, duration, success, reason) "
+                            "VALUES (?, ?, ?, ?, ?, ?)", runs, many=True)
+            if ocr:
+                self._write("INSERT INTO ocr_results (instance, region, text, confidence, method, created_at) "
+                            "VALUES (?, ?, ?, ?, ?, ?)", ocr, many=True)
+        except Exception as e:
+            print(f"[Database] ❌ Flush error: {e}")
+
+    # Queries
+    def failing_instances(self, module: str = "AutoStartGame", since_seconds: float = 3600,
+                          min_failures: int = 1) -> List[Dict]:
+        """Instances with failed runs of a module in the time window, worst first"""
+        self.flush()
+        rows = self._connection().execute(
+            "SELECT instance, COUNT(*) AS failures, MAX(started_at) AS last_failure, "
+            "(SELECT reason FROM module_runs r2 WHERE r2.instance = r.instance AND r2.module = r.module "
+            " AND r2.success = 0 ORDER BY started_at DESC LIMIT 1) AS last_reason "
+            "FROM module_runs r WHERE module = ? AND success = 0 AND started_at >= ? "
+            "GROUP BY instance HAVING COUNT(*) >= ? ORDER BY failures DESC",
+            (module, time.time() - since_seconds, min_failures))
+        return [dict(row) for row in rows]
+
+    def run_history(self, instance_name: str = None, module: str = None, limit: int = 100) -> List[Dict]:
+        self.flush()
+        clauses, params = [], []
+        if instance_name:
+            clauses.append("instance = ?")
+            params.append(instance_name)
+        if module:
+            clauses.append("module = ?")
+            params.append(module)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connection().execute(
+            f"SELECT * FROM module_runs {where} ORDER BY started_at DESC LIMIT ?", (*params, limit))
+        return [dict(row) for row in rows]
+
+    def success_rates(self, since_seconds: float = 3600) -> Dict[str, Dict]:
+        """Per-module run counts and success rate in the time window"""
+        self.flush()
+        rows = self._connection().execute(
+            "SELECT module, COUNT(*) AS runs, SUM(success) AS successes, AVG(duration) AS avg_duration "
+            "FROM module_runs WHERE started_at >= ? GROUP BY module", (time.time() - since_seconds,))
+        return {row["module"]: {"runs": row["runs"], "success_rate": round(row["successes"] / row["runs"], 3),
+                                "avg_duration": round(row["avg_duration"] or 0, 3)} for row in rows}
+
+    def ocr_history(self, instance_name: str, region: str = None, limit: int = 100) -> List[Dict]:
+        self.flush()
+        sql = "SELECT * FROM ocr_results WHERE instance = ?"
+        params = [instance_name]
+        if region:
+            sql += " AND region = ?"
+            params.append(region)
+        rows = self._connection().execute(sql + " ORDER BY created_at DESC LIMIT ?", (*params, limit))
+        return [dict(row) for row in rows]
+
+    def prune(self, older_than_days: float = 30) -> int:
+        """Drop run and OCR history older than the given age"""
+        cutoff = time.time() - older_than_days * 86400
+        connection = self._connection()
+        with self._write_lock, connection:
+            removed = connection.execute("DELETE FROM module_runs WHERE started_at < ?", (cutoff,)).rowcount
+            removed += connection.execute("DELETE FROM ocr_results WHERE created_at < ?", (cutoff,)).rowcount
+        return removed
+
+    # Migration
+    def migrate_json(self, directory: str = ".") -> Dict[str, int]:
+        """Import settings/march/export JSON files not imported before (files are left in place)"""
+        done = {row["source"] for row in self._connection().execute("SELECT source FROM migrations")}
+        imported = {}
+        migrated_sources = []
+
+        for pattern, kind, name_regex in JSON_SOURCES:
+            documents = {}
+            for path in glob.glob(os.path.join(directory, pattern)):
+                filename = os.path.basename(path)
+                match = re.match(name_regex, filename)
+                if not match or filename in done:
+                    continue
+                try:
+                    with open(path, "r") as f:
+                        documents[match.group(1)] = json.load(f)
+                    migrated_sources.append(filename)
+                except Exception as e:
+                    print(f"[Database] ⚠️ Skipping {filename}: {e}")
+
+            if documents:
+                self.save_documents(documents, kind)
+            imported[kind] = len(documents)
+
+        if migrated_sources:
+            now = time.time()
+            self._write("INSERT OR IGNORE INTO migrations (source, migrated_at) VALUES (?, ?)",
+                        [(source, now) for source in migrated_sources], many=True)
+            print(f"[Database] ✅ Migrated {len(migrated_sources)} JSON files: {imported}")
+        return imported
+
+    def get_stats(self) -> Dict:
+        connection = self._connection()
+        counts = {table: connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                  for table in ("documents", "module_runs", "ocr_results")}
+        with self._buffer_lock:
+            counts["pending_rows"] = len(self._pending_runs) + len(self._pending_ocr)
+        counts["size_bytes"] = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        return counts
+
+    def close(self):
+        self._stop_event.set()
+        self.flush()
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+_database = None
+_database_lock = threading.Lock()
+
+
+def get_database() -> Optional[BensonDatabase]:
+    """Process-wide database when BENSON_DATABASE is set, otherwise None"""
+    global _database
+    path = os.environ.get("BENSON_DATABASE")
+    if not path:
+        return None
+    if _database is None:
+        with _database_lock:
+            if _database is None:
+                try:
+                    _database = BensonDatabase(path)
+                    _database.migrate_json(".")
+                except Exception as e:
+                    print(f"[Database] ❌ Could not open {path}: {e}")
+                    os.environ.pop("BENSON_DATABASE", None)
+                    return None
+    return _database
@@ -0,0 +1,92 @@
+"""
+BENSON v2.0 - Import Profiler
+Measures what each module costs to import during startup
+(enabled with main.py --profile-startup)
+"""
+
+import builtins
+import importlib.util
+import sys
+import threading
+import time
+from typing import Dict, List
+
+
+class ImportProfiler:
+    """Wraps __import__ and records inclusive/self time for every first-time import"""
+
+    def __init__(self):
+        self.records: Dict[str, Dict] = {}
+        self.active = False
+        self._original_import = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def start(self):
+        if self.active:
+            return
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+        self.active = True
+
+    def stop(self):
+        if not self.active:
+            return
+        builtins.__import__ = self._original_import
+        self.active = False
+
+    def _resolve(self, name: str, globals, level: int) -> str:
+        if level == 0 or not globals:
+            return name
+        try:
+            return importlib.util.resolve_name("." * level + name, globals.get("__package__") or "")
+        except (ImportError, ValueError):
+            return name
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        full_name = self._resolve(name, globals, level)
+        if full_name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+
+        # Child time accumulates here so the parent's self time can be derived
+        frame = {"children": 0.0}
+        stack.append(frame)
+        started = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            inclusive = time.perf_counter() - started
+            stack.pop()
+            if stack:
+                stack[-1]["children"] += inclusive
+
+            importer = globals.get("__name__") if globals else None
+            with self._lock:
+                if full_name not in self.records:
+                    self.records[full_name] = {
+                        "module": full_name,
+                        "inclusive": inclusive,
+                        "self": max(0.0, inclusive - frame["children"]),
+                        "imported_by": importer,
+                        "thread": threading.current_thread().name
+                    }
+
+    def get_report(self, limit: int = 25, sort_by: str = "inclusive") -> List[Dict]:
+        with self._lock:
+            records = sorted(self.records.values(), key=lambda r: r[sort_by], reverse=True)
+        return [dict(r, inclusive=round(r["inclusive"], 4), self=round(r["self"], 4)) for r in records[:limit]]
+
+    def print_report(self, limit: int = 25):
+        total = sum(r["self"] for r in self.records.values())
+        print(f"[ImportProfiler] ⏱️ {len(self.records)} modules imported, {total:.2f}s total")
+        print(f"[ImportProfiler]   {'module':<40} {'cumulative':>10} {'self':>8}  imported by")
+        for record in self.get_report(limit):
+            print(f"[ImportProfiler]   {record['module']:<40} {record['inclusive']:>9.3f}s "
+                  f"{record['self']:>7.3f}s  {record['imported_by'] or '-'}")
+
+
+import_profiler = ImportProfiler()
@@ -397,8 +397,49 @@ class InstanceOperations:
             self.create_instance_with_name(name)
 
     def clone_selected_instance(self):
-        """Clone selected instance (placeholder)"""
-        self.app.add_console_message("Clone functionality coming soon...")
+        """Provision clones of the selected instance as a golden template"""
+        selected = [card for card in self.app.instance_cards 
+                   if hasattr(card, 'selected') and hasattr(card, 'name') and card.selected]
+        
+        if len(selected) != 1:
+            self.app.add_console_message("Select exactly one instance to clone")
+            return
+        
+        template_name = selected[0].name
+        count = simpledialog.askinteger("Clone Instance", f"How many clones of '{template_name}'?",
+                                        parent=self.app, minvalue=1, maxvalue=100)
+        if not count:
+            return
+        
+        existing = {inst["name"] for inst in self.app.instance_manager.get_instances()}
+        names = []
+        suffix = 1
+        while len(names) < count:
+            candidate = f"{template_name}-{suffix}"
+            if candidate not in existing:
+                names.append(candidate)
+            suffix += 1
+        
+        self.app.add_console_message(f"⚡ Provisioning {count} clones of {template_name}...")
+        
+        def on_progress(name, stage, success):
+            if stage == "ready" or not success:
+                icon = "✅" if success else "❌"
+                self.app.after(0, lambda: self.app.add_console_message(f"{icon} {name}: {stage}"))
+        
+        def provision_worker():
+            try:
+                results = self.app.instance_manager.provision_instances_from_template(
+                    names, template_name=template_name, progress_callback=on_progress)
+                succeeded = len([r for r in results.values() if r.get("success")])
+                self.app.after(0, lambda: self.app.add_console_message(
+                    f"✅ Provisioned {succeeded}/{count} clones of {template_name}"))
+                if hasattr(self.app, 'module_manager') and self.app.module_manager:
+                    self.app.after(0, self.app.module_manager.refresh_modules)
+            except Exception as e:
+                self.app.after(0, lambda: self.app.add_console_message(f"❌ Clone error: {e}"))
+        
+        threading.Thread(target=provision_worker, daemon=True, name=f"Clone-{template_name}").start()
 
     def delete_instance_card_with_loading(self, card):
         """Legacy method name"""
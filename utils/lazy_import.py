@@ -0,0 +1,68 @@
+"""
+BENSON v2.0 - Deferred Imports
+Module proxies that import the real module on first attribute access, so
+heavy packages (cv2, numpy) stay off the startup path
+"""
+
+import importlib
+import importlib.util
+import threading
+import time
+import types
+from typing import Dict
+
+_available: Dict[str, bool] = {}
+_lock = threading.RLock()
+
+
+def module_available(name: str) -> bool:
+    """Whether a module can be imported, checked without importing it"""
+    if name not in _available:
+        try:
+            _available[name] = importlib.util.find_spec(name) is not None
+        except (ImportError, ValueError):
+            _available[name] = False
+    return _available[name]
+
+
+class LazyModule(types.ModuleType):
+    """Stand-in for a module until something uses it"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_target"] = None
+
+    def _load(self):
+        target = self.__dict__["_lazy_target"]
+        if target is None:
+            with _lock:
+                target = self.__dict__["_lazy_target"]
+                if target is None:
+                    started = time.perf_counter()
+                    target = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_target"] = target
+                    duration = time.perf_counter() - started
+                    print(f"[LazyImport] Loaded {self.__name__} on first use ({duration:.2f}s)")
+
+                    from utils.metrics import metrics
+                    metrics.observe("lazy_import_seconds", duration, module=self.__name__)
+        return target
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__["_lazy_target"] is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Proxy for a module imported when first touched; raises ImportError then if it is missing"""
+    return LazyModule(name)
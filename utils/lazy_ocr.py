@@ -0,0 +1,108 @@
+"""
+BENSON v2.0 - Lazy OCR Engines
+OCR engines are heavy to import and construct, so each one is created on
+first use (or warmed up in the background) and shared by every module
+"""
+
+import importlib.util
+import threading
+from typing import Callable, Optional
+
+
+class LazyOCR:
+    """Process-wide OCR engine built on first use"""
+
+    def __init__(self, name: str, module: str, factory: Callable):
+        self.name = name
+        self.module = module
+        self.factory = factory
+        self.engine = None
+        self.error = None
+        self.lock = threading.Lock()
+
+    def is_installed(self) -> bool:
+        """Package check without importing it"""
+        try:
+            return importlib.util.find_spec(self.module) is not None
+        except (ImportError, ValueError):
+            return False
+
+    @property
+    def ready(self) -> bool:
+        return self.engine is not None
+
+    def get(self):
+        """The engine, created on the first call; None if it can't be loaded"""
+        if self.engine is not None or self.error is not None:
+            return self.engine
+
+        with self.lock:
+            if self.engine is None and self.error is None:
+                try:
+                    self.engine = self.factory()
+                    print(f"[LazyOCR] ✅ {self.name} initialized")
+                except ImportError:
+                    self.error = f"{self.module} not installed"
+                    print(f"[LazyOCR] ⚠️ {self.name} not available - install with: pip install {self.module}")
+                except Exception as e:
+                    self.error = str(e)
+                    print(f"[LazyOCR] ⚠️ {self.name} initialization failed: {e}")
+        return self.engine
+
+    def warm_up(self) -> Optional[threading.Thread]:
+        """Create the engine in a background thread so the first real call doesn't pay for it"""
+        if self.engine is not None or self.error is not None:
+            return None
+        thread = threading.Thread(target=self.get, daemon=True, name=f"{self.name}-warmup")
+        thread.start()
+        return thread
+
+    def __getattr__(self, attr):
+        # Only reached for attributes LazyOCR doesn't define - forward them to the engine (e.g. ocr.ocr(...))
+        if attr in ("name", "module", "factory", "engine", "error", "lock"):
+            raise AttributeError(attr)
+        engine = self.get()
+        if engine is None:
+            raise AttributeError(f"{self.name} unavailable: {self.error}")
+        return getattr(engine, attr)
+
+
+def _create_paddle_ocr():
+    from paddleocr import PaddleOCR
+    import inspect
+
+    # Constructor parameters differ between PaddleOCR versions
+    ocr_init_params = inspect.signature(PaddleOCR.__init__).parameters
+    init_kwargs = {'use_angle_cls': True, 'lang': 'en'}
+    if 'show_log' in ocr_init_params:
+        init_kwargs['show_log'] = False
+    if 'use_gpu' in ocr_init_params:
+        init_kwargs['use_gpu'] = False
+    return PaddleOCR(**init_kwargs)
+
+
+def _create_easyocr():
+    import easyocr
+    return easyocr.Reader(['en'], gpu=False)
+
+
+paddle_ocr = LazyOCR("PaddleOCR", "paddleocr", _create_paddle_ocr)
+easy_ocr = LazyOCR("EasyOCR", "easyocr", _create_easyocr)
+
+_tesseract_available = None
+_tesseract_lock = threading.Lock()
+
+
+def tesseract_available() -> bool:
+    """Whether pytesseract and the tesseract binary work - checked once"""
+    global _tesseract_available
+    if _tesseract_available is None:
+        with _tesseract_lock:
+            if _tesseract_available is None:
+                try:
+                    import pytesseract
+                    pytesseract.get_tesseract_version()
+                    _tesseract_available = True
+                except Exception:
+                    _tesseract_available = False
+    return _tesseract_available
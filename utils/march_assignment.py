@@ -3,10 +3,30 @@ BENSON v2.0 - Compact March Assignment System
 Reduced from 300+ lines to ~100 lines with same functionality
 """
 
-import json
-import os
 from typing import Dict, List
-from datetime import datetime
+
+from utils.settings_profiles import get_profiles
+from utils.settings_store import settings_store
+
+
+MARCH_PRESETS = {
+    "gathering_focused": {
+        "unlocked": 4,
+        "assignments": {1: "AutoGather", 2: "AutoGather", 3: "AutoGather", 4: "Rally/Manual"}
+    },
+    "rally_focused": {
+        "unlocked": 4, 
+        "assignments": {1: "AutoGather", 2: "Rally/Manual", 3: "Rally/Manual", 4: "Rally/Manual"}
+    },
+    "balanced": {
+        "unlocked": 4,
+        "assignments": {1: "AutoGather", 2: "AutoGather", 3: "Rally/Manual", 4: "Manual Only"}
+    },
+    "manual_control": {
+        "unlocked": 2,
+        "assignments": {1: "Manual Only", 2: "Manual Only"}
+    }
+}
 
 
 class SimplifiedMarchManager:
@@ -27,41 +47,50 @@ class SimplifiedMarchManager:
         self.load_configuration()
     
     def load_configuration(self):
-        """Load march queue configuration"""
+        """Load march queue configuration from the instance's resolved profile settings"""
         try:
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r') as f:
-                    config = json.load(f)
-                
-                self.unlocked_queues = config.get("unlocked_queues", 2)
-                saved_assignments = config.get("queue_assignments", {})
-                
-                for queue_str, assignment in saved_assignments.items():
-                    queue_num = int(queue_str)
-                    if 1 <= queue_num <= 6:
-                        self.queue_assignments[queue_num] = assignment
-                
-                print(f"[MarchManager] Loaded config for {self.instance_name}: {self.unlocked_queues} queues")
+            if settings_store.exists(self.instance_name, kind="march_config"):
+                self._migrate_march_config()
+            
+            config = get_profiles().resolve(self.instance_name).get("march_assignment", {})
+            self.unlocked_queues = config.get("unlocked_queues", self.unlocked_queues)
+            for queue_str, assignment in config.get("queue_assignments", {}).items():
+                queue_num = int(queue_str)
+                if 1 <= queue_num <= 6:
+                    self.queue_assignments[queue_num] = assignment
+            
+            print(f"[MarchManager] Loaded config for {self.instance_name}: {self.unlocked_queues} queues")
                 
         except Exception as e:
             print(f"[MarchManager] Error loading config: {e}")
     
+    def _migrate_march_config(self):
+        """Move an old march_config_<instance>.json into the settings' march_assignment section"""
+        config = settings_store.get(self.instance_name, kind="march_config")
+        values = {key: config[key] for key in ("unlocked_queues", "queue_assignments") if key in config}
+        if values:
+            self._save_section(values)
+        settings_store.delete(self.instance_name, kind="march_config")
+        print(f"[MarchManager] Migrated {self.settings_file} into instance settings")
+    
+    def _save_section(self, values: Dict):
+        """Store march values as instance overrides - values equal to the profile's stay inherited"""
+        profiles = get_profiles()
+        settings = profiles.resolve(self.instance_name)
+        settings.setdefault("march_assignment", {}).update(values)
+        profiles.save_instance(self.instance_name, settings)
+    
     def save_configuration(self):
         """Save march queue configuration"""
         try:
-            config = {
+            self._save_section({
                 "unlocked_queues": self.unlocked_queues,
                 "queue_assignments": {
                     str(queue_num): assignment 
                     for queue_num, assignment in self.queue_assignments.items()
                     if queue_num <= self.unlocked_queues
-                },
-                "last_updated": datetime.now().isoformat(),
-                "instance_name": self.instance_name
-            }
-            
-            with open(self.settings_file, 'w') as f:
-                json.dump(config, f, indent=2)
+                }
+            })
                 
             print(f"[MarchManager] Saved config for {self.instance_name}")
             
@@ -144,27 +173,8 @@ class SimplifiedMarchManager:
     
     def apply_preset(self, preset_name: str):
         """Apply preset configuration"""
-        presets = {
-            "gathering_focused": {
-                "unlocked": 4,
-                "assignments": {1: "AutoGather", 2: "AutoGather", 3: "AutoGather", 4: "Rally/Manual"}
-            },
-            "rally_focused": {
-                "unlocked": 4, 
-                "assignments": {1: "AutoGather", 2: "Rally/Manual", 3: "Rally/Manual", 4: "Rally/Manual"}
-            },
-            "balanced": {
-                "unlocked": 4,
-                "assignments": {1: "AutoGather", 2: "AutoGather", 3: "Rally/Manual", 4: "Manual Only"}
-            },
-            "manual_control": {
-                "unlocked": 2,
-                "assignments": {1: "Manual Only", 2: "Manual Only"}
-            }
-        }
-        
-        if preset_name in presets:
-            preset = presets[preset_name]
+        if preset_name in MARCH_PRESETS:
+            preset = MARCH_PRESETS[preset_name]
             self.unlocked_queues = preset["unlocked"]
             
             for queue_num, assignment in preset["assignments"].items():
@@ -263,10 +273,35 @@ def get_march_configuration_for_dialog(instance_name: str) -> Dict:
         return {"unlocked_queues": 2, "queue_assignments": {"1": "AutoGather", "2": "AutoGather"}}
 
 
+def apply_preset_to_fleet(preset_name: str, instance_names: List[str] = None, profile: str = None) -> bool:
+    """Apply a march preset to a whole profile (one write) or to many instances (one batched update)"""
+    preset = MARCH_PRESETS.get(preset_name)
+    if not preset or not (instance_names or profile):
+        return False
+    
+    values = {
+        "unlocked_queues": preset["unlocked"],
+        "queue_assignments": {str(num): assignment for num, assignment in preset["assignments"].items()}
+    }
+    if profile:
+        get_profiles().update_profile(profile, "march_assignment", values)
+        print(f"[MarchManager] Applied preset '{preset_name}' to profile {profile}")
+    if instance_names:
+        # Old march_config files would be migrated over the preset on next load - the preset replaces them
+        for name in instance_names:
+            if settings_store.exists(name, kind="march_config"):
+                settings_store.delete(name, kind="march_config")
+        get_profiles().bulk_apply(instance_names, "march_assignment", values)
+        print(f"[MarchManager] Applied preset '{preset_name}' to {len(instance_names)} instances")
+    return True
+
+
 # Export functions
 __all__ = [
     'SimplifiedMarchManager',
     'get_march_manager',
     'update_march_settings_from_dialog',
-    'get_march_configuration_for_dialog'
-]
\ No newline at end of file
+    'get_march_configuration_for_dialog',
+    'apply_preset_to_fleet'
+]
+
@@ -0,0 +1,238 @@
+"""
+BENSON v2.0 - Metrics Registry
+Histograms and counters labelled by module/instance, with percentile
+summaries and Prometheus text export
+"""
+
+import functools
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+RESERVOIR_SIZE = 1024
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile (pct in 0-100)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+class Histogram:
+    """Cumulative buckets for export plus a window of recent samples for percentiles"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=RESERVOIR_SIZE)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+
+    def summary(self) -> Dict:
+        recent = list(self.recent)
+        return {
+            "count": self.count,
+            "p50_ms": _ms(percentile(recent, 50)),
+            "p95_ms": _ms(percentile(recent, 95)),
+            "p99_ms": _ms(percentile(recent, 99)),
+            "max_ms": _ms(max(recent) if recent else None)
+        }
+
+
+def _ms(value: Optional[float]) -> Optional[float]:
+    return round(value * 1000, 1) if value is not None else None
+
+
+def _label_key(labels: Dict) -> Tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(key: Tuple, extra: Tuple = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class MetricsRegistry:
+    """Thread-safe store of labelled histograms and counters"""
+
+    def __init__(self, prefix: str = "benson"):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.help = {}
+
+        self._export_thread = None
+        self._export_stop = threading.Event()
+
+    # Recording
+    def observe(self, name: str, value: float, **labels):
+        """Record one duration (seconds) or size sample"""
+        key = _label_key(labels)
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def increment(self, name: str, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Time a block into a histogram"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def describe(self, name: str, text: str):
+        self.help[name] = text
+
+    # Queries
+    def get_summary(self, **match) -> Dict:
+        """Percentile summaries and counters for series whose labels include match"""
+        wanted = set(_label_key(match))
+        result = {"histograms": {}, "counters": {}}
+
+        with self.lock:
+            for name, series in self.histograms.items():
+                for key, histogram in series.items():
+                    if wanted <= set(key):
+                        label = ",".join(f"{k}={v}" for k, v in key if (k, v) not in wanted)
+                        result["histograms"][f"{name}[{label}]" if label else name] = histogram.summary()
+
+            for name, series in self.counters.items():
+                for key, value in series.items():
+                    if wanted <= set(key):
+                        label = ",".join(f"{k}={v}" for k, v in key if (k, v) not in wanted)
+                        result["counters"][f"{name}[{label}]" if label else name] = value
+
+        return result
+
+    def get_slowest(self, name: str, group_by: str = "instance", pct: float = 95, count: int = 5) -> List[tuple]:
+        """Label values with the highest percentile for a histogram - e.g. slowest instances"""
+        grouped = {}
+        with self.lock:
+            for key, histogram in self.histograms.get(name, {}).items():
+                value = dict(key).get(group_by)
+                if value is not None:
+                    grouped.setdefault(value, []).extend(histogram.recent)
+
+        ranked = [(value, _ms(percentile(samples, pct))) for value, samples in grouped.items() if samples]
+        ranked.sort(key=lambda item: item[1], reverse=True)
+        return ranked[:count]
+
+    # Export
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        with self.lock:
+            for name, series in sorted(self.histograms.items()):
+                metric = f"{self.prefix}_{name}"
+                if name in self.help:
+                    lines.append(f"# HELP {metric} {self.help[name]}")
+                lines.append(f"# TYPE {metric} histogram")
+                for key, histogram in series.items():
+                    for bound, bucket_count in zip(histogram.buckets, histogram.bucket_counts):
+                        lines.append(f"{metric}_bucket{_format_labels(key, (('le', str(bound)),))} {bucket_count}")
+                    lines.append(f"{metric}_bucket{_format_labels(key, (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{metric}_sum{_format_labels(key)} {histogram.sum:.6f}")
+                    lines.append(f"{metric}_count{_format_labels(key)} {histogram.count}")
+
+            for name, series in sorted(self.counters.items()):
+                metric = f"{self.prefix}_{name}"
+                if name in self.help:
+                    lines.append(f"# HELP {metric} {self.help[name]}")
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in series.items():
+                    lines.append(f"{metric}{_format_labels(key)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """Atomically write the Prometheus dump (for node_exporter textfile collector etc.)"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(temp_path, path)
+
+    def start_file_export(self, path: str, interval: float = 15.0):
+        """Rewrite the Prometheus file every interval seconds"""
+        if self._export_thread and self._export_thread.is_alive():
+            return
+
+        def export_loop():
+            while not self._export_stop.wait(interval):
+                try:
+                    self.write_prometheus(path)
+                except Exception as e:
+                    print(f"[Metrics] Export error: {e}")
+
+        self._export_stop.clear()
+        self._export_thread = threading.Thread(target=export_loop, daemon=True, name="MetricsExport")
+        self._export_thread.start()
+        print(f"[Metrics] ✅ Exporting to {path} every {interval:.0f}s")
+
+    def stop_file_export(self):
+        self._export_stop.set()
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+
+# Process-wide registry
+metrics = MetricsRegistry()
+metrics.describe("module_cycle_seconds", "Module cycle duration")
+metrics.describe("module_cycle_failures_total", "Failed module cycles by reason")
+metrics.describe("action_seconds", "Capture, tap, template match and OCR durations")
+metrics.describe("work_queue_wait_seconds", "Time work spent queued before a worker picked it up")
+metrics.describe("autostart_seconds", "AutoStart run duration")
+metrics.describe("autostart_step_seconds", "AutoStart run step (capture + action) duration")
+
+
+def timed_action(action: str):
+    """Decorator recording a module method's duration as action_seconds{action,module,instance}"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                metrics.observe("action_seconds", time.perf_counter() - start, action=action,
+                                module=getattr(self, "module_name", type(self).__name__),
+                                instance=getattr(self, "instance_name", None))
+        return wrapper
+    return decorator
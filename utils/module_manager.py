@@ -3,28 +3,87 @@ BENSON v2.0 - FIXED Module Manager
 Added proper settings reload and AutoGather update methods
 """
 
+import copy
 import os
-import json
 import threading
 import time
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List
+
+from modules.adaptive_wait import load_time_model
+from utils.autostart_orchestrator import AutoStartOrchestrator
+from utils.lazy_ocr import paddle_ocr
+from utils.metrics import metrics
+from utils.settings_profiles import DEFAULT_SETTINGS, get_profiles
+from utils.settings_store import settings_store
+
+# Module name -> settings section pushed into it on hot reload
+MODULE_SETTINGS_SECTIONS = {"AutoStartGame": "autostart_game", "AutoGather": "auto_gather"}
 
 
 class ModuleManager:
     """Fixed module manager with proper AutoGather integration and settings reload"""
     
-    def __init__(self, app_ref):
+    def __init__(self, app_ref, instance_filter: Callable[[str], bool] = None):
         self.app = app_ref
+        # Worker processes manage only their shard of instances
+        self.instance_filter = instance_filter
         self.instance_modules = {}
         self.settings_cache = {}
         self.initialization_complete = False
         self.autostart_completed = {}
         self.running_modules = {}
+        self.scheduler = self._create_scheduler()
+        self.autostart_orchestrator = AutoStartOrchestrator(
+            max_concurrent=int(os.environ.get("BENSON_AUTOSTART_CONCURRENCY", "4")),
+            captures_per_second=float(os.environ.get("BENSON_CAPTURE_BUDGET", "10")),
+            progress_callback=self._on_autostart_progress,
+            scheduler=self.scheduler,
+            run_timeout=float(os.environ.get("BENSON_AUTOSTART_RUN_TIMEOUT", "600"))
+        )
+        self._last_autostart_done = 0
+        self.module_classes = (None, None, None, None)
+        self._start_metrics_export()
         
         print("[ModuleManager] Initializing compact module system...")
+        self.profiles = get_profiles()
+        self.profiles.subscribe(self._on_settings_changed)
         self._init_modules()
+        self._start_settings_watch()
         self._start_status_loop()
     
+    def _create_scheduler(self):
+        """Optional shared event-loop scheduler (BENSON_MODULE_SCHEDULER=async)"""
+        if os.environ.get("BENSON_MODULE_SCHEDULER", "threads").lower() != "async":
+            return None
+        try:
+            from modules.module_scheduler import AsyncModuleScheduler
+            workers = int(os.environ.get("BENSON_SCHEDULER_WORKERS", "8"))
+            print(f"[ModuleManager] Using async module scheduler with global work queue ({workers} workers)")
+            return AsyncModuleScheduler(max_workers=workers)
+        except Exception as e:
+            print(f"[ModuleManager] ⚠️ Async scheduler unavailable, using threads: {e}")
+            return None
+    
+    def _start_metrics_export(self):
+        """Periodic Prometheus text dump when BENSON_METRICS_FILE is set"""
+        path = os.environ.get("BENSON_METRICS_FILE")
+        if path:
+            metrics.start_file_export(path, float(os.environ.get("BENSON_METRICS_INTERVAL", "15")))
+    
+    def _start_settings_watch(self):
+        """Hot reload of settings edited outside the app (BENSON_SETTINGS_WATCH_INTERVAL=0 disables)"""
+        interval = float(os.environ.get("BENSON_SETTINGS_WATCH_INTERVAL", "2"))
+        if interval > 0:
+            settings_store.start_watching(interval)
+    
+    def _managed_instances(self) -> List[Dict]:
+        """Instances this manager runs modules for"""
+        instances = self.app.instance_manager.get_instances()
+        if self.instance_filter:
+            instances = [instance for instance in instances if self.instance_filter(instance["name"])]
+        return instances
+    
     def _init_modules(self):
         """Initialize modules for all instances with proper dependencies"""
         try:
@@ -45,65 +104,36 @@ class ModuleManager:
             adb_utils_instance = None
             
             if AutoGatherModule:
-                # Try to initialize PaddleOCR with robust version handling
-                try:
-                    from paddleocr import PaddleOCR
-                    import inspect
-                    
-                    # Check PaddleOCR constructor parameters to determine version compatibility
-                    ocr_init_params = inspect.signature(PaddleOCR.__init__).parameters
-                    
-                    # Build initialization parameters based on what's supported
-                    init_kwargs = {
-                        'use_angle_cls': True,
-                        'lang': 'en'
-                    }
-                    
-                    # Only add show_log if it's supported (older versions)
-                    if 'show_log' in ocr_init_params:
-                        init_kwargs['show_log'] = False
-                        print("[ModuleManager] Using PaddleOCR with show_log parameter (older version)")
-                    else:
-                        print("[ModuleManager] Using PaddleOCR without show_log parameter (newer version)")
-                    
-                    # Add other common parameters if supported
-                    if 'use_gpu' in ocr_init_params:
-                        init_kwargs['use_gpu'] = False  # Default to CPU for compatibility
-                    
-                    # Initialize PaddleOCR with compatible parameters
-                    ocr_instance = PaddleOCR(**init_kwargs)
-                    print("[ModuleManager] ✅ PaddleOCR initialized successfully")
-                    
-                except ImportError:
+                # PaddleOCR is only checked for here - it is imported and built on first use
+                if paddle_ocr.is_installed():
+                    ocr_instance = paddle_ocr
+                    print("[ModuleManager] ✅ PaddleOCR found (loads on first use)")
+                else:
                     print("[ModuleManager] ⚠️ PaddleOCR not available - install with: pip install paddleocr")
                     print("[ModuleManager] ⚠️ AutoGather will be disabled")
                     AutoGatherModule = None
-                    ocr_instance = None
-                except Exception as e:
-                    print(f"[ModuleManager] ⚠️ PaddleOCR initialization failed: {e}")
-                    print("[ModuleManager] ⚠️ AutoGather will be disabled")
-                    AutoGatherModule = None
-                    ocr_instance = None
                 
                 # Initialize ADB utils
                 if AutoGatherModule:
                     try:
-                        adb_utils_instance = ADBUtils()
+                        adb_utils_instance = ADBUtils(self.app.instance_manager.backend)
                         print("[ModuleManager] ✅ ADB utils initialized successfully")
                     except Exception as e:
                         print(f"[ModuleManager] ⚠️ ADB utils initialization failed: {e}")
                         AutoGatherModule = None
             
+            # Resources shared by every instance's modules (also reused by refresh_modules)
+            self.module_classes = (AutoStartGameModule, AutoGatherModule, ocr_instance, adb_utils_instance)
+            
             # Create modules for each instance
-            instances = self.app.instance_manager.get_instances()
-            for instance in instances:
-                self._create_instance_modules(
-                    instance["name"], 
-                    AutoStartGameModule, 
-                    AutoGatherModule,
-                    ocr_instance,
-                    adb_utils_instance
-                )
+            instances = self._managed_instances()
+            settings_store.preload([instance["name"] for instance in instances], kinds=["settings"])
+            settings_store.preload(kinds=["profile"])
+            self._create_modules_parallel([instance["name"] for instance in instances])
+            
+            # Build the OCR engine off the startup path so the first gather cycle doesn't wait for it
+            if ocr_instance and any("AutoGather" in modules for modules in self.instance_modules.values()):
+                paddle_ocr.warm_up()
             
             self.initialization_complete = True
             print(f"[ModuleManager] ✅ Ready for {len(instances)} instances")
@@ -113,6 +143,37 @@ class ModuleManager:
             print(f"[ModuleManager] ❌ Init error: {e}")
             self.initialization_complete = True
     
+    def _create_modules_parallel(self, instance_names):
+        """Create modules for many instances at once using the shared resources from _init_modules"""
+        if not instance_names:
+            return
+        AutoStartGameModule, AutoGatherModule, ocr, adb_utils = self.module_classes
+        if AutoStartGameModule is None:
+            print("[ModuleManager] ⚠️ Module classes not loaded - skipping module creation")
+            return
+        
+        # Shared state must exist before modules race to create it
+        if not hasattr(self.app.instance_manager, "shared_state"):
+            self.app.instance_manager.shared_state = {}
+        
+        started = time.time()
+        workers = max(1, min(int(os.environ.get("BENSON_MODULE_INIT_WORKERS", "8")), len(instance_names)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ModuleInit") as pool:
+            futures = {
+                pool.submit(self._create_instance_modules, name, AutoStartGameModule,
+                            AutoGatherModule, ocr, adb_utils): name
+                for name in instance_names
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"[ModuleManager] ❌ Failed to create modules for {futures[future]}: {e}")
+        
+        duration = time.time() - started
+        metrics.observe("module_init_seconds", duration)
+        print(f"[ModuleManager] ✅ Created modules for {len(instance_names)} instances in {duration:.2f}s ({workers} workers)")
+    
     def _create_instance_modules(self, instance_name: str, AutoStartGameModule, AutoGatherModule=None, ocr=None, adb_utils=None):
         """Create modules for single instance with proper parameters"""
         try:
@@ -127,6 +188,8 @@ class ModuleManager:
                 shared_resources=self.app.instance_manager,
                 console_callback=self.app.add_console_message
             )
+            autostart.scheduler = self.scheduler
+            autostart.apply_settings(settings.get("autostart_game", {}))
             self.instance_modules[instance_name]["AutoStartGame"] = autostart
             self.running_modules[instance_name]["AutoStartGame"] = False
             
@@ -147,6 +210,8 @@ class ModuleManager:
                             logger=None,  # Optional - will use log_callback
                             log_callback=self.app.add_console_message  # Use this for logging
                         )
+                        if hasattr(gather, "scheduler"):
+                            gather.scheduler = self.scheduler
                         self.instance_modules[instance_name]["AutoGather"] = gather
                         self.running_modules[instance_name]["AutoGather"] = False
                         print(f"[ModuleManager] ✅ AutoGather created for {instance_name} (index: {instance_index})")
@@ -166,12 +231,14 @@ class ModuleManager:
             print(f"[ModuleManager] ❌ Error creating modules for {instance_name}: {e}")
     
     def _start_status_loop(self):
-        """Start background status update loop"""
+        """Start background status update loop - card updates arrive as instance deltas"""
+        self.app.instance_manager.subscribe_instance_changes(self._on_instance_changes)
+        
         def status_loop():
             while hasattr(self, 'app') and self.app:
                 try:
                     self.app.instance_manager.update_instance_statuses()
-                    self._update_card_statuses()
+                    self._update_card_resources()
                     time.sleep(10)
                 except Exception as e:
                     print(f"[ModuleManager] Status loop error: {e}")
@@ -179,23 +246,40 @@ class ModuleManager:
         
         threading.Thread(target=status_loop, daemon=True, name="StatusLoop").start()
     
-    def _update_card_statuses(self):
-        """Update GUI card statuses"""
+    def _on_instance_changes(self, delta):
+        """Update only the GUI cards whose instance status changed"""
         try:
-            if not hasattr(self.app, 'instance_cards'):
+            app = self.app
+            if not app or not hasattr(app, 'instance_cards'):
                 return
             
-            instances = self.app.instance_manager.get_instances()
-            status_map = {inst["name"]: inst["status"] for inst in instances}
+            changed = {new.name: new.status for old, new in delta.status_changes()}
+            if not changed:
+                return
             
-            for card in self.app.instance_cards:
+            for card in app.instance_cards:
                 if hasattr(card, 'name') and hasattr(card, 'update_status'):
-                    new_status = status_map.get(card.name)
+                    new_status = changed.get(card.name)
                     if new_status and new_status != card.status:
-                        self.app.after(0, lambda c=card, s=new_status: c.update_status(s))
+                        app.after(0, lambda c=card, s=new_status: c.update_status(s))
         except Exception as e:
             print(f"[ModuleManager] Card update error: {e}")
     
+    def _update_card_resources(self):
+        """Push latest telemetry samples into the GUI cards"""
+        app = self.app
+        telemetry = getattr(app.instance_manager, 'telemetry', None) if app else None
+        if not telemetry or not hasattr(app, 'instance_cards'):
+            return
+        
+        latest = telemetry.get_all_latest()
+        for card in app.instance_cards:
+            if hasattr(card, 'update_resource_usage') and getattr(card, 'name', None):
+                sample = latest.get(card.name)
+                cpu = sample.cpu_percent if sample else None
+                memory = sample.memory_mb if sample else None
+                app.after(0, lambda c=card, cu=cpu, m=memory: c.update_resource_usage(cu, m))
+    
     def trigger_auto_startup_for_instance(self, instance_name: str):
         """Trigger auto-startup when instance starts"""
         if not self.initialization_complete:
@@ -209,8 +293,30 @@ class ModuleManager:
         print(f"[ModuleManager] 🎯 Auto-startup triggered for {instance_name}")
         self.app.add_console_message(f"🔍 Triggering modules for {instance_name}...")
         
-        # Start AutoStart after a delay to ensure instance is fully ready
-        self.app.after(8000, lambda: self._start_autostart(instance_name))
+        # Start AutoStart as soon as Android reports booted - polled adaptively, learned per instance
+        waiter = load_time_model.waiter(instance_name, "boot", min_interval=0.5, max_interval=3.0)
+        self._wait_for_instance_ready(instance_name, waiter)
+    
+    def _wait_for_instance_ready(self, instance_name: str, waiter, timeout: float = 180):
+        """Wait until Running - the status loop's cache is only refreshed every 10s, so waiters share
+        one listvms per second between them and read the cached status"""
+        instance_manager = self.app.instance_manager
+        
+        def is_running():
+            instance_manager.refresh_statuses(max_age=1.0)
+            instance = instance_manager.get_instance(instance_name)
+            return bool(instance and instance["status"] == "Running")
+        
+        def wait_worker():
+            if waiter.wait_until(is_running, timeout):
+                print(f"[ModuleManager] ✅ {instance_name} ready after {waiter.elapsed():.1f}s")
+                self.app.after(0, lambda: self._start_autostart(instance_name))
+                return
+            instance = instance_manager.get_instance(instance_name)
+            print(f"[ModuleManager] Instance {instance_name} not ready after {timeout:.0f}s "
+                  f"(status: {instance.get('status', 'Unknown') if instance else 'Not found'})")
+        
+        threading.Thread(target=wait_worker, daemon=True, name=f"BootWait-{instance_name}").start()
     
     def _start_autostart(self, instance_name: str):
         """Start AutoStart module"""
@@ -268,9 +374,11 @@ class ModuleManager:
                     print(f"[ModuleManager] 📅 Scheduling AutoGather start despite AutoStart failure")
                     self.app.after(5000, lambda: self._start_autogather(instance_name))
             
+            # Fleet orchestrator caps concurrent AutoStarts and shares a capture budget
             max_retries = settings.get("autostart_game", {}).get("max_retries", 3)
-            success = autostart_module.start_auto_game(
-                instance_name=instance_name,
+            success = self.autostart_orchestrator.enqueue(
+                instance_name,
+                autostart_module,
                 max_retries=max_retries,
                 on_complete=on_complete
             )
@@ -284,6 +392,31 @@ class ModuleManager:
         except Exception as e:
             print(f"[ModuleManager] ❌ Execute AutoStart error: {e}")
     
+    def start_fleet_autostart(self, instance_names=None) -> int:
+        """Bring up many instances as one managed AutoStart operation - returns number triggered"""
+        names = instance_names or [inst["name"] for inst in self._managed_instances()]
+        for name in names:
+            self.trigger_auto_startup_for_instance(name)
+        self.app.add_console_message(f"🚀 Fleet AutoStart for {len(names)} instances "
+                                     f"(max {self.autostart_orchestrator.max_concurrent} at once)")
+        return len(names)
+    
+    def get_autostart_progress(self) -> Dict:
+        return {
+            "progress": self.autostart_orchestrator.get_progress(),
+            "instances": self.autostart_orchestrator.get_outcomes()
+        }
+    
+    def _on_autostart_progress(self, progress: Dict):
+        """Console summary each time a fleet AutoStart run finishes"""
+        done = progress["success"] + progress["failed"]
+        if done == self._last_autostart_done:
+            return
+        self._last_autostart_done = done
+        self.app.add_console_message(
+            f"📊 AutoStart fleet: {done}/{progress['total']} done ({progress['success']} ok, "
+            f"{progress['failed']} failed), {progress['running']} running, {progress['queued']} queued")
+    
     def _start_autogather(self, instance_name: str):
         """Auto-start AutoGather after AutoStart completes or independently"""
         try:
@@ -354,6 +487,13 @@ class ModuleManager:
                 except Exception as e:
                     print(f"[ModuleManager] Error stopping {module_name}: {e}")
             
+            # Drop queued work that can no longer run
+            self.autostart_orchestrator.cancel(instance_name)
+            if self.scheduler:
+                dropped = self.scheduler.work_queue.cancel_instance(instance_name)
+                if dropped:
+                    print(f"[ModuleManager] Dropped {dropped} queued tasks for {instance_name}")
+            
             # Clear completion tracking
             self.autostart_completed.pop(instance_name, None)
             print(f"[ModuleManager] ✅ Cleanup completed for {instance_name}")
@@ -365,7 +505,7 @@ class ModuleManager:
         """Refresh modules when instances change"""
         try:
             print("[ModuleManager] 🔄 Refreshing modules...")
-            current_instances = self.app.instance_manager.get_instances()
+            current_instances = self._managed_instances()
             current_names = [inst["name"] for inst in current_instances]
             
             # Remove modules for deleted instances
@@ -378,67 +518,40 @@ class ModuleManager:
                     self.running_modules.pop(instance_name, None)
             
             # Add modules for new instances
-            for instance in current_instances:
-                if instance["name"] not in self.instance_modules:
-                    print(f"[ModuleManager] Creating modules for new instance: {instance['name']}")
-                    try:
-                        from modules.autostart_game import AutoStartGameModule
-                        try:
-                            from modules.auto_gather import AutoGather
-                            AutoGatherModule = AutoGather
-                        except ImportError:
-                            AutoGatherModule = None
-                        
-                        # Re-initialize dependencies for new instances
-                        ocr_instance = None
-                        adb_utils_instance = None
-                        
-                        if AutoGatherModule:
-                            try:
-                                from paddleocr import PaddleOCR
-                                import inspect
-                                
-                                # Robust PaddleOCR initialization for refresh
-                                ocr_init_params = inspect.signature(PaddleOCR.__init__).parameters
-                                init_kwargs = {'use_angle_cls': True, 'lang': 'en'}
-                                
-                                if 'show_log' in ocr_init_params:
-                                    init_kwargs['show_log'] = False
-                                if 'use_gpu' in ocr_init_params:
-                                    init_kwargs['use_gpu'] = False
-                                
-                                ocr_instance = PaddleOCR(**init_kwargs)
-                                adb_utils_instance = ADBUtils()
-                                print("[ModuleManager] ✅ PaddleOCR reinitialized for new instance")
-                            except Exception as e:
-                                print(f"[ModuleManager] ❌ Failed to reinitialize dependencies: {e}")
-                                AutoGatherModule = None
-                        
-                        self._create_instance_modules(
-                            instance["name"], 
-                            AutoStartGameModule, 
-                            AutoGatherModule,
-                            ocr_instance,
-                            adb_utils_instance
-                        )
-                    except Exception as e:
-                        print(f"[ModuleManager] ❌ Failed to create modules: {e}")
+            new_names = [name for name in current_names if name not in self.instance_modules]
+            if new_names:
+                print(f"[ModuleManager] Creating modules for new instances: {', '.join(new_names)}")
+                self._create_modules_parallel(new_names)
             
             print("[ModuleManager] ✅ Module refresh completed")
             
         except Exception as e:
             print(f"[ModuleManager] ❌ Refresh error: {e}")
     
+    def _on_settings_changed(self, instance_names):
+        """Profile/settings change - push it to the affected instances' modules"""
+        for instance_name in instance_names:
+            if instance_name in self.instance_modules:
+                self.reload_instance_settings(instance_name)
+    
     def reload_instance_settings(self, instance_name: str):
         """Reload settings when changed - FIXED VERSION"""
         try:
             print(f"[ModuleManager] 🔄 Reloading settings for {instance_name}")
             
-            # Load fresh settings from file
+            # Fresh settings from the store
             old_settings = self.settings_cache.get(instance_name, {})
             new_settings = self._load_settings(instance_name)
             self.settings_cache[instance_name] = new_settings
             
+            # Running modules take changed sections at their next cycle - no stop/start
+            for module_name, module in self.instance_modules.get(instance_name, {}).items():
+                section = MODULE_SETTINGS_SECTIONS.get(module_name)
+                if (section and hasattr(module, "apply_settings") and
+                        old_settings.get(section) != new_settings.get(section)):
+                    module.apply_settings(new_settings.get(section, {}))
+                    print(f"[ModuleManager] 🔧 {module_name} settings queued for {instance_name}")
+            
             # Update AutoGather module settings if it exists and settings changed
             if (instance_name in self.instance_modules and 
                 "AutoGather" in self.instance_modules[instance_name]):
@@ -451,7 +564,7 @@ class ModuleManager:
                 
                 if old_gather != new_gather:
                     print(f"[ModuleManager] AutoGather settings changed for {instance_name}")
-                    if hasattr(autogather_module, 'update_settings'):
+                    if not hasattr(autogather_module, 'apply_settings') and hasattr(autogather_module, 'update_settings'):
                         try:
                             autogather_module.update_settings(new_gather)
                             print(f"[ModuleManager] ✅ AutoGather settings updated for {instance_name}")
@@ -489,6 +602,12 @@ class ModuleManager:
         print("[ModuleManager] 🛑 Stopping all modules...")
         for instance_name in list(self.instance_modules.keys()):
             self.cleanup_for_stopped_instance(instance_name)
+        self.autostart_orchestrator.shutdown()
+        if self.scheduler:
+            self.scheduler.shutdown()
+        self.profiles.unsubscribe(self._on_settings_changed)
+        settings_store.stop_watching()
+        settings_store.flush()
         print("[ModuleManager] ✅ All modules stopped")
     
     def get_module_status(self, instance_name: str) -> Dict:
@@ -510,7 +629,9 @@ class ModuleManager:
                     'available': True,
                     'running': is_running,
                     'can_start': has_start_method,
-                    'can_stop': has_stop_method
+                    'can_stop': has_stop_method,
+                    'metrics': metrics.get_summary(module=getattr(module, 'module_name', module_name),
+                                                   instance=instance_name)
                 }
             
             return status
@@ -575,63 +696,29 @@ class ModuleManager:
         print(f"[ModuleManager] ✅ Marked AutoStart completed for {instance_name}")
     
     def _load_settings(self, instance_name: str) -> Dict:
-        """Load settings for instance"""
-        settings_file = f"settings_{instance_name}.json"
-        defaults = {
-            "autostart_game": {
-                "auto_startup": False, 
-                "max_retries": 3, 
-                "enabled": True,
-                "retry_delay": 10
-            },
-            "auto_gather": {
-                "enabled": True, 
-                "check_interval": 60,
-                "resource_types": ["food", "wood", "iron", "stone"],
-                "resource_loop": ["food", "wood", "iron", "stone"],
-                "max_queues": 6,
-                "max_concurrent_gathers": 5
-            },
-            "march_assignment": {
-                "enabled": True,
-                "unlocked_queues": 2,
-                "queue_assignments": {"1": "AutoGather", "2": "AutoGather"}
-            }
-        }
-        
+        """Load settings for instance - defaults, profile chain and instance overrides resolved"""
         try:
-            if os.path.exists(settings_file):
-                with open(settings_file, 'r') as f:
-                    settings = json.load(f)
-                    
-                # Merge with defaults to ensure all keys exist
-                for key, value in defaults.items():
-                    if key not in settings:
-                        settings[key] = value
-                    else:
-                        for subkey, subvalue in value.items():
-                            if subkey not in settings[key]:
-                                settings[key][subkey] = subvalue
-                                
-                return settings
+            return self.profiles.resolve(instance_name)
         except Exception as e:
             print(f"[ModuleManager] Settings load error for {instance_name}: {e}")
         
-        return defaults
+        return copy.deepcopy(DEFAULT_SETTINGS)
 
 
 class ADBUtils:
     """Simple ADB utilities class for AutoGather"""
     
-    def __init__(self):
-        self.MEMUC_PATH = r"C:\Program Files\Microvirt\MEmu\memuc.exe"
+    def __init__(self, backend=None):
+        if backend is None:
+            from core.memu_backend import create_backend
+            backend = create_backend()
+        self.backend = backend
+        self.MEMUC_PATH = backend.memuc_path
     
     def run_adb_command(self, instance_index: int, command: str) -> str:
         """Run ADB command and return output"""
         try:
-            import subprocess
-            cmd = [self.MEMUC_PATH, "adb", "-i", str(instance_index), "shell"] + command.split()
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+            result = self.backend.shell(instance_index, command.split(), timeout=10)
             if result.returncode == 0:
                 return result.stdout.strip()
             return None
@@ -641,9 +728,7 @@ class ADBUtils:
     def run_adb_command_raw(self, instance_index: int, command: str) -> str:
         """Run raw ADB command"""
         try:
-            import subprocess
-            cmd = [self.MEMUC_PATH, "adb", "-i", str(instance_index)] + command.split()
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=15)
+            result = self.backend.adb(instance_index, command.split(), timeout=15)
             if result.returncode == 0:
                 return result.stdout.strip()
             return None
@@ -653,9 +738,7 @@ class ADBUtils:
     def get_screenshot_data(self, instance_index: int) -> bytes:
         """Get screenshot data as bytes"""
         try:
-            import subprocess
-            cmd = [self.MEMUC_PATH, "adb", "-i", str(instance_index), "shell", "screencap", "-p"]
-            result = subprocess.run(cmd, capture_output=True, timeout=15)
+            result = self.backend.shell(instance_index, ["screencap", "-p"], timeout=15, text=False)
             if result.returncode == 0:
                 return result.stdout
             return None
@@ -0,0 +1,417 @@
+"""
+BENSON v2.0 - Module Worker Processes
+Optional isolation mode: instances are split into shards and each shard's
+modules run in their own process (own InstanceManager, ModuleManager and
+GIL), so heavy OCR or a hung ADB call in one shard can't stall the GUI or
+the other shards. The GUI keeps a ProcessModuleManager that forwards calls
+over multiprocessing queues and restarts workers that die or go silent.
+
+Enable with BENSON_MODULE_PROCESSES=<count>, or "auto" for one per CPU core
+(never more than one per instance). Per-process limits such as
+BENSON_AUTOSTART_CONCURRENCY then apply to each shard.
+"""
+
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, List, Optional
+
+from utils.metrics import metrics
+from utils.module_manager import ModuleManager
+from utils.settings_profiles import get_profiles
+from utils.settings_store import settings_store
+
+
+def assign_shards(instance_names: Iterable[str], shard_count: int,
+                  current: Dict[str, int] = None) -> Dict[str, int]:
+    """Instance -> shard; existing assignments are kept, new instances go to the least loaded shard"""
+    names = sorted(set(instance_names))
+    assignments = {name: shard for name, shard in (current or {}).items()
+                   if name in names and shard < shard_count}
+    load = [0] * shard_count
+    for shard in assignments.values():
+        load[shard] += 1
+    for name in names:
+        if name not in assignments:
+            shard = load.index(min(load))
+            assignments[name] = shard
+            load[shard] += 1
+    return assignments
+
+
+def configured_process_count(instance_count: int) -> int:
+    """Worker processes requested by BENSON_MODULE_PROCESSES - 0 means run modules in-process"""
+    value = os.environ.get("BENSON_MODULE_PROCESSES", "0").strip().lower()
+    if value == "auto":
+        count = os.cpu_count() or 1
+    else:
+        try:
+            count = int(value)
+        except ValueError:
+            print(f"[ModuleWorkers] ⚠️ Invalid BENSON_MODULE_PROCESSES={value!r}, running in-process")
+            return 0
+    return max(0, min(count, max(1, instance_count)))
+
+
+def _shard_metrics_file(shard_id: int):
+    """Each worker exports its own metrics file instead of overwriting the shared one"""
+    path = os.environ.get("BENSON_METRICS_FILE")
+    if path:
+        root, ext = os.path.splitext(path)
+        os.environ["BENSON_METRICS_FILE"] = f"{root}.shard{shard_id}{ext}"
+
+
+def _worker_main(shard_id: int, instance_names: List[str], commands, events, status_interval: float):
+    """Worker process entry point - runs one shard's modules without a GUI"""
+    from core.headless_app import HeadlessApp
+    from core.instance_manager import InstanceManager
+
+    _shard_metrics_file(shard_id)
+    assigned = set(instance_names)
+    try:
+        instance_manager = InstanceManager()
+        instance_manager.load_real_instances(log_result=False)
+        app = HeadlessApp(instance_manager,
+                          console_callback=lambda message: events.put(("console", shard_id, message)))
+        manager = ModuleManager(app, instance_filter=lambda name: name in assigned)
+        app.module_manager = manager
+    except Exception as e:
+        events.put(("failed", shard_id, f"{type(e).__name__}: {e}"))
+        return
+
+    events.put(("ready", shard_id, sorted(manager.instance_modules)))
+    next_status = 0.0
+
+    while True:
+        if time.time() >= next_status:
+            # Doubles as the heartbeat the GUI process watches
+            events.put(("status", shard_id, {
+                "modules": {name: manager.get_module_status(name) for name in list(manager.instance_modules)},
+                "autostart": manager.autostart_orchestrator.get_progress()
+            }))
+            next_status = time.time() + status_interval
+        try:
+            command = commands.get(timeout=max(0.1, next_status - time.time()))
+        except queue.Empty:
+            parent = multiprocessing.parent_process()
+            if parent is not None and not parent.is_alive():
+                # GUI process is gone - don't keep driving instances unattended
+                break
+            continue
+
+        if command[0] == "shutdown":
+            break
+        if command[0] == "assign":
+            assigned.clear()
+            assigned.update(command[1])
+            # Instances just created/cloned in the GUI aren't in our listvms cache until the next poll
+            instance_manager.load_real_instances(force_refresh=True, log_result=False)
+            manager.refresh_modules()
+            continue
+
+        _, call_id, method, args = command
+        try:
+            if method == "reload_instance_settings":
+                # Written by the GUI process - read it now instead of at the next watch poll. Reloaded
+                # documents reach the modules through the profile subscription, so no second reload here.
+                settings_store.check_external_changes()
+                reply = ("result", call_id, (True, None))
+            else:
+                reply = ("result", call_id, (True, getattr(manager, method)(*args)))
+        except Exception as e:
+            reply = ("result", call_id, (False, f"{type(e).__name__}: {e}"))
+        if call_id is not None:
+            events.put(reply)
+
+    app.destroy()
+
+
+class ProcessModuleManager(ModuleManager):
+    """ModuleManager interface for the GUI process - the modules themselves run in worker processes"""
+
+    def __init__(self, app_ref, processes: int, status_interval: float = 5.0, hang_timeout: float = 120.0,
+                 instance_filter: Callable[[str], bool] = None):
+        # ModuleManager.__init__ is not called - no modules are created in this process
+        self.app = app_ref
+        self.instance_filter = instance_filter
+        self.instance_modules = {}
+        self.running_modules = {}
+        self.settings_cache = {}
+        self.initialization_complete = False
+
+        self.process_count = processes
+        self.status_interval = status_interval
+        self.hang_timeout = hang_timeout
+        self.context = multiprocessing.get_context("spawn")
+        self.events = self.context.Queue()
+        self.workers: Dict[int, Dict] = {}
+        self.status_cache: Dict[str, Dict] = {}
+        self.autostart_progress: Dict[int, Dict] = {}
+        self.pending_calls: Dict[int, Future] = {}
+        self.call_ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.shutting_down = False
+
+        names = [instance["name"] for instance in self._managed_instances()]
+        self.assignments = assign_shards(names, processes)
+        print(f"[ModuleWorkers] Starting {processes} module worker processes for {len(names)} instances")
+        for shard in range(processes):
+            self._start_worker(shard)
+
+        threading.Thread(target=self._event_loop, daemon=True, name="WorkerEvents").start()
+        threading.Thread(target=self._monitor_loop, daemon=True, name="WorkerMonitor").start()
+
+        # GUI edits reach the workers right away instead of at their next settings poll
+        self.profiles = get_profiles()
+        self.profiles.subscribe(self._on_settings_changed)
+        self._start_status_loop()
+
+    # Workers
+    def _shard_names(self, shard: int) -> List[str]:
+        return sorted(name for name, assigned in self.assignments.items() if assigned == shard)
+
+    def _start_worker(self, shard: int):
+        commands = self.context.Queue()
+        process = self.context.Process(
+            target=_worker_main,
+            args=(shard, self._shard_names(shard), commands, self.events, self.status_interval),
+            daemon=True, name=f"BensonModules-{shard}")
+        process.start()
+        previous = self.workers.get(shard, {})
+        with self.lock:
+            self.workers[shard] = {
+                "process": process,
+                "commands": commands,
+                "started_at": time.time(),
+                "last_seen": time.time(),
+                "ready": False,
+                "failed": None,
+                "restarts": previous.get("restarts", -1) + 1
+            }
+        print(f"[ModuleWorkers] Worker {shard} started (pid {process.pid}, {len(self._shard_names(shard))} instances)")
+
+    def _restart_worker(self, shard: int, reason: str):
+        worker = self.workers[shard]
+        print(f"[ModuleWorkers] ⚠️ Worker {shard} {reason} - restarting")
+        if self.app:
+            self.app.add_console_message(f"⚠️ Module worker {shard} {reason} - restarting its instances")
+        if worker["process"].is_alive():
+            worker["process"].terminate()
+            worker["process"].join(5)
+        metrics.increment("module_worker_restarts_total", shard=str(shard))
+        self._start_worker(shard)
+
+    def _monitor_loop(self):
+        """Restart workers that exited or stopped sending status"""
+        while not self.shutting_down:
+            time.sleep(self.status_interval)
+            for shard, worker in list(self.workers.items()):
+                if self.shutting_down:
+                    return
+                # Back off a worker that keeps failing at startup
+                backoff = min(60.0, self.status_interval * 2 ** worker["restarts"])
+                if not worker["process"].is_alive():
+                    if time.time() - worker["started_at"] >= backoff:
+                        self._restart_worker(shard, f"exited (code {worker['process'].exitcode})")
+                elif worker["ready"] and time.time() - worker["last_seen"] > self.hang_timeout:
+                    self._restart_worker(shard, f"silent for {self.hang_timeout:.0f}s")
+
+    def _event_loop(self):
+        while True:
+            try:
+                kind, key, payload = self.events.get(timeout=1)
+            except queue.Empty:
+                if self.shutting_down:
+                    return
+                continue
+            except (EOFError, OSError):
+                return
+
+            try:
+                if kind == "result":
+                    self._resolve_call(key, *payload)
+                    continue
+
+                worker = self.workers.get(key)
+                if worker:
+                    worker["last_seen"] = time.time()
+                if kind == "console":
+                    if self.app:
+                        self.app.add_console_message(payload)
+                elif kind == "status":
+                    self.status_cache.update(payload["modules"])
+                    self.autostart_progress[key] = payload["autostart"]
+                elif kind in ("ready", "failed"):
+                    if worker:
+                        worker["ready"] = kind == "ready"
+                        worker["failed"] = payload if kind == "failed" else None
+                    if kind == "ready":
+                        print(f"[ModuleWorkers] ✅ Worker {key} ready with {len(payload)} instances")
+                    else:
+                        print(f"[ModuleWorkers] ❌ Worker {key} failed to start: {payload}")
+                    self._check_initialized()
+            except Exception as e:
+                print(f"[ModuleWorkers] Event error ({kind}): {e}")
+
+    def _check_initialized(self):
+        if self.initialization_complete:
+            return
+        if all(worker["ready"] or worker["failed"] for worker in self.workers.values()):
+            self.initialization_complete = True
+            ready = sum(1 for worker in self.workers.values() if worker["ready"])
+            if self.app:
+                self.app.add_console_message(f"✅ Module system ready in {ready}/{len(self.workers)} worker processes")
+
+    # Calls into workers
+    def _shard_of(self, instance_name: str) -> Optional[int]:
+        shard = self.assignments.get(instance_name)
+        if shard is None:
+            print(f"[ModuleWorkers] ⚠️ {instance_name} is not assigned to a worker - refresh modules first")
+        return shard
+
+    def _call(self, shard: Optional[int], method: str, *args, wait: bool = False, timeout: float = 10):
+        """Send a ModuleManager call to a worker; with wait=True block for its result"""
+        worker = self.workers.get(shard) if shard is not None else None
+        if not worker:
+            return None
+        if not wait:
+            worker["commands"].put(("call", None, method, args))
+            return None
+        
+        call_id = next(self.call_ids)
+        future = Future()
+        self.pending_calls[call_id] = future
+        worker["commands"].put(("call", call_id, method, args))
+        try:
+            return future.result(timeout)
+        finally:
+            self.pending_calls.pop(call_id, None)
+
+    def _resolve_call(self, call_id: int, ok: bool, result):
+        future = self.pending_calls.pop(call_id, None)
+        if future:
+            if ok:
+                future.set_result(result)
+            else:
+                future.set_exception(RuntimeError(result))
+
+    def _call_instance(self, instance_name: str, method: str, wait: bool = False, default=None):
+        try:
+            result = self._call(self._shard_of(instance_name), method, instance_name, wait=wait)
+            return default if result is None else result
+        except Exception as e:
+            print(f"[ModuleWorkers] ❌ {method} failed for {instance_name}: {e}")
+            return default
+
+    # ModuleManager interface
+    def trigger_auto_startup_for_instance(self, instance_name: str):
+        if not self.initialization_complete:
+            print(f"[ModuleManager] ⚠️ Module system not ready for {instance_name}")
+            return
+        self._call_instance(instance_name, "trigger_auto_startup_for_instance")
+
+    def cleanup_for_stopped_instance(self, instance_name: str):
+        self._call_instance(instance_name, "cleanup_for_stopped_instance")
+
+    def reload_instance_settings(self, instance_name: str):
+        settings_store.flush()
+        self._call_instance(instance_name, "reload_instance_settings")
+
+    def _on_settings_changed(self, instance_names):
+        settings_store.flush()
+        for instance_name in instance_names:
+            if instance_name in self.assignments:
+                self._call(self.assignments[instance_name], "reload_instance_settings", instance_name)
+
+    def refresh_modules(self):
+        """Assign new instances to the least loaded workers and drop deleted ones"""
+        try:
+            names = [instance["name"] for instance in self._managed_instances()]
+            previous = {shard: self._shard_names(shard) for shard in self.workers}
+            self.assignments = assign_shards(names, self.process_count, self.assignments)
+            for shard, worker in self.workers.items():
+                shard_names = self._shard_names(shard)
+                if shard_names != previous.get(shard):
+                    worker["commands"].put(("assign", shard_names))
+            print("[ModuleManager] ✅ Module refresh sent to workers")
+        except Exception as e:
+            print(f"[ModuleManager] ❌ Refresh error: {e}")
+
+    def start_fleet_autostart(self, instance_names=None) -> int:
+        names = instance_names or list(self.assignments)
+        for shard in self.workers:
+            shard_names = [name for name in names if self.assignments.get(name) == shard]
+            if shard_names:
+                self._call(shard, "start_fleet_autostart", shard_names)
+        return len(names)
+
+    def get_autostart_progress(self) -> Dict:
+        """Fleet AutoStart counts summed over the workers' last status reports"""
+        totals = {}
+        for progress in list(self.autostart_progress.values()):
+            for key, value in progress.items():
+                if isinstance(value, int):
+                    totals[key] = totals.get(key, 0) + value
+        return {"progress": totals, "instances": {}}
+
+    def get_module_status(self, instance_name: str) -> Dict:
+        status = self._call_instance(instance_name, "get_module_status", wait=True)
+        if status is None:
+            # Worker busy or restarting - last reported status
+            return self.status_cache.get(instance_name, {})
+        self.status_cache[instance_name] = status
+        return status
+
+    def manual_start_autogather(self, instance_name: str):
+        self._call_instance(instance_name, "manual_start_autogather")
+
+    def manual_stop_autogather(self, instance_name: str):
+        return self._call_instance(instance_name, "manual_stop_autogather", wait=True, default=False)
+
+    def get_autogather_settings(self, instance_name: str) -> Dict:
+        return self._call_instance(instance_name, "get_autogather_settings", wait=True, default={})
+
+    def get_worker_status(self) -> List[Dict]:
+        return [{
+            "shard": shard,
+            "pid": worker["process"].pid,
+            "alive": worker["process"].is_alive(),
+            "ready": worker["ready"],
+            "failed": worker["failed"],
+            "instances": self._shard_names(shard),
+            "restarts": worker["restarts"],
+            "last_seen_seconds": round(time.time() - worker["last_seen"], 1)
+        } for shard, worker in sorted(self.workers.items())]
+
+    def stop_all_modules(self):
+        print("[ModuleManager] 🛑 Stopping module worker processes...")
+        self.shutting_down = True
+        self.profiles.unsubscribe(self._on_settings_changed)
+        for worker in self.workers.values():
+            try:
+                worker["commands"].put(("shutdown",))
+            except Exception:
+                pass
+        for shard, worker in self.workers.items():
+            worker["process"].join(15)
+            if worker["process"].is_alive():
+                print(f"[ModuleWorkers] ⚠️ Worker {shard} did not stop - terminating")
+                worker["process"].terminate()
+        settings_store.flush()
+        print("[ModuleManager] ✅ All modules stopped")
+
+
+def create_module_manager(app_ref, instance_filter: Callable[[str], bool] = None) -> ModuleManager:
+    """In-process ModuleManager, or worker processes when BENSON_MODULE_PROCESSES is set"""
+    processes = configured_process_count(len(app_ref.instance_manager.get_instances()))
+    if processes > 0:
+        return ProcessModuleManager(
+            app_ref, processes,
+            status_interval=float(os.environ.get("BENSON_WORKER_STATUS_INTERVAL", "5")),
+            hang_timeout=float(os.environ.get("BENSON_WORKER_HANG_TIMEOUT", "120")),
+            instance_filter=instance_filter)
+    return ModuleManager(app_ref, instance_filter=instance_filter)
@@ -0,0 +1,148 @@
+"""
+BENSON v2.0 - Attached GUI Module Manager
+With BENSON_ATTACH=<daemon url> the GUI runs no modules itself: module
+calls go to a headless daemon over its control API and the daemon's
+console is mirrored into the GUI console. Closing the GUI leaves the
+daemon's automation running.
+"""
+
+import os
+import threading
+import time
+from typing import Dict
+
+from utils.control_api import ControlAPIError, ControlClient
+from utils.module_manager import ModuleManager
+from utils.settings_profiles import get_profiles
+from utils.settings_store import settings_store
+
+
+class RemoteModuleManager(ModuleManager):
+    """ModuleManager interface backed by a daemon's control API"""
+
+    def __init__(self, app_ref, url: str, token: str = None, poll_interval: float = 1.0):
+        # ModuleManager.__init__ is not called - the daemon owns the modules
+        self.app = app_ref
+        self.instance_filter = None
+        self.instance_modules = {}
+        self.running_modules = {}
+        self.settings_cache = {}
+        self.initialization_complete = False
+
+        self.client = ControlClient(url, token if token is not None else os.environ.get("BENSON_API_TOKEN"))
+        self.poll_interval = poll_interval
+        self.console_next = None
+        self.connected = False
+        self.detached = False
+
+        self._wait_for_daemon()
+        threading.Thread(target=self._console_loop, daemon=True, name="DaemonConsole").start()
+
+        self.profiles = get_profiles()
+        self.profiles.subscribe(self._on_settings_changed)
+        self._start_status_loop()
+
+    def _wait_for_daemon(self, timeout: float = 30):
+        """Block until the daemon answers and its modules are ready (or give up after timeout)"""
+        deadline = time.time() + timeout
+        last_error = None
+        while time.time() < deadline:
+            try:
+                status = self.client.get_status()
+                self.connected = True
+                self.console_next = status.get("console_sequence", 0)
+                if status.get("modules_ready"):
+                    self.initialization_complete = True
+                    print(f"[RemoteModules] ✅ Attached to daemon at {self.client.url} (pid {status.get('pid')})")
+                    self.app.add_console_message(f"🔗 Attached to BENSON daemon at {self.client.url}")
+                    return
+            except ControlAPIError as e:
+                self.connected = False
+                last_error = e
+            time.sleep(0.5)
+        if self.connected:
+            print("[RemoteModules] ⚠️ Daemon modules still initializing - continuing in the background")
+        else:
+            print(f"[RemoteModules] ❌ Daemon not reachable: {last_error}")
+
+    def _console_loop(self):
+        """Mirror daemon console messages into the GUI console, and track daemon readiness"""
+        while not self.detached and self.app:
+            try:
+                if self.console_next is None or not self.initialization_complete:
+                    status = self.client.get_status()
+                    if self.console_next is None:
+                        self.console_next = status.get("console_sequence", 0)
+                    self.initialization_complete = bool(status.get("modules_ready"))
+                result = self.client.get_console(self.console_next)
+                for message in result["messages"]:
+                    self.app.add_console_message(f"[daemon] {message}")
+                self.console_next = result["next"]
+                if not self.connected:
+                    self.connected = True
+                    self.app.add_console_message("🔗 Daemon connection restored")
+            except ControlAPIError as e:
+                if self.connected:
+                    self.connected = False
+                    print(f"[RemoteModules] ⚠️ Lost daemon connection: {e}")
+                    self.app.add_console_message("⚠️ Lost connection to BENSON daemon - retrying")
+            except Exception as e:
+                print(f"[RemoteModules] Console poll error: {e}")
+            time.sleep(self.poll_interval)
+
+    def _send(self, action: str, call, default=None):
+        try:
+            return call()
+        except ControlAPIError as e:
+            print(f"[RemoteModules] ❌ {action} failed: {e}")
+            return default
+
+    # ModuleManager interface
+    def trigger_auto_startup_for_instance(self, instance_name: str):
+        self._send("AutoStart", lambda: self.client.trigger_autostart(instance_name))
+
+    def cleanup_for_stopped_instance(self, instance_name: str):
+        self._send("Cleanup", lambda: self.client.cleanup_instance(instance_name))
+
+    def reload_instance_settings(self, instance_name: str):
+        settings_store.flush()
+        self._send("Settings reload", lambda: self.client.reload_settings(instance_name))
+
+    def _on_settings_changed(self, instance_names):
+        # Written locally - the daemon re-reads it from the shared files/database
+        settings_store.flush()
+        for instance_name in instance_names:
+            self._send("Settings reload", lambda name=instance_name: self.client.reload_settings(name))
+
+    def refresh_modules(self):
+        self._send("Module refresh", self.client.refresh_modules)
+
+    def start_fleet_autostart(self, instance_names=None) -> int:
+        result = self._send("Fleet AutoStart", lambda: self.client.fleet_autostart(instance_names), {})
+        return result.get("triggered", 0)
+
+    def get_autostart_progress(self) -> Dict:
+        return self._send("AutoStart progress", self.client.get_autostart_progress,
+                          {"progress": {}, "instances": {}})
+
+    def get_module_status(self, instance_name: str) -> Dict:
+        instance = self._send("Status", lambda: self.client.get_instance(instance_name), {})
+        return instance.get("modules", {})
+
+    def manual_start_autogather(self, instance_name: str):
+        self._send("AutoGather start", lambda: self.client.autogather(instance_name, "start"))
+
+    def manual_stop_autogather(self, instance_name: str):
+        result = self._send("AutoGather stop", lambda: self.client.autogather(instance_name, "stop"), {})
+        return result.get("stopped", False)
+
+    def get_autogather_settings(self, instance_name: str) -> Dict:
+        instance = self._send("Settings", lambda: self.client.get_instance(instance_name), {})
+        return instance.get("settings", {}).get("auto_gather", {})
+
+    def stop_all_modules(self):
+        """Detach only - the daemon keeps running its modules"""
+        self.detached = True
+        self.profiles.unsubscribe(self._on_settings_changed)
+        settings_store.flush()
+        print("[RemoteModules] Detached from daemon (modules keep running there)")
@@ -0,0 +1,280 @@
+"""
+BENSON v2.0 - Settings Profiles
+Instance settings resolved through an inheritance chain:
+
+    DEFAULT_SETTINGS -> "default" profile -> group profile(s) -> instance overrides
+
+Profiles are stored in the settings store (kind "profile"). The instance's
+own settings document holds its overrides plus {"profile": {"name": ...}}.
+Documents without that section predate profiles and hold full settings; they
+are migrated to overrides of the default profile the first time they're used.
+Resolved views are cached and invalidated when any layer changes, so a
+group-wide edit is one write to the group profile.
+"""
+
+import copy
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+from utils.settings_store import settings_store
+
+
+DEFAULT_SETTINGS = {
+    "autostart_game": {
+        "auto_startup": False,
+        "max_retries": 3,
+        "enabled": True,
+        "retry_delay": 10,
+        "confidence_threshold": 0.8,
+        "close_button_confidence": 0.75,
+        "world_confidence": 0.8,
+        "game_load_timeout": 90
+    },
+    "auto_gather": {
+        "enabled": True,
+        "check_interval": 60,
+        "resource_types": ["food", "wood", "iron", "stone"],
+        "resource_loop": ["food", "wood", "iron", "stone"],
+        "max_queues": 6,
+        "max_concurrent_gathers": 5
+    },
+    "march_assignment": {
+        "enabled": True,
+        "unlocked_queues": 2,
+        "queue_assignments": {"1": "AutoGather", "2": "AutoGather"}
+    }
+}
+
+DEFAULT_PROFILE = "default"
+# Keys of a profile document that are metadata, not settings
+PROFILE_META_KEYS = ("inherits", "description")
+# Section of an instance's settings naming its profile
+PROFILE_SECTION = "profile"
+
+
+def deep_merge(base: Dict, overrides: Dict) -> Dict:
+    """New dict with overrides applied on top of base - dicts merge, everything else replaces"""
+    merged = copy.deepcopy(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = deep_merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def diff_settings(settings: Dict, base: Dict) -> Dict:
+    """Keys of settings that differ from base, section by section - what an instance must override"""
+    missing = object()
+    overrides = {}
+    for key, value in settings.items():
+        if key == PROFILE_SECTION:
+            overrides[key] = copy.deepcopy(value)
+        elif isinstance(value, dict) and isinstance(base.get(key), dict):
+            section = {k: copy.deepcopy(v) for k, v in value.items() if base[key].get(k, missing) != v}
+            if section:
+                overrides[key] = section
+        elif base.get(key, missing) != value:
+            overrides[key] = copy.deepcopy(value)
+    return overrides
+
+
+class ProfileManager:
+    """Named settings profiles with inheritance and a cache of resolved instance settings"""
+
+    def __init__(self, store=None):
+        self.store = store or settings_store
+        self.cache: Dict[str, Dict] = {}
+        self.lock = threading.RLock()
+        self.listeners: List[Callable[[List[str]], None]] = []
+        self.store.subscribe(self._on_store_change)
+
+    # Profiles
+    def list_profiles(self) -> List[str]:
+        with self.store.lock:
+            names = {name for (kind, name) in self.store.documents if kind == "profile"}
+        names.add(DEFAULT_PROFILE)
+        return sorted(names)
+
+    def get_profile(self, name: str) -> Dict:
+        return self.store.get(name, kind="profile")
+
+    def save_profile(self, name: str, settings: Dict, inherits: Optional[str] = DEFAULT_PROFILE,
+                     description: str = ""):
+        """Create or replace a profile; inherits is the parent profile (None for the default profile)"""
+        document = copy.deepcopy(settings)
+        if name != DEFAULT_PROFILE and inherits:
+            if name in self._chain(inherits):
+                raise ValueError(f"Profile '{name}' cannot inherit from '{inherits}' (cycle)")
+            document["inherits"] = inherits
+        if description:
+            document["description"] = description
+        self.store.set(name, document, kind="profile")
+
+    def update_profile(self, name: str, section: str, values: Dict):
+        """Change one section for every instance using the profile - a single write"""
+        self.store.update(name, section, values, kind="profile")
+
+    def delete_profile(self, name: str) -> List[str]:
+        """Remove a profile; its instances fall back to its parent. Returns the affected instances."""
+        if name == DEFAULT_PROFILE:
+            raise ValueError("The default profile cannot be deleted")
+        parent = self.get_profile(name).get("inherits", DEFAULT_PROFILE)
+        members = self.members(name)
+        if members:
+            self.assign(members, parent)
+        for child in self.list_profiles():
+            child_document = self.get_profile(child)
+            if child_document.get("inherits") == name:
+                child_document["inherits"] = parent
+                self.store.set(child, child_document, kind="profile")
+        self.store.delete(name, kind="profile")
+        return members
+
+    def _chain(self, name: Optional[str]) -> List[str]:
+        """Profile names from the given one up to the default profile"""
+        chain = []
+        while name and name not in chain:
+            chain.append(name)
+            if name == DEFAULT_PROFILE:
+                break
+            name = self.get_profile(name).get("inherits", DEFAULT_PROFILE)
+        return chain
+
+    def resolve_profile(self, name: str) -> Dict:
+        """Flattened settings of a profile including everything it inherits"""
+        resolved = copy.deepcopy(DEFAULT_SETTINGS)
+        for profile_name in reversed(self._chain(name)):
+            layer = {k: v for k, v in self.get_profile(profile_name).items() if k not in PROFILE_META_KEYS}
+            resolved = deep_merge(resolved, layer)
+        return resolved
+
+    # Instances
+    def profile_of(self, instance_name: str) -> str:
+        overrides = self.store.get(instance_name)
+        return overrides.get(PROFILE_SECTION, {}).get("name") or DEFAULT_PROFILE
+
+    def members(self, profile_name: str, instance_names: Iterable[str] = None) -> List[str]:
+        """Instances using a profile directly or through inheritance"""
+        if instance_names is None:
+            with self.store.lock:
+                instance_names = [name for (kind, name) in self.store.documents if kind == "settings"]
+        return [name for name in instance_names if profile_name in self._chain(self.profile_of(name))]
+
+    def assign(self, instance_names: Iterable[str], profile_name: str):
+        """Point many instances at a profile in one batched store update"""
+        instance_names = list(instance_names)
+        self._migrate_legacy(instance_names)
+        self.store.update_many(instance_names, PROFILE_SECTION, {"name": profile_name})
+
+    def _migrate_legacy(self, instance_names: Iterable[str], tag_new: bool = False):
+        """Turn pre-profile documents (full settings, no profile section) into overrides of the default
+        profile. Values equal to the built-in defaults the file was filled from, or to the inherited
+        profile value, are dropped so profile edits reach the instance. tag_new also names the profile
+        in documents that don't exist yet, so a partial write isn't mistaken for a legacy file later."""
+        migrated = {}
+        legacy = []
+        inherited = None
+        for name in instance_names:
+            document = self.store.get(name)
+            if not document and tag_new:
+                migrated[name] = {PROFILE_SECTION: {"name": DEFAULT_PROFILE}}
+                continue
+            if not document or PROFILE_SECTION in document:
+                continue
+            if inherited is None:
+                inherited = self.resolve_profile(DEFAULT_PROFILE)
+            overrides = diff_settings(diff_settings(document, DEFAULT_SETTINGS), inherited)
+            overrides[PROFILE_SECTION] = {"name": DEFAULT_PROFILE}
+            migrated[name] = overrides
+            legacy.append(name)
+
+        for name, overrides in migrated.items():
+            if name in legacy:
+                kept = sum(len(v) if isinstance(v, dict) else 1 for k, v in overrides.items() if k != PROFILE_SECTION)
+                print(f"[Profiles] Migrated legacy settings for {name} to {kept} overrides of '{DEFAULT_PROFILE}'")
+            self.store.set(name, overrides)
+
+    def resolve(self, instance_name: str) -> Dict:
+        """Instance settings with all profile layers applied (cached copy)"""
+        with self.lock:
+            cached = self.cache.get(instance_name)
+        if cached is None:
+            self._migrate_legacy([instance_name])
+            overrides = self.store.get(instance_name)
+            profile_name = overrides.get(PROFILE_SECTION, {}).get("name") or DEFAULT_PROFILE
+            cached = deep_merge(self.resolve_profile(profile_name), overrides)
+            cached.setdefault(PROFILE_SECTION, {"name": profile_name})
+            with self.lock:
+                self.cache[instance_name] = cached
+        return copy.deepcopy(cached)
+
+    def save_instance(self, instance_name: str, settings: Dict):
+        """Store full settings (e.g. from a dialog) as overrides of the instance's profile only"""
+        profile_name = settings.get(PROFILE_SECTION, {}).get("name") or self.profile_of(instance_name)
+        overrides = diff_settings(settings, self.resolve_profile(profile_name))
+        overrides[PROFILE_SECTION] = {"name": profile_name}
+        self.store.set(instance_name, overrides)
+    
+    def update_instance(self, instance_name: str, section: str, values: Dict):
+        """Override some values of one section for a single instance"""
+        self.bulk_apply([instance_name], section, values)
+
+    def bulk_apply(self, instance_names: Iterable[str], section: str, values: Dict):
+        """Per-instance overrides for many instances in one operation"""
+        instance_names = list(instance_names)
+        self._migrate_legacy(instance_names, tag_new=True)
+        self.store.update_many(instance_names, section, values)
+
+    def clear_overrides(self, instance_names: Iterable[str], section: str):
+        """Drop instance overrides of a section so the profile value applies again"""
+        instance_names = list(instance_names)
+        self._migrate_legacy(instance_names)
+        for name in instance_names:
+            document = self.store.get(name)
+            if section in document:
+                del document[section]
+                self.store.set(name, document)
+
+    # Change tracking
+    def subscribe(self, callback: Callable[[List[str]], None]):
+        """callback(instance_names) when the resolved settings of those instances may have changed"""
+        if callback not in self.listeners:
+            self.listeners.append(callback)
+
+    def unsubscribe(self, callback: Callable):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def _on_store_change(self, name: str, kind: str, document: Dict, previous: Dict):
+        if kind == "profile":
+            # Members are computed before clearing the cache, under the new profile graph
+            affected = self.members(name)
+            with self.lock:
+                self.cache.clear()
+        elif kind == "settings":
+            affected = [name]
+            with self.lock:
+                self.cache.pop(name, None)
+        else:
+            return
+
+        for callback in list(self.listeners):
+            try:
+                callback(affected)
+            except Exception as e:
+                print(f"[Profiles] Listener error: {e}")
+
+
+_profiles = None
+_profiles_lock = threading.Lock()
+
+
+def get_profiles() -> ProfileManager:
+    """Shared profile manager over the global settings store"""
+    global _profiles
+    if _profiles is None:
+        with _profiles_lock:
+            if _profiles is None:
+                _profiles = ProfileManager(settings_store)
+    return _profiles
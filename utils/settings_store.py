@@ -0,0 +1,402 @@
+"""
+BENSON v2.0 - Settings Store
+All instance settings (settings_{instance}.json, march_config_{instance}.json)
+held in memory, persisted with debounced atomic writes and pushed to
+subscribers when they change. With BENSON_DATABASE set the documents live in
+the SQLite database instead of JSON files. An optional watcher picks up edits
+made outside the store (hand-edited files, another process on the database).
+"""
+
+import atexit
+import copy
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Iterable, List
+
+from utils.database import get_database
+from utils.metrics import metrics
+
+
+# Document kind -> file name pattern
+FILE_PATTERNS = {
+    "settings": "settings_{instance}.json",
+    "march_config": "march_config_{instance}.json",
+    "profile": "profile_{instance}.json",
+}
+
+
+def merge_defaults(document: Dict, defaults: Dict) -> Dict:
+    """Fill missing sections and missing keys inside sections from defaults (two levels, like the dialogs)"""
+    for key, value in defaults.items():
+        if key not in document:
+            document[key] = copy.deepcopy(value)
+        elif isinstance(value, dict) and isinstance(document[key], dict):
+            for subkey, subvalue in value.items():
+                if subkey not in document[key]:
+                    document[key][subkey] = copy.deepcopy(subvalue)
+    return document
+
+
+class SettingsStore:
+    """Per-instance JSON documents cached in memory with a background writer"""
+
+    def __init__(self, directory: str = ".", debounce: float = 1.0, max_delay: float = 5.0, database=None):
+        self.directory = directory
+        self.database = database
+        self.debounce = debounce
+        self.max_delay = max_delay
+
+        self.documents: Dict[tuple, Dict] = {}
+        self.loaded_mtimes: Dict[tuple, float] = {}
+        self.dirty = set()
+        self.first_dirty_at = None
+        self.last_change_at = 0.0
+        self.subscribers: List[Callable] = []
+
+        self.lock = threading.RLock()
+        self.condition = threading.Condition(self.lock)
+        self.writer = None
+        self.shutdown_flag = False
+        self.watcher = None
+        self.watch_stop = threading.Event()
+        self.watch_since = 0.0
+        self.stats = {"reads": 0, "file_loads": 0, "file_writes": 0, "changes": 0, "external_reloads": 0}
+
+        atexit.register(self.flush)
+
+    # Paths
+    def path_for(self, instance_name: str, kind: str = "settings") -> str:
+        return os.path.join(self.directory, FILE_PATTERNS[kind].format(instance=instance_name))
+
+    # Loading
+    def _scan_directory(self, kinds: Iterable[str]) -> List[tuple]:
+        """(kind, instance) of every matching file in the directory"""
+        try:
+            entries = os.listdir(self.directory)
+        except OSError:
+            return []
+        found = []
+        for kind in kinds:
+            pattern = re.compile("^" + re.escape(FILE_PATTERNS[kind]).replace(re.escape("{instance}"), "(.+)") + "$")
+            found += [(kind, m.group(1)) for m in map(pattern.match, entries) if m]
+        return found
+
+    def preload(self, instance_names: Iterable[str] = None, kinds: Iterable[str] = None):
+        """Read every settings file once (all matching files in the directory if no names given)"""
+        kinds = list(kinds or FILE_PATTERNS)
+        started = time.time()
+        if self.database is not None:
+            # One query per kind instead of a file per instance
+            count = 0
+            for kind in kinds:
+                documents = self.database.load_documents(kind)
+                with self.lock:
+                    for name, document in documents.items():
+                        self.documents.setdefault((kind, name), document)
+                count += len(documents)
+            print(f"[SettingsStore] Preloaded {count} documents from database in {time.time() - started:.2f}s")
+            return
+        
+        if instance_names is None:
+            found = self._scan_directory(kinds)
+        else:
+            found = [(kind, name) for name in instance_names for kind in kinds]
+
+        for kind, name in found:
+            self._document(name, kind)
+        print(f"[SettingsStore] Preloaded {len(found)} documents in {time.time() - started:.2f}s")
+
+    def _document(self, instance_name: str, kind: str) -> Dict:
+        """Cached document, read from disk on first access"""
+        key = (kind, instance_name)
+        with self.lock:
+            document = self.documents.get(key)
+            if document is not None:
+                return document
+
+            document = {}
+            path = self.path_for(instance_name, kind)
+            try:
+                if self.database is not None:
+                    document = self.database.load_document(instance_name, kind) or {}
+                    self.stats["file_loads"] += 1
+                elif os.path.exists(path):
+                    with open(path, "r") as f:
+                        document = json.load(f)
+                    self.loaded_mtimes[key] = os.path.getmtime(path)
+                    self.stats["file_loads"] += 1
+            except Exception as e:
+                print(f"[SettingsStore] Error loading {path}: {e}")
+            self.documents[key] = document
+            return document
+
+    # Reads
+    def exists(self, instance_name: str, kind: str = "settings") -> bool:
+        return bool(self._document(instance_name, kind))
+
+    def get(self, instance_name: str, kind: str = "settings", defaults: Dict = None) -> Dict:
+        """Copy of an instance's document merged with defaults - safe to modify"""
+        with self.lock:
+            self.stats["reads"] += 1
+            document = copy.deepcopy(self._document(instance_name, kind))
+        return merge_defaults(document, defaults) if defaults else document
+
+    def get_section(self, instance_name: str, section: str, defaults: Dict = None) -> Dict:
+        return self.get(instance_name, defaults={section: defaults or {}}).get(section, {})
+
+    # Writes
+    def set(self, instance_name: str, document: Dict, kind: str = "settings"):
+        """Replace an instance's document"""
+        self._apply({instance_name: copy.deepcopy(document)}, kind)
+
+    def update(self, instance_name: str, section: str, values: Dict, kind: str = "settings"):
+        """Merge values into one section of an instance's document"""
+        self.update_many([instance_name], section, values, kind)
+
+    def update_many(self, instance_names: Iterable[str], section: str, values: Dict, kind: str = "settings"):
+        """Fleet-wide edit - one pass in memory, written by a single batched flush"""
+        changes = {}
+        with self.lock:
+            for name in instance_names:
+                document = copy.deepcopy(self._document(name, kind))
+                document.setdefault(section, {}).update(copy.deepcopy(values))
+                changes[name] = document
+        self._apply(changes, kind)
+
+    def _apply(self, changes: Dict[str, Dict], kind: str):
+        notifications = []
+        with self.condition:
+            for name, document in changes.items():
+                key = (kind, name)
+                previous = self._document(name, kind)
+                if previous == document:
+                    continue
+                self.documents[key] = document
+                self.dirty.add(key)
+                self.stats["changes"] += 1
+                notifications.append((name, copy.deepcopy(document), previous))
+
+            if notifications:
+                now = time.time()
+                self.last_change_at = now
+                if self.first_dirty_at is None:
+                    self.first_dirty_at = now
+                self._ensure_writer()
+                self.condition.notify_all()
+
+        for name, document, previous in notifications:
+            self._notify(name, kind, document, previous)
+
+    def delete(self, instance_name: str, kind: str = "settings"):
+        """Remove a document from memory and storage"""
+        key = (kind, instance_name)
+        with self.lock:
+            previous = self._document(instance_name, kind)
+            self.documents.pop(key, None)
+            self.dirty.discard(key)
+            self.loaded_mtimes.pop(key, None)
+        try:
+            if self.database is not None:
+                self.database.delete_documents(instance_name, kind)
+            elif os.path.exists(self.path_for(instance_name, kind)):
+                os.remove(self.path_for(instance_name, kind))
+        except Exception as e:
+            print(f"[SettingsStore] Error deleting {kind} for {instance_name}: {e}")
+        self._notify(instance_name, kind, {}, previous)
+    
+    # Notifications
+    def subscribe(self, callback: Callable[[str, str, Dict, Dict], None]):
+        """callback(instance_name, kind, new_document, old_document) after every change"""
+        with self.lock:
+            if callback not in self.subscribers:
+                self.subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable):
+        with self.lock:
+            if callback in self.subscribers:
+                self.subscribers.remove(callback)
+
+    def _notify(self, instance_name: str, kind: str, document: Dict, previous: Dict):
+        for callback in list(self.subscribers):
+            try:
+                callback(instance_name, kind, document, previous)
+            except Exception as e:
+                print(f"[SettingsStore] Subscriber error for {instance_name}: {e}")
+
+    # External changes
+    def start_watching(self, interval: float = 2.0):
+        """Poll storage for documents changed outside this store and push them to subscribers"""
+        if self.watcher is not None and self.watcher.is_alive():
+            return
+        self.watch_since = time.time()
+        self.watch_stop.clear()
+        self.watcher = threading.Thread(target=self._watch_loop, args=(interval,), daemon=True,
+                                        name="SettingsWatcher")
+        self.watcher.start()
+        print(f"[SettingsStore] 👀 Watching for external settings changes every {interval:.1f}s")
+
+    def stop_watching(self):
+        self.watch_stop.set()
+
+    def _watch_loop(self, interval: float):
+        while not self.watch_stop.wait(interval):
+            try:
+                self.check_external_changes()
+            except Exception as e:
+                print(f"[SettingsStore] Watch error: {e}")
+
+    def check_external_changes(self) -> int:
+        """Reload cached documents whose stored copy changed; returns how many were reloaded"""
+        changes = []
+        if self.database is not None:
+            for row in self.database.documents_changed_since(self.watch_since):
+                self.watch_since = max(self.watch_since, row["updated_at"])
+                changes.append((row["kind"], row["instance"], row["data"], None))
+        else:
+            for kind, name in self._scan_directory(FILE_PATTERNS):
+                key = (kind, name)
+                path = self.path_for(name, kind)
+                try:
+                    mtime = os.path.getmtime(path)
+                    if key not in self.documents or self.loaded_mtimes.get(key) == mtime:
+                        continue
+                    with open(path, "r") as f:
+                        changes.append((kind, name, json.load(f), mtime))
+                except (OSError, ValueError) as e:
+                    # Mid-write or removed - the next poll sees the finished file
+                    print(f"[SettingsStore] Skipping {path}: {e}")
+
+        reloaded = 0
+        for kind, name, document, mtime in changes:
+            key = (kind, name)
+            with self.lock:
+                if key not in self.documents or key in self.dirty:
+                    # Not cached yet (loaded fresh on first use) or local edits pending (they win)
+                    continue
+                if mtime is not None:
+                    self.loaded_mtimes[key] = mtime
+                previous = self.documents[key]
+                if previous == document:
+                    # Our own write coming back
+                    continue
+                self.documents[key] = document
+                self.stats["external_reloads"] += 1
+            reloaded += 1
+            print(f"[SettingsStore] 🔄 Reloaded {kind} for {name} (changed externally)")
+            self._notify(name, kind, copy.deepcopy(document), previous)
+        return reloaded
+
+    # Persistence
+    def _ensure_writer(self):
+        if self.writer is None or not self.writer.is_alive():
+            self.writer = threading.Thread(target=self._writer_loop, daemon=True, name="SettingsWriter")
+            self.writer.start()
+
+    def _writer_loop(self):
+        while True:
+            with self.condition:
+                while not self.dirty and not self.shutdown_flag:
+                    self.condition.wait()
+                if self.shutdown_flag:
+                    return
+
+                # Wait for edits to go quiet, but never hold changes longer than max_delay
+                while self.dirty and not self.shutdown_flag:
+                    now = time.time()
+                    quiet_at = self.last_change_at + self.debounce
+                    deadline = (self.first_dirty_at or now) + self.max_delay
+                    wake_at = min(quiet_at, deadline)
+                    if now >= wake_at:
+                        break
+                    self.condition.wait(wake_at - now)
+
+            self.flush()
+
+    def flush(self) -> int:
+        """Write all pending changes now; returns number of files written"""
+        with self.lock:
+            pending = {key: copy.deepcopy(self.documents[key]) for key in self.dirty}
+            self.dirty.clear()
+            self.first_dirty_at = None
+
+        if not pending:
+            return 0
+
+        started = time.perf_counter()
+        if self.database is not None:
+            return self._flush_to_database(pending, started)
+        
+        written = 0
+        for (kind, name), document in pending.items():
+            path = self.path_for(name, kind)
+            try:
+                self._atomic_write(path, document)
+                written += 1
+                with self.lock:
+                    self.loaded_mtimes[(kind, name)] = os.path.getmtime(path)
+            except Exception as e:
+                print(f"[SettingsStore] ❌ Error writing {path}: {e}")
+                with self.lock:
+                    self.dirty.add((kind, name))
+
+        with self.lock:
+            self.stats["file_writes"] += written
+        metrics.observe("settings_flush_seconds", time.perf_counter() - started)
+        return written
+
+    def _flush_to_database(self, pending: Dict[tuple, Dict], started: float) -> int:
+        """All pending documents of a kind in one transaction"""
+        by_kind = {}
+        for (kind, name), document in pending.items():
+            by_kind.setdefault(kind, {})[name] = document
+        
+        written = 0
+        for kind, documents in by_kind.items():
+            try:
+                self.database.save_documents(documents, kind)
+                written += len(documents)
+            except Exception as e:
+                print(f"[SettingsStore] ❌ Database write error: {e}")
+                with self.lock:
+                    self.dirty.update((kind, name) for name in documents)
+        
+        with self.lock:
+            self.stats["file_writes"] += written
+        metrics.observe("settings_flush_seconds", time.perf_counter() - started)
+        return written
+    
+    @staticmethod
+    def _atomic_write(path: str, document: Dict):
+        """Write to a temp file next to the target and rename over it"""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(prefix=".tmp_", suffix=".json", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(document, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def close(self):
+        self.stop_watching()
+        with self.condition:
+            self.shutdown_flag = True
+            self.condition.notify_all()
+        self.flush()
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return dict(self.stats, documents=len(self.documents), pending_writes=len(self.dirty))
+
+
+settings_store = SettingsStore(database=get_database())
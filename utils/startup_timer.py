@@ -0,0 +1,67 @@
+"""
+BENSON v2.0 - Startup Timing
+Records how long each startup phase takes and prints a report once the
+main window is up
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+from utils.metrics import metrics
+
+
+class StartupTimer:
+    """Phase durations measured from process start"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: List[Dict] = []
+        self.milestones: List[Dict] = []
+        self.lock = threading.Lock()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block of startup work"""
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - begin
+            with self.lock:
+                self.phases.append({
+                    "phase": name,
+                    "start": round(begin - self.started, 3),
+                    "seconds": round(duration, 3),
+                    "thread": threading.current_thread().name
+                })
+            metrics.observe("startup_phase_seconds", duration, phase=name)
+
+    def mark(self, name: str):
+        """Record a point in time (e.g. window shown)"""
+        with self.lock:
+            self.milestones.append({"milestone": name, "at": round(self.elapsed(), 3)})
+
+    def get_report(self) -> Dict:
+        with self.lock:
+            return {
+                "phases": list(self.phases),
+                "milestones": list(self.milestones),
+                "elapsed": round(self.elapsed(), 3)
+            }
+
+    def print_report(self, title: str = "Startup timing"):
+        report = self.get_report()
+        print(f"[Startup] ⏱️ {title} ({report['elapsed']:.2f}s since launch)")
+        for phase in sorted(report["phases"], key=lambda p: p["start"]):
+            print(f"[Startup]   {phase['phase']:<28} {phase['seconds']:>7.3f}s  "
+                  f"(at {phase['start']:.2f}s, {phase['thread']})")
+        for milestone in report["milestones"]:
+            print(f"[Startup]   ✓ {milestone['milestone']:<26} at {milestone['at']:.2f}s")
+
+
+startup_timer = StartupTimer()
@@ -0,0 +1,239 @@
+"""
+BENSON v2.0 - Hot Path Tracing
+Nested spans kept in a ring buffer, exportable as Chrome trace JSON
+(open in chrome://tracing or https://ui.perfetto.dev)
+
+Enable with BENSON_TRACE=1, or BENSON_TRACE_FILE=trace.json to also write
+the buffer on exit. Disabled spans cost one attribute check.
+"""
+
+import atexit
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+
+class _NoopSpan:
+    """Shared do-nothing context manager used while tracing is disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """One timed region; parent is the enclosing span on the same thread (see Tracer.wrap)"""
+    __slots__ = ("tracer", "name", "span_id", "parent_id", "trace_id", "attrs", "start_ns", "duration_ns",
+                 "thread_id", "thread_name", "error")
+
+    def __init__(self, tracer, name: str, attrs: Dict):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.span_id = next(tracer._ids)
+        self.parent_id = None
+        self.trace_id = self.span_id
+        self.start_ns = 0
+        self.duration_ns = 0
+        self.thread_id = 0
+        self.thread_name = ""
+        self.error = None
+
+    def set(self, **attrs):
+        """Attach attributes (e.g. result, confidence) while the span is open"""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        stack = self.tracer._stack()
+        if stack:
+            parent = stack[-1]
+            self.parent_id = parent.span_id
+            self.trace_id = parent.trace_id
+        stack.append(self)
+
+        thread = threading.current_thread()
+        self.thread_id = thread.ident
+        self.thread_name = thread.name
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration_ns = time.perf_counter_ns() - self.start_ns
+        if exc_type is not None:
+            self.error = exc_type.__name__
+
+        stack = self.tracer._stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        self.tracer._record(self)
+        return False
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "trace_id": self.trace_id,
+            "start_us": self.start_ns // 1000,
+            "duration_ms": round(self.duration_ns / 1e6, 3),
+            "thread": self.thread_name,
+            "error": self.error,
+            "attrs": dict(self.attrs)
+        }
+
+
+class Tracer:
+    """Span factory with a bounded buffer of finished spans"""
+
+    def __init__(self, buffer_size: int = 20000):
+        self.enabled = False
+        self.spans = deque(maxlen=buffer_size)
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+        self._export_path = None
+
+    def enable(self, export_path: str = None):
+        self.enabled = True
+        if export_path and not self._export_path:
+            self._export_path = export_path
+            atexit.register(self._export_on_exit)
+        print(f"[Tracing] ✅ Enabled{f' - writing {export_path} on exit' if export_path else ''}")
+
+    def disable(self):
+        self.enabled = False
+
+    def span(self, name: str, **attrs):
+        """Context manager timing a block; no-op when disabled"""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name, attrs)
+
+    def current_span(self) -> Optional[Span]:
+        """Innermost open span on this thread"""
+        if not self.enabled:
+            return None
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def wrap(self, func):
+        """Bind func to the current span so spans it opens on another thread (executor,
+        work queue) are children of it rather than new traces"""
+        parent = self.current_span()
+        if parent is None:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stack = self._stack()
+            stack.append(parent)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                if stack and stack[-1] is parent:
+                    stack.pop()
+        return wrapper
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, span: Span):
+        self.spans.append(span)
+
+    # Queries
+    def get_spans(self, name: str = None, trace_id: int = None) -> List[Span]:
+        spans = list(self.spans)
+        if name:
+            spans = [s for s in spans if s.name == name]
+        if trace_id:
+            spans = [s for s in spans if s.trace_id == trace_id]
+        return spans
+
+    def get_trace_tree(self, trace_id: int) -> List[Dict]:
+        """Spans of one trace, children nested under their parents"""
+        nodes = {s.span_id: dict(s.to_dict(), children=[]) for s in self.get_spans(trace_id=trace_id)}
+        roots = []
+        for node in sorted(nodes.values(), key=lambda n: n["start_us"]):
+            parent = nodes.get(node["parent_id"])
+            (parent["children"] if parent else roots).append(node)
+        return roots
+
+    def clear(self):
+        self.spans.clear()
+
+    # Export
+    def to_chrome_trace(self) -> Dict:
+        pid = os.getpid()
+        events = []
+        thread_names = {}
+        for span in list(self.spans):
+            thread_names[span.thread_id] = span.thread_name
+            args = {k: v if isinstance(v, (int, float, str, bool)) or v is None else str(v)
+                    for k, v in span.attrs.items()}
+            if span.error:
+                args["error"] = span.error
+            events.append({
+                "name": span.name,
+                "cat": span.attrs.get("instance", "benson"),
+                "ph": "X",
+                "ts": span.start_ns / 1000,
+                "dur": span.duration_ns / 1000,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": args
+            })
+
+        for tid, name in thread_names.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: str) -> int:
+        """Write buffered spans as Chrome trace JSON; returns span count"""
+        trace = self.to_chrome_trace()
+        with open(path, "w") as f:
+            json.dump(trace, f)
+        return len(self.spans)
+
+    def _export_on_exit(self):
+        try:
+            count = self.export_chrome_trace(self._export_path)
+            print(f"[Tracing] Wrote {count} spans to {self._export_path}")
+        except Exception as e:
+            print(f"[Tracing] Export error: {e}")
+
+
+tracer = Tracer()
+
+if os.environ.get("BENSON_TRACE_FILE"):
+    tracer.enable(os.environ["BENSON_TRACE_FILE"])
+elif os.environ.get("BENSON_TRACE", "").lower() in ("1", "true", "yes"):
+    tracer.enable()
+
+
+def traced(name: str):
+    """Decorator wrapping a module method in a span tagged with its instance"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if not tracer.enabled:
+                return func(self, *args, **kwargs)
+            with tracer.span(name, instance=getattr(self, "instance_name", None)):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,175 @@
+"""
+BENSON v2.0 - Global Work Queue
+One priority + deadline ordered queue for module work from every instance,
+executed by a fixed pool of workers
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from modules.base_module import ModulePriority
+from utils.metrics import metrics
+
+
+@dataclass(order=True)
+class WorkItem:
+    """Queued unit of work - ordered by priority, then deadline, then submission order"""
+    priority: int
+    deadline: float
+    sequence: int
+    func: Callable = field(compare=False)
+    args: tuple = field(compare=False, default=())
+    name: str = field(compare=False, default="")
+    instance_name: Optional[str] = field(compare=False, default=None)
+    future: Future = field(compare=False, default_factory=Future)
+    enqueued_at: float = field(compare=False, default_factory=time.time)
+
+
+class GlobalWorkQueue:
+    """Fixed worker pool that always runs the most urgent queued item next"""
+
+    def __init__(self, workers: int = 8, name: str = "WorkQueue"):
+        self.name = name
+        self.worker_count = max(1, int(workers))
+
+        self.queue = []
+        self.condition = threading.Condition()
+        self.shutdown_flag = False
+        self.workers = []
+        self._sequence = itertools.count()
+
+        # Stats per priority name
+        self.stats = {p.name: {"submitted": 0, "completed": 0, "failed": 0, "late": 0,
+                               "total_wait": 0.0, "max_wait": 0.0} for p in ModulePriority}
+        self.active = 0
+
+    def start(self):
+        """Start worker threads (idempotent)"""
+        with self.condition:
+            if self.workers:
+                return
+            self.shutdown_flag = False
+            for i in range(self.worker_count):
+                worker = threading.Thread(target=self._worker, daemon=True, name=f"{self.name}-{i}")
+                worker.start()
+                self.workers.append(worker)
+        print(f"[{self.name}] ✅ Started {self.worker_count} workers")
+
+    def submit(self, func: Callable, *args, priority: ModulePriority = ModulePriority.MEDIUM,
+               deadline: float = None, name: str = "", instance_name: str = None) -> Future:
+        """Queue work; deadline (epoch seconds) orders items of equal priority"""
+        if not self.workers:
+            self.start()
+
+        item = WorkItem(priority=priority.value, deadline=deadline or time.time(),
+                        sequence=next(self._sequence), func=func, args=args,
+                        name=name or getattr(func, "__name__", "work"), instance_name=instance_name)
+
+        with self.condition:
+            if self.shutdown_flag:
+                item.future.set_exception(RuntimeError(f"{self.name} is shut down"))
+                return item.future
+            heapq.heappush(self.queue, item)
+            self.stats[priority.name]["submitted"] += 1
+            self.condition.notify()
+
+        return item.future
+
+    def _worker(self):
+        while True:
+            with self.condition:
+                while not self.queue and not self.shutdown_flag:
+                    self.condition.wait()
+                if self.shutdown_flag and not self.queue:
+                    return
+                item = heapq.heappop(self.queue)
+                self.active += 1
+
+            self._execute(item)
+
+            with self.condition:
+                self.active -= 1
+
+    def _execute(self, item: WorkItem):
+        if not item.future.set_running_or_notify_cancel():
+            return
+
+        started = time.time()
+        wait = started - item.enqueued_at
+        with self.condition:
+            stats = self.stats[ModulePriority(item.priority).name]
+            stats["total_wait"] += wait
+            stats["max_wait"] = max(stats["max_wait"], wait)
+            if started > item.deadline + 1.0:
+                stats["late"] += 1
+        metrics.observe("work_queue_wait_seconds", wait, priority=ModulePriority(item.priority).name,
+                        instance=item.instance_name)
+
+        try:
+            result = item.func(*item.args)
+        except BaseException as e:
+            with self.condition:
+                stats["failed"] += 1
+            print(f"[{self.name}] ❌ {item.name} failed"
+                  f"{f' for {item.instance_name}' if item.instance_name else ''}: {e}")
+            item.future.set_exception(e)
+            return
+
+        with self.condition:
+            stats["completed"] += 1
+        item.future.set_result(result)
+
+    def cancel_instance(self, instance_name: str) -> int:
+        """Drop queued (not running) work for an instance"""
+        with self.condition:
+            kept, dropped = [], []
+            for item in self.queue:
+                (dropped if item.instance_name == instance_name else kept).append(item)
+            heapq.heapify(kept)
+            self.queue = kept
+
+        for item in dropped:
+            item.future.cancel()
+        return len(dropped)
+
+    def shutdown(self, wait: bool = True, timeout: float = 10):
+        """Stop workers; queued work still runs unless cancelled first"""
+        with self.condition:
+            self.shutdown_flag = True
+            self.condition.notify_all()
+            workers, self.workers = self.workers, []
+
+        if wait:
+            for worker in workers:
+                worker.join(timeout=timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.condition:
+            depth = {}
+            for item in self.queue:
+                key = ModulePriority(item.priority).name
+                depth[key] = depth.get(key, 0) + 1
+            active = self.active
+
+        by_priority = {}
+        for key, stats in self.stats.items():
+            if not stats["submitted"]:
+                continue
+            done = stats["completed"] + stats["failed"]
+            by_priority[key] = {
+                "submitted": stats["submitted"],
+                "completed": stats["completed"],
+                "failed": stats["failed"],
+                "late": stats["late"],
+                "queued": depth.get(key, 0),
+                "avg_wait_ms": round(stats["total_wait"] / done * 1000, 1) if done else 0.0,
+                "max_wait_ms": round(stats["max_wait"] * 1000, 1)
+            }
+
+        return {"name": self.name, "workers": self.worker_count, "active": active,
+                "queued": sum(depth.values()), "by_priority": by_priority}